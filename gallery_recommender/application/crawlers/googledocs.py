@@ -46,89 +46,52 @@ class GoogleDocsCrawler(BaseCrawler):
         df = clean_sheets_data(df)
 
         logger.info(f"Type of 'Exhibition Start Date': {type(df['Exhibition Start Date'].iloc[0])}")
-        added_galleries = 0
-        added_exhibitions = 0
-
+        # one gallery per name, the sheet repeats the gallery on every exhibition row
+        galleries = {}
         for _, row in df.iterrows():
-            start_dt = datetime.combine(row["Exhibition Start Date"], time.min)
-            end_dt = datetime.combine(row["Exhibition End Date"], time.min)
-
-            logger.info(f"Checking if gallery already exists in the database: {row['Gallery Name English']}")
             gallery_name = row["Gallery Name English"]
-            exhibition_name = row["Exhibition Name"]
-            try:
-                old_gallery_model = self.GalleryModel.find(name=gallery_name)
-            except Exception as e:
-                logger.info(f"Error finding gallery: {e}")
-                old_gallery_model = None
-            if old_gallery_model is not None:
-                logger.info(f"Gallery already exists in the database: {gallery_name}")
-                gallery_id = str(old_gallery_model.id)
-                logger.info(f"Retrieved Gallery ID: {gallery_id}")
-
-                try:
-                    old_exhibition_model = self.ExhibitionModel.find(
-                        name=exhibition_name,
-                        gallery_id=gallery_id
-                    )
-
-                except Exception as e:
-                    logger.info(f"Error finding exhibition: {e}")
-                    old_exhibition_model = None
-
-                if old_exhibition_model is not None:
-                    logger.info(f"Exhibition already exists in the database: {exhibition_name}")
-                    continue
-
-                else:
-                    logger.info(f"Exhibition does not exist in the database: {exhibition_name}, adding to the database")
-                    exhibition = self.ExhibitionModel(
-                        area=row["Area"],
-                        name=row["Exhibition Name"],
-                        name_japanese=row["Exhibition Name Japanese"],
-                        name_english=row["Exhibition Name English"],
-                        description=row["Exhibition Description From Website"],
-                        description_japanese=row["Exhibition Description From Website (Japanese)"],
-                        description_english=row["Exhibition Description From Website (English)"],
-                        artist=row["Artist"],
-                        exhibition_image_url=row["Exhibition Image URL"],
-                        exhibition_start_date=start_dt,
-                        exhibition_end_date=end_dt,
-                        exhibition_start_date_ts=round(start_dt.timestamp(), 3),
-                        exhibition_end_date_ts=round(end_dt.timestamp(), 3),
-                        gallery_id=gallery_id,  # Link the exhibition to the new gallery
-                        latitude=row["Latitude"],
-                        longitude=row["Longitude"],
-                    )
-                    exhibition.save()
-                    added_exhibitions += 1
-                    logger.info(f"Exhibition created in the database: {row['Exhibition Name']} with id: {exhibition.id}")
-            
-            # if gallery does not exist, create a new gallery
-            else:
-                logger.info(f"Gallery does not exist in the database: {gallery_name}, creating a new gallery")
-                gallery = self.GalleryModel(
-                    name=gallery_name,
-                    name_japanese=row["Gallery Name Japanese"],
-                    name_english=row["Gallery Name English"],
-                    description=row["Gallery Description From Website"],
-                    area=row["Area"],
-                    gallery_image_url=row["Gallery Image URL"],
-                    website=row["Website"],
-                    hours=row["Hours"],
-                    latitude=row["Latitude"],
-                    longitude=row["Longitude"],
-                    phone_number=row["Phone Number"],
-                    address_japanese=row["Address Japanese"],
-                    address_english=row["Address English"],
+            if gallery_name in galleries:
+                continue
+            galleries[gallery_name] = self.GalleryModel(
+                name=gallery_name,
+                name_japanese=row["Gallery Name Japanese"],
+                name_english=row["Gallery Name English"],
+                description=row["Gallery Description From Website"],
+                area=row["Area"],
+                gallery_image_url=row["Gallery Image URL"],
+                website=row["Website"],
+                hours=row["Hours"],
+                latitude=row["Latitude"],
+                longitude=row["Longitude"],
+                phone_number=row["Phone Number"],
+                address_japanese=row["Address Japanese"],
+                address_english=row["Address English"],
+            )
+
+        gallery_counts = self.GalleryModel.bulk_upsert(list(galleries.values()))
+        logger.info(f"Upserted {len(galleries)} galleries: {gallery_counts}")
+
+        # galleries already in the database kept their id, so link the exhibitions to the stored ones
+        gallery_ids = {
+            gallery.name: gallery.id
+            for gallery in self.GalleryModel.iter_find({"name": {"$in": list(galleries)}}, projection=["name"])
+        }
+
+        exhibitions = []
+        for _, row in df.iterrows():
+            gallery_id = gallery_ids.get(row["Gallery Name English"])
+            if gallery_id is None:
+                logger.error(
+                    f"Gallery '{row['Gallery Name English']}' is not in the database, "
+                    f"skipping the exhibition: {row['Exhibition Name']}"
                 )
-                
-                gallery.save()
-                logger.info(f"Gallery created in the database: {gallery_name} with id: {gallery.id}")
-                added_galleries += 1
+                continue
+
+            start_dt = datetime.combine(row["Exhibition Start Date"], time.min)
+            end_dt = datetime.combine(row["Exhibition End Date"], time.min)
 
-                # Within the new gallery, also create the exhibition for it
-                exhibition = self.ExhibitionModel(
+            exhibitions.append(
+                self.ExhibitionModel(
                     area=row["Area"],
                     name=row["Exhibition Name"],
                     name_japanese=row["Exhibition Name Japanese"],
@@ -142,12 +105,16 @@ class GoogleDocsCrawler(BaseCrawler):
                     exhibition_end_date=end_dt,
                     exhibition_start_date_ts=start_dt.timestamp(),
                     exhibition_end_date_ts=end_dt.timestamp(),
-                    gallery_id=gallery.id,  # Link the exhibition to the new gallery
+                    gallery_id=gallery_id,
                     latitude=row["Latitude"],
-                    longitude=row["Longitude"]
+                    longitude=row["Longitude"],
                 )
-                exhibition.save()
-                logger.info(f"Exhibition created in the database: {row['Exhibition Name']} for gallery: {gallery_name}")
-                added_exhibitions += 1
+            )
+
+        exhibition_counts = self.ExhibitionModel.bulk_upsert(exhibitions)
+        logger.info(f"Upserted {len(exhibitions)} exhibitions: {exhibition_counts}")
+
+        added_galleries = sum(counts["inserted"] for counts in gallery_counts)
+        added_exhibitions = sum(counts["inserted"] for counts in exhibition_counts)
 
-        return added_galleries, added_exhibitions
\ No newline at end of file
+        return added_galleries, added_exhibitions
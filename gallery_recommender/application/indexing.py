@@ -1,18 +1,27 @@
-from loguru import logger
+from gallery_recommender.domain.data import ExhibitionData, GalleryData, MaterializedRecommendationData
 from gallery_recommender.domain.embedded_cleaned_data import EmbeddedExhibitionDocument
-from gallery_recommender.infrastructure.db.qdrant import QdrantDatabaseConnector
 
+# the document classes whose collections declare payload indexes
+INDEXED_DOCUMENT_CLASSES = (EmbeddedExhibitionDocument,)
 
-def initialize_indices():
-    filterable_fields = list(EmbeddedExhibitionDocument.model_fields.keys())
+# the data classes whose MongoDB collections declare indexes
+INDEXED_DATA_CLASSES = (GalleryData, ExhibitionData, MaterializedRecommendationData)
 
-    for field in filterable_fields:
-        try:
-            QdrantDatabaseConnector._instance.create_payload_index(
-            collection_name=EmbeddedExhibitionDocument.Config.name,
-            field_name=field,
-            field_type="keyword" if field != "exhibition_start_date_ts" and field != "exhibition_end_date_ts" else "float",  # or "integer", "float" as needed
-            )
-            logger.info(f"Created index for field: {field}")
-        except Exception as e:
-            logger.warning(f"Index for {field} may already exist or failed to create: {e}")
\ No newline at end of file
+
+def initialize_indices(drop_undeclared: bool = False) -> dict[str, dict[str, list[str]]]:
+    """
+    Bring the payload indexes of every collection in line with their declaration, in one idempotent pass.
+    The undeclared indexes are kept unless `drop_undeclared`, so a service starting up never removes an index
+    another deployment still filters on.
+    """
+    return {
+        document_class.get_collection_name(): document_class.reconcile_payload_indexes(drop_undeclared=drop_undeclared)
+        for document_class in INDEXED_DOCUMENT_CLASSES
+    }
+
+
+def ensure_indexes() -> dict[str, dict[str, list[str]]]:
+    """
+    Create the MongoDB indexes declared by every data class, in one idempotent pass.
+    """
+    return {data_class.get_collection_name(): data_class.ensure_indexes() for data_class in INDEXED_DATA_CLASSES}
@@ -0,0 +1,117 @@
+import queue
+import time
+from concurrent.futures import Future
+from threading import Lock, Thread
+from typing import Any, Callable
+
+import numpy as np
+from loguru import logger
+from numpy.typing import NDArray
+
+
+class MicroBatcher:
+    """
+    Collects the inputs of concurrent callers for up to `max_wait_ms` or `max_batch_size` items,
+    runs them through `predict_fn` as a single batch and fans the outputs back to each caller's future.
+    """
+
+    def __init__(
+        self,
+        predict_fn: Callable[[list[Any]], NDArray],
+        max_batch_size: int = 256,
+        max_wait_ms: float = 5.0,
+        name: str = "micro-batcher",
+    ) -> None:
+        self._predict_fn = predict_fn
+        self._max_batch_size = max_batch_size
+        self._max_wait_s = max_wait_ms / 1000
+        self._queue: queue.Queue[tuple[list[Any], Future] | None] = queue.Queue()
+
+        self._stats_lock = Lock()
+        self._num_batches = 0
+        self._num_requests = 0
+        self._num_items = 0
+        self._max_queue_depth = 0
+
+        self._worker = Thread(target=self._run, name=name, daemon=True)
+        self._worker.start()
+
+    def submit(self, items: list[Any]) -> Future:
+        future: Future = Future()
+        self._queue.put((items, future))
+
+        with self._stats_lock:
+            self._max_queue_depth = max(self._max_queue_depth, self._queue.qsize())
+
+        return future
+
+    def __call__(self, items: list[Any]) -> NDArray:
+        return self.submit(items).result()
+
+    def shutdown(self) -> None:
+        self._queue.put(None)
+        self._worker.join()
+
+    def stats(self) -> dict:
+        with self._stats_lock:
+            return {
+                "queue_depth": self._queue.qsize(),
+                "max_queue_depth": self._max_queue_depth,
+                "num_batches": self._num_batches,
+                "num_requests": self._num_requests,
+                "num_items": self._num_items,
+                "avg_requests_per_batch": round(self._num_requests / self._num_batches, 2) if self._num_batches else 0.0,
+                "avg_batch_size": round(self._num_items / self._num_batches, 2) if self._num_batches else 0.0,
+                "max_batch_size": self._max_batch_size,
+                "max_wait_ms": self._max_wait_s * 1000,
+            }
+
+    def _run(self) -> None:
+        while True:
+            request = self._queue.get()
+            if request is None:
+                return
+
+            batch = [request]
+            num_items = len(request[0])
+            deadline = time.monotonic() + self._max_wait_s
+
+            while num_items < self._max_batch_size:
+                timeout = deadline - time.monotonic()
+                if timeout <= 0:
+                    break
+                try:
+                    request = self._queue.get(timeout=timeout)
+                except queue.Empty:
+                    break
+                if request is None:
+                    # finish the current batch before stopping
+                    self._queue.put(None)
+                    break
+
+                batch.append(request)
+                num_items += len(request[0])
+
+            self._run_batch(batch, num_items)
+
+    def _run_batch(self, batch: list[tuple[list[Any], Future]], num_items: int) -> None:
+        items = [item for request_items, _ in batch for item in request_items]
+
+        try:
+            outputs = np.asarray(self._predict_fn(items)) if items else np.array([])
+        except Exception as e:
+            logger.error(f"Micro-batch of {num_items} items failed: {e}")
+            for _, future in batch:
+                future.set_exception(e)
+
+            return
+
+        offset = 0
+        for request_items, future in batch:
+            future.set_result(outputs[offset : offset + len(request_items)])
+            offset += len(request_items)
+
+        with self._stats_lock:
+            self._num_batches += 1
+            self._num_requests += len(batch)
+            self._num_items += num_items
@@ -0,0 +1,154 @@
+import hashlib
+import sqlite3
+import time
+import unicodedata
+from pathlib import Path
+from threading import Lock
+
+import numpy as np
+from loguru import logger
+from numpy.typing import NDArray
+
+
+def normalize_text(text: str) -> str:
+    """
+    Normalize the text before hashing it, so that inputs which only differ in unicode form or whitespace share a key.
+    """
+    text = unicodedata.normalize("NFKC", text)
+
+    return " ".join(text.split())
+
+
+class EmbeddingCache:
+    """
+    A disk-backed, content-addressed cache for embeddings.
+    Entries are keyed by (model_id, sha256 of the normalized text) and stored as raw float32 bytes in a SQLite file.
+    When the number of entries exceeds `max_entries`, the least recently used entries are evicted.
+    """
+
+    def __init__(self, cache_dir: Path, max_entries: int = 200_000) -> None:
+        self._path = Path(cache_dir) / "embeddings.sqlite"
+        self._path.parent.mkdir(parents=True, exist_ok=True)
+        self._max_entries = max_entries
+        self._lock = Lock()
+
+        self._connection = sqlite3.connect(str(self._path), check_same_thread=False)
+        self._connection.execute("PRAGMA journal_mode=WAL")
+        self._connection.execute(
+            """
+            CREATE TABLE IF NOT EXISTS embeddings (
+                model_id TEXT NOT NULL,
+                text_hash TEXT NOT NULL,
+                dim INTEGER NOT NULL,
+                vector BLOB NOT NULL,
+                last_access REAL NOT NULL,
+                PRIMARY KEY (model_id, text_hash)
+            )
+            """
+        )
+        self._connection.execute("CREATE INDEX IF NOT EXISTS idx_last_access ON embeddings (last_access)")
+        self._connection.commit()
+
+        # counted once on open and kept up to date by put_many, so eviction doesn't scan the table on every write
+        (self._num_entries,) = self._connection.execute("SELECT COUNT(*) FROM embeddings").fetchone()
+
+        self.reset_stats()
+
+    @staticmethod
+    def hash_text(text: str) -> str:
+        return hashlib.sha256(normalize_text(text).encode("utf-8")).hexdigest()
+
+    def get_many(self, model_id: str, texts: list[str]) -> list[NDArray[np.float32] | None]:
+        """
+        Look up the embeddings of the given texts. Missing entries are returned as None.
+        """
+        hashes = [self.hash_text(text) for text in texts]
+        found: dict[str, NDArray[np.float32]] = {}
+
+        with self._lock:
+            unique_hashes = list(dict.fromkeys(hashes))
+            # SQLite limits the number of bound parameters per statement
+            for i in range(0, len(unique_hashes), 500):
+                chunk = unique_hashes[i : i + 500]
+                placeholders = ",".join("?" * len(chunk))
+                rows = self._connection.execute(
+                    f"SELECT text_hash, dim, vector FROM embeddings WHERE model_id = ? AND text_hash IN ({placeholders})",
+                    (model_id, *chunk),
+                ).fetchall()
+                for text_hash, dim, vector in rows:
+                    found[text_hash] = np.frombuffer(vector, dtype=np.float32, count=dim)
+
+            if found:
+                now = time.time()
+                self._connection.executemany(
+                    "UPDATE embeddings SET last_access = ? WHERE model_id = ? AND text_hash = ?",
+                    [(now, model_id, text_hash) for text_hash in found],
+                )
+                self._connection.commit()
+
+            results = [found.get(text_hash) for text_hash in hashes]
+            hits = sum(result is not None for result in results)
+            self._hits += hits
+            self._misses += len(results) - hits
+
+        return results
+
+    def put_many(self, model_id: str, texts: list[str], embeddings: NDArray[np.float32]) -> None:
+        """
+        Store the embeddings of the given texts and evict the least recently used entries if the cache is full.
+        """
+        now = time.time()
+        rows = []
+        for text, embedding in zip(texts, embeddings):
+            vector = np.ascontiguousarray(embedding, dtype=np.float32)
+            rows.append((model_id, self.hash_text(text), vector.shape[0], vector.tobytes(), now))
+
+        with self._lock:
+            # an existing entry holds the embedding of the same text by the same model, so it is kept as-is
+            cursor = self._connection.executemany(
+                "INSERT OR IGNORE INTO embeddings (model_id, text_hash, dim, vector, last_access) VALUES (?, ?, ?, ?, ?)",
+                rows,
+            )
+            self._num_entries += cursor.rowcount
+            self._evict()
+            self._connection.commit()
+
+    def _evict(self) -> None:
+        overflow = self._num_entries - self._max_entries
+        if overflow <= 0:
+            return
+
+        cursor = self._connection.execute(
+            "DELETE FROM embeddings WHERE rowid IN (SELECT rowid FROM embeddings ORDER BY last_access ASC LIMIT ?)",
+            (overflow,),
+        )
+        self._num_entries -= cursor.rowcount
+        self._evictions += cursor.rowcount
+        logger.info(f"Evicted {overflow} entries from the embedding cache at {self._path}")
+
+    def __len__(self) -> int:
+        return self._num_entries
+
+    def reset_stats(self) -> None:
+        with self._lock:
+            self._hits = 0
+            self._misses = 0
+            self._evictions = 0
+
+    def stats(self) -> dict:
+        """
+        Returns the hit/miss counters since the last reset.
+        """
+        with self._lock:
+            hits, misses, evictions = self._hits, self._misses, self._evictions
+        lookups = hits + misses
+
+        return {
+            "path": str(self._path),
+            "hits": hits,
+            "misses": misses,
+            "evictions": evictions,
+            "hit_rate": round(hits / lookups, 4) if lookups else 0.0,
+            "num_entries": len(self),
+            "max_entries": self._max_entries,
+        }
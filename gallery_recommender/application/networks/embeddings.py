@@ -1,3 +1,4 @@
+import time
 from functools import cached_property
 from pathlib import Path
 from typing import Optional
@@ -11,6 +12,9 @@ from transformers import AutoTokenizer
 
 from gallery_recommender.settings import settings
 from gallery_recommender.application.networks.base import SingletonMeta
+from gallery_recommender.application.networks.batching import MicroBatcher
+from gallery_recommender.application.networks.cache import EmbeddingCache
+from gallery_recommender.application.networks.onnx_backend import OnnxCrossEncoderBackend, OnnxEmbeddingBackend
 
 
 class EmbeddingModelSingleton(metaclass=SingletonMeta):
@@ -25,12 +29,23 @@ class EmbeddingModelSingleton(metaclass=SingletonMeta):
         model_id: str = settings.TEXT_EMBEDDING_MODEL,
         device: str = settings.RAG_MODEL_DEVICE,
         cache_dir: Optional[Path] = None,
+        embedding_cache_dir: Optional[Path] = None,
+        backend: str = settings.RAG_MODEL_BACKEND,
     ) -> None:
         """
         Initialize the embedding model.
         """
         self._model_id = model_id
         self._device = device
+        self._backend = backend
+
+        if settings.EMBEDDING_CACHE_ENABLED:
+            self._cache = EmbeddingCache(
+                cache_dir=embedding_cache_dir or Path(settings.EMBEDDING_CACHE_DIR),
+                max_entries=settings.EMBEDDING_CACHE_MAX_ENTRIES,
+            )
+        else:
+            self._cache = None
 
         self._model = SentenceTransformer(
             self._model_id,
@@ -39,6 +54,17 @@ class EmbeddingModelSingleton(metaclass=SingletonMeta):
         )
 
         self._model.eval()
+        self.reset_encode_stats()
+
+        if self._backend == "onnx":
+            self._onnx_model = OnnxEmbeddingBackend(
+                model=self._model,
+                model_id=self._model_id,
+                quantize=settings.RAG_ONNX_QUANTIZE,
+                cache_dir=Path(settings.RAG_ONNX_CACHE_DIR),
+            )
+        else:
+            self._onnx_model = None
 
 
     @property
@@ -51,6 +77,19 @@ class EmbeddingModelSingleton(metaclass=SingletonMeta):
         return self._model_id
     
 
+    @property
+    def backend(self) -> str:
+        """
+        Returns the inference backend, including the quantization, e.g. `torch` or `onnx-int8`.
+        Returns:
+            str: The inference backend.
+        """
+        if self._onnx_model is None:
+            return "torch"
+        
+        return "onnx-int8" if settings.RAG_ONNX_QUANTIZE else "onnx"
+    
+
     @cached_property
     def embedding_size(self) -> int:
         """
@@ -81,31 +120,179 @@ class EmbeddingModelSingleton(metaclass=SingletonMeta):
             AutoTokenizer: The tokenizer of the pre-trained transformer model.
         """
         return self._model.tokenizer
+    
+
+    def cache_stats(self) -> dict:
+        """
+        Returns the hit/miss report of the embedding cache.
+        Returns:
+            dict: The cache statistics, or an empty dict if the cache is disabled.
+        """
+        if self._cache is None:
+            return {}
+        
+        return self._cache.stats()
+    
+
+    def reset_cache_stats(self) -> None:
+        if self._cache is not None:
+            self._cache.reset_stats()
+
+
+    def reset_encode_stats(self) -> None:
+        self._encode_totals = {
+            "num_calls": 0,
+            "num_texts": 0,
+            "num_batches": 0,
+            "real_tokens": 0,
+            "padded_tokens": 0,
+            "elapsed_s": 0.0,
+        }
+
+
+    @property
+    def encode_stats(self) -> dict:
+        """
+        Returns the throughput statistics of the batched encode calls since the last reset.
+        Returns:
+            dict: The number of batches, padding overhead and texts/tokens per second.
+        """
+        totals = self._encode_totals
+        elapsed = totals["elapsed_s"]
+        real_tokens = totals["real_tokens"]
+
+        return {
+            **totals,
+            "elapsed_s": round(elapsed, 4),
+            "padding_ratio": round(totals["padded_tokens"] / real_tokens, 4) if real_tokens else 0.0,
+            "texts_per_s": round(totals["num_texts"] / elapsed, 2) if elapsed else 0.0,
+            "tokens_per_s": round(real_tokens / elapsed, 2) if elapsed else 0.0,
+        }
         
 
     def __call__(
-            self, input_text: str | list[str], to_list: bool = True
+            self, input_text: str | list[str], to_list: bool = True, persistent_cache: bool = True
     ) -> NDArray[np.float32] | list[float] | list[list[float]]:
         """
         Generate embeddings for the input text using the pre-trained transformer model.
         Args:
             input_text (str | list[str]): The input text to generate embeddings for.
             to_list (bool, optional): Whether to return the embeddings as a list of floats or a list of lists of floats. Defaults to True.
+            persistent_cache (bool, optional): Whether to go through the on-disk embedding cache. Online queries skip it,
+                since they have their own in-memory cache and shouldn't pay for the disk I/O. Defaults to True.
         Returns:
             Union[np.ndarray, list]: The embeddings of the input text.
         """
         
+        is_single = isinstance(input_text, str)
+        texts = [input_text] if is_single else list(input_text)
+
         try:
-            embeddings = self._model.encode(input_text)
+            embeddings = self._encode_cached(texts) if persistent_cache else self._encode(texts)
         except Exception:
             logger.error(f"Error generating embeddings for {self._model_id=} and {input_text=}")
 
             return [] if to_list else np.array([])
         
+        if is_single:
+            embeddings = embeddings[0]
+        
         if to_list:
             return embeddings.tolist()
         
         return embeddings
+    
+
+    def _encode_cached(self, texts: list[str]) -> NDArray[np.float32]:
+        """
+        Encode the texts, only running the model on the texts that are missing from the embedding cache.
+        """
+        if self._cache is None or len(texts) == 0:
+            return self._encode(texts)
+
+        # quantized backends produce slightly different vectors, so they get their own cache entries
+        cache_key = f"{self._model_id}@{self.backend}"
+        cached = self._cache.get_many(cache_key, texts)
+        missing_indices = [i for i, embedding in enumerate(cached) if embedding is None]
+
+        if missing_indices:
+            missing_texts = [texts[i] for i in missing_indices]
+            missing_embeddings = self._encode(missing_texts)
+            self._cache.put_many(cache_key, missing_texts, missing_embeddings)
+
+            for i, embedding in zip(missing_indices, missing_embeddings):
+                cached[i] = embedding
+
+        return np.stack(cached).astype(np.float32, copy=False)
+    
+
+    def _encode(self, texts: list[str]) -> NDArray[np.float32]:
+        if settings.EMBEDDING_BATCHED_ENCODE and len(texts) > 0:
+            return self.encode_batched(texts)
+        
+        return self._encode_raw(texts)
+    
+
+    def _encode_raw(self, texts: list[str], batch_size: int = 32) -> NDArray[np.float32]:
+        if self._onnx_model is not None:
+            return self._onnx_model.encode(texts, batch_size=batch_size)
+        
+        return self._model.encode(texts, batch_size=batch_size, convert_to_numpy=True, show_progress_bar=False)
+    
+
+    def encode_batched(self, texts: list[str], batch_size: int | None = None) -> NDArray[np.float32]:
+        """
+        Encode the texts in micro-batches of similar token length, so that short titles are not padded
+        to the length of long descriptions. The embeddings are returned in the original order of the texts.
+        Args:
+            texts (list[str]): The texts to encode.
+            batch_size (int, optional): The number of texts per micro-batch. Defaults to `settings.EMBEDDING_BATCH_SIZE`.
+        Returns:
+            np.ndarray: A (len(texts), embedding_size) float32 matrix.
+        """
+        batch_size = batch_size or settings.EMBEDDING_BATCH_SIZE
+        start = time.perf_counter()
+
+        lengths = self._token_lengths(texts)
+        order = np.argsort(lengths, kind="stable")
+
+        embeddings = np.empty((len(texts), self.embedding_size), dtype=np.float32)
+        num_batches = 0
+        padded_tokens = 0
+        for i in range(0, len(texts), batch_size):
+            indices = order[i : i + batch_size]
+            embeddings[indices] = self._encode_raw([texts[j] for j in indices], batch_size=len(indices))
+            num_batches += 1
+            padded_tokens += int(lengths[indices].max()) * len(indices)
+
+        elapsed = time.perf_counter() - start
+        real_tokens = int(lengths.sum())
+        logger.info(
+            f"Batched encode of {len(texts)} texts in {num_batches} batches of {batch_size}: "
+            f"{padded_tokens} padded for {real_tokens} real tokens in {elapsed:.3f}s"
+        )
+
+        # accumulated over the calls, a step encodes each category and the cache misses separately
+        totals = self._encode_totals
+        totals["num_calls"] += 1
+        totals["num_texts"] += len(texts)
+        totals["num_batches"] += num_batches
+        totals["real_tokens"] += real_tokens
+        totals["padded_tokens"] += padded_tokens
+        totals["elapsed_s"] += elapsed
+
+        return embeddings
+    
+
+    def _token_lengths(self, texts: list[str]) -> NDArray[np.int64]:
+        encoded = self.tokenizer(
+            texts,
+            add_special_tokens=True,
+            truncation=True,
+            max_length=self.max_input_length,
+        )
+
+        return np.array([len(input_ids) for input_ids in encoded["input_ids"]], dtype=np.int64)
             
 
 class CrossEncoderModelSingleton(metaclass=SingletonMeta):
@@ -119,12 +306,14 @@ class CrossEncoderModelSingleton(metaclass=SingletonMeta):
         self,
         model_id: str = settings.RERANKING_CROSS_ENCODER_MODEL,
         device: str = settings.RAG_MODEL_DEVICE,
+        backend: str = settings.RAG_MODEL_BACKEND,
     ) -> None:
         """
         A singleton that provides a pre-trained cross-encoder model for scoring pairs of texts.
         """
         self._model_id = model_id
         self._device = device
+        self._backend = backend
 
         self._model = CrossEncoder(
             model_name=self._model_id, 
@@ -132,13 +321,56 @@ class CrossEncoderModelSingleton(metaclass=SingletonMeta):
         )
         self._model.model.eval()
 
+        if self._backend == "onnx":
+            self._onnx_model = OnnxCrossEncoderBackend(
+                model=self._model,
+                model_id=self._model_id,
+                quantize=settings.RAG_ONNX_QUANTIZE,
+                cache_dir=Path(settings.RAG_ONNX_CACHE_DIR),
+            )
+        else:
+            self._onnx_model = None
+
+        if settings.RERANK_MICROBATCH_ENABLED:
+            # pairs from concurrent requests are scored together in a single predict call
+            self._batcher = MicroBatcher(
+                self._predict,
+                max_batch_size=settings.RERANK_MICROBATCH_MAX_SIZE,
+                max_wait_ms=settings.RERANK_MICROBATCH_MAX_WAIT_MS,
+                name="cross-encoder-batcher",
+            )
+        else:
+            self._batcher = None
+
+    @property
+    def model_id(self) -> str:
+        return self._model_id
+
+    def batching_stats(self) -> dict:
+        """
+        Returns the queue depth and batch size metrics of the micro-batcher, or an empty dict if it is disabled.
+        """
+        if self._batcher is None:
+            return {}
+
+        return self._batcher.stats()
+
     def __call__(self, pairs: list[tuple[str, str]], to_list: bool = True) -> NDArray[np.float32] | list[float]:
-        scores = self._model.predict(pairs)
+        if self._batcher is not None and len(pairs) > 0:
+            scores = self._batcher(pairs)
+        else:
+            scores = self._predict(pairs)
 
         if to_list:
             scores = scores.tolist()
 
         return scores
+
+    def _predict(self, pairs: list[tuple[str, str]]) -> NDArray[np.float32]:
+        if self._onnx_model is not None:
+            return self._onnx_model.predict(pairs)
+
+        return self._model.predict(pairs, batch_size=max(len(pairs), 32), show_progress_bar=False)
             
             
             
\ No newline at end of file
@@ -0,0 +1,196 @@
+import re
+from abc import ABC, abstractmethod
+from pathlib import Path
+
+import numpy as np
+import torch
+from loguru import logger
+from numpy.typing import NDArray
+from sentence_transformers.SentenceTransformer import SentenceTransformer
+from sentence_transformers.cross_encoder import CrossEncoder
+
+try:
+    import onnxruntime as ort
+    from onnxruntime.quantization import QuantType, quantize_dynamic
+except ImportError:
+    ort = None
+
+
+def _require_onnxruntime() -> None:
+    if ort is None:
+        raise ImportError(
+            "The ONNX backend requires `onnx` and `onnxruntime`. Install them with `poetry install --with onnx`."
+        )
+
+
+class _SentenceEmbeddingExportWrapper(torch.nn.Module):
+    """
+    Exposes the full SentenceTransformer pipeline (transformer + pooling + normalization) as a positional forward,
+    so the exported graph outputs the same sentence embedding as `SentenceTransformer.encode`.
+    """
+
+    def __init__(self, model: SentenceTransformer, input_names: list[str]) -> None:
+        super().__init__()
+        self.model = model
+        self.input_names = input_names
+
+    def forward(self, *inputs: torch.Tensor) -> torch.Tensor:
+        return self.model(dict(zip(self.input_names, inputs)))["sentence_embedding"]
+
+
+class _CrossEncoderExportWrapper(torch.nn.Module):
+    """
+    Exposes the cross-encoder classifier followed by its default activation, as applied by `CrossEncoder.predict`.
+    """
+
+    def __init__(self, model: CrossEncoder, input_names: list[str]) -> None:
+        super().__init__()
+        self.model = model.model
+        self.activation = model.default_activation_function
+        self.input_names = input_names
+
+    def forward(self, *inputs: torch.Tensor) -> torch.Tensor:
+        logits = self.model(**dict(zip(self.input_names, inputs))).logits
+
+        return self.activation(logits)
+
+
+class OnnxModelBackend(ABC):
+    """
+    Base class that exports a PyTorch module to ONNX (optionally int8 dynamically quantized), caches the exported
+    artifact on disk and runs it with ONNX Runtime on CPU.
+    """
+
+    def __init__(self, model_id: str, quantize: bool, cache_dir: Path) -> None:
+        _require_onnxruntime()
+
+        self._model_id = model_id
+        self._quantize = quantize
+        self._cache_dir = Path(cache_dir)
+        self._cache_dir.mkdir(parents=True, exist_ok=True)
+
+    @property
+    def artifact_path(self) -> Path:
+        safe_model_id = re.sub(r"[^\w.-]", "__", self._model_id)
+        suffix = "-int8" if self._quantize else ""
+
+        return self._cache_dir / f"{safe_model_id}{suffix}.onnx"
+
+    def _load_session(self, sample_inputs: dict[str, torch.Tensor]) -> "ort.InferenceSession":
+        path = self.artifact_path
+        if not path.exists():
+            self._export(sample_inputs, path)
+        else:
+            logger.info(f"Loading cached ONNX artifact for {self._model_id} from {path}")
+
+        session_options = ort.SessionOptions()
+        session_options.graph_optimization_level = ort.GraphOptimizationLevel.ORT_ENABLE_ALL
+
+        return ort.InferenceSession(str(path), sess_options=session_options, providers=["CPUExecutionProvider"])
+
+    def _export(self, sample_inputs: dict[str, torch.Tensor], path: Path) -> None:
+        input_names = list(sample_inputs.keys())
+        fp32_path = path.with_name(path.stem.removesuffix("-int8") + "-fp32.onnx") if self._quantize else path
+
+        logger.info(f"Exporting {self._model_id} to ONNX at {fp32_path}")
+        wrapper = self._export_wrapper(input_names).eval()
+        with torch.no_grad():
+            torch.onnx.export(
+                wrapper,
+                tuple(sample_inputs[name] for name in input_names),
+                str(fp32_path),
+                input_names=input_names,
+                output_names=["output"],
+                dynamic_axes={
+                    **{name: {0: "batch", 1: "sequence"} for name in input_names},
+                    "output": {0: "batch"},
+                },
+                opset_version=17,
+            )
+
+        if self._quantize:
+            logger.info(f"Quantizing {self._model_id} to int8 at {path}")
+            quantize_dynamic(str(fp32_path), str(path), weight_type=QuantType.QInt8)
+            fp32_path.unlink(missing_ok=True)
+
+    @abstractmethod
+    def _export_wrapper(self, input_names: list[str]) -> torch.nn.Module:
+        pass
+
+    def _run(self, features: dict[str, torch.Tensor]) -> NDArray[np.float32]:
+        feed = {
+            node.name: features[node.name].cpu().numpy().astype(np.int64)
+            for node in self._session.get_inputs()
+        }
+
+        return self._session.run(None, feed)[0]
+
+
+class OnnxEmbeddingBackend(OnnxModelBackend):
+    """
+    ONNX Runtime replacement for `SentenceTransformer.encode`.
+    """
+
+    def __init__(self, model: SentenceTransformer, model_id: str, quantize: bool, cache_dir: Path) -> None:
+        super().__init__(model_id=model_id, quantize=quantize, cache_dir=cache_dir)
+
+        self._model = model
+        self._session = self._load_session(dict(self._model.tokenize(["warmup"])))
+
+    def _export_wrapper(self, input_names: list[str]) -> torch.nn.Module:
+        return _SentenceEmbeddingExportWrapper(self._model, input_names)
+
+    def encode(self, texts: list[str], batch_size: int = 32) -> NDArray[np.float32]:
+        if len(texts) == 0:
+            return np.empty((0, self._model.get_sentence_embedding_dimension()), dtype=np.float32)
+
+        batches = [
+            self._run(dict(self._model.tokenize(texts[i : i + batch_size])))
+            for i in range(0, len(texts), batch_size)
+        ]
+
+        return np.concatenate(batches).astype(np.float32, copy=False)
+
+
+class OnnxCrossEncoderBackend(OnnxModelBackend):
+    """
+    ONNX Runtime replacement for `CrossEncoder.predict`.
+    """
+
+    def __init__(self, model: CrossEncoder, model_id: str, quantize: bool, cache_dir: Path) -> None:
+        super().__init__(model_id=model_id, quantize=quantize, cache_dir=cache_dir)
+
+        self._model = model
+        self._session = self._load_session(self._tokenize([("warmup query", "warmup document")]))
+
+    def _export_wrapper(self, input_names: list[str]) -> torch.nn.Module:
+        return _CrossEncoderExportWrapper(self._model, input_names)
+
+    def _tokenize(self, pairs: list[tuple[str, str]]) -> dict[str, torch.Tensor]:
+        queries, documents = zip(*pairs)
+
+        return dict(
+            self._model.tokenizer(
+                list(queries),
+                list(documents),
+                padding=True,
+                truncation="longest_first",
+                return_tensors="pt",
+                max_length=self._model.max_length,
+            )
+        )
+
+    def predict(self, pairs: list[tuple[str, str]], batch_size: int = 32) -> NDArray[np.float32]:
+        if len(pairs) == 0:
+            return np.empty(0, dtype=np.float32)
+
+        batches = [
+            self._run(self._tokenize(pairs[i : i + batch_size]))
+            for i in range(0, len(pairs), batch_size)
+        ]
+        scores = np.concatenate(batches).astype(np.float32, copy=False)
+
+        if scores.ndim == 2 and scores.shape[1] == 1:
+            scores = scores[:, 0]
+
+        return scores
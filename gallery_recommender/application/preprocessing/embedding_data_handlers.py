@@ -1,7 +1,13 @@
+import json
 from loguru import logger
 from abc import ABC, abstractmethod
-from typing import Generic, List, TypeVar, cast
+from typing import Generic, List, TypeVar
+
+import numpy as np
+from numpy.typing import NDArray
 from gallery_recommender.application.networks import EmbeddingModelSingleton
+from gallery_recommender.application.networks.cache import normalize_text
+from gallery_recommender.application.utils.cache import LRUCache
 from gallery_recommender.domain.cleaned_data import CleanedExhibitionData, CleanedReflectionData, CleanedData
 from gallery_recommender.domain.embedded_cleaned_data import (
     EmbeddedDocument,
@@ -10,6 +16,7 @@ from gallery_recommender.domain.embedded_cleaned_data import (
 )
 from gallery_recommender.domain.data import DataCategory
 from gallery_recommender.domain.queries import Query, EmbeddedQuery
+from gallery_recommender.settings import settings
 
 DocumentT = TypeVar("DocumentT", bound=CleanedData)
 EmbeddedDocumentT = TypeVar("EmbeddedDocumentT", bound=EmbeddedDocument)
@@ -18,6 +25,12 @@ EmbeddedDocumentT = TypeVar("EmbeddedDocumentT", bound=EmbeddedDocument)
 # Get our embedding model singleton (e.g. a sentence-transformer)
 embedding_model = EmbeddingModelSingleton()
 
+# Rendered user profiles repeat constantly, so query embeddings are kept in memory in front of the model
+query_embedding_cache = LRUCache(
+    max_size=settings.QUERY_EMBEDDING_CACHE_SIZE,
+    ttl_seconds=settings.QUERY_EMBEDDING_CACHE_TTL,
+)
+
 
 class EmbeddingDataHandler(ABC, Generic[DocumentT, EmbeddedDocumentT]):
     """
@@ -38,14 +51,14 @@ class EmbeddingDataHandler(ABC, Generic[DocumentT, EmbeddedDocumentT]):
             else:
                 embedding_inputs = [getattr(dm, "content", "") for dm in data_models]
             logger.info(f"Embedding inputs: {embedding_inputs}")
-            embeddings = embedding_model(embedding_inputs, to_list=True)
+            embeddings = embedding_model(embedding_inputs, to_list=False)
             return [
-                self.map_model(dm, cast(List[float], embeddings[i]))
+                self.map_model(dm, embeddings[i])
                 for i, dm in enumerate(data_models)
             ]
 
     @abstractmethod
-    def map_model(self, data_model: DocumentT, embedding: list[float]) -> EmbeddedDocumentT:
+    def map_model(self, data_model: DocumentT, embedding: NDArray[np.float32]) -> EmbeddedDocumentT:
         """
         Map a raw data model and its embedding into an embedded data model.
         Must be implemented by subclasses.
@@ -53,7 +66,7 @@ class EmbeddingDataHandler(ABC, Generic[DocumentT, EmbeddedDocumentT]):
         pass
 
 class ExhibitionEmbeddingHandler(EmbeddingDataHandler):
-    def map_model(self, data_model: CleanedExhibitionData, embedding: list[float]) -> EmbeddedExhibitionDocument:
+    def map_model(self, data_model: CleanedExhibitionData, embedding: NDArray[np.float32]) -> EmbeddedExhibitionDocument:
         return EmbeddedExhibitionDocument(
             id=data_model.id,
             area=data_model.area,
@@ -83,13 +96,13 @@ class ReflectionEmbeddingHandler(EmbeddingDataHandler[CleanedReflectionData, Emb
     def embed_batch(self, data_models: List[CleanedReflectionData]) -> List[EmbeddedReflectionDocument]:
         # For reflections, we assume the text to embed is in the 'content' field.
         embedding_inputs = [data_model.content for data_model in data_models]
-        embeddings = embedding_model(embedding_inputs, to_list=True)
+        embeddings = embedding_model(embedding_inputs, to_list=False)
         return [
-            self.map_model(data_model, cast(List[float], embedding))
+            self.map_model(data_model, embedding)
             for data_model, embedding in zip(data_models, embeddings)
         ]
 
-    def map_model(self, data_model: CleanedReflectionData, embedding: List[float]) -> EmbeddedReflectionDocument:
+    def map_model(self, data_model: CleanedReflectionData, embedding: NDArray[np.float32]) -> EmbeddedReflectionDocument:
         return EmbeddedReflectionDocument(
             id=data_model.id,
             name=data_model.name,
@@ -105,7 +118,40 @@ class ReflectionEmbeddingHandler(EmbeddingDataHandler[CleanedReflectionData, Emb
     
 
 class QueryEmbeddingHandler(EmbeddingDataHandler):
-    def map_model(self, data_model: Query, embedding: list[float]) -> EmbeddedQuery:
+    def embed_batch(self, data_models: List[Query]) -> List[EmbeddedQuery]:
+        keys = [self._cache_key(data_model) for data_model in data_models]
+        embeddings = [query_embedding_cache.get(key) for key in keys]
+
+        missing_indices = [i for i, embedding in enumerate(embeddings) if embedding is None]
+        if missing_indices:
+            missing_embeddings = embedding_model(
+                [data_models[i].content for i in missing_indices], to_list=False, persistent_cache=False
+            )
+            for i, embedding in zip(missing_indices, missing_embeddings):
+                # the cached array is shared by every later hit, so it is an own read-only copy, not a row of the batch
+                embedding = np.array(embedding, dtype=np.float32)
+                embedding.setflags(write=False)
+                query_embedding_cache.set(keys[i], embedding)
+                embeddings[i] = embedding
+
+        return [
+            self.map_model(data_model, embedding)
+            for data_model, embedding in zip(data_models, embeddings)
+        ]
+
+    @staticmethod
+    def _cache_key(data_model: Query) -> tuple[str, str]:
+        content = data_model.content
+        if isinstance(content, dict):
+            content = json.dumps(content, sort_keys=True, ensure_ascii=False)
+
+        return f"{embedding_model.model_id}@{embedding_model.backend}", normalize_text(content)
+
+    @staticmethod
+    def cache_stats() -> dict:
+        return query_embedding_cache.stats()
+
+    def map_model(self, data_model: Query, embedding: NDArray[np.float32]) -> EmbeddedQuery:
         return EmbeddedQuery(
             id=data_model.id,
             content=data_model.content,
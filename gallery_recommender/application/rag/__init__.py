@@ -1,4 +1,4 @@
-from .retriever import ContextRetriever
+from .retriever import ContextRetriever, get_context_retriever
 from .reranking import Reranker
 
-__all__ = ["ContextRetriever", "Reranker"]
\ No newline at end of file
+__all__ = ["ContextRetriever", "get_context_retriever", "Reranker"]
\ No newline at end of file
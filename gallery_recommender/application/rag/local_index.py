@@ -0,0 +1,249 @@
+import hashlib
+import json
+import time
+from threading import Event, Lock, Thread
+
+import numpy as np
+from loguru import logger
+from numpy.typing import NDArray
+from qdrant_client.models import Record
+
+from gallery_recommender.domain.embedded_cleaned_data import EmbeddedDocument, EmbeddedExhibitionDocument
+from gallery_recommender.infrastructure.db.qdrant import connection
+from gallery_recommender.settings import settings
+
+
+def _payload_hash(payload: dict) -> str:
+    return hashlib.sha1(json.dumps(payload, sort_keys=True, default=str).encode("utf-8")).hexdigest()
+
+
+class _Snapshot:
+    """
+    An immutable view of the collection: a contiguous float32 matrix of unit-norm vectors plus payload columns.
+    A new snapshot is built on every sync and swapped in atomically, so searches never see a half-updated index.
+    """
+
+    def __init__(self, ids: list[str], vectors: NDArray[np.float32], payloads: list[dict], hashes: list[str]) -> None:
+        self.ids = ids
+        self.payloads = payloads
+        self.hashes = hashes
+        self.synced_at = time.monotonic()
+
+        if len(ids) > 0:
+            norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+            norms[norms == 0] = 1.0
+            self.matrix = np.ascontiguousarray(vectors / norms, dtype=np.float32)
+        else:
+            self.matrix = np.empty((0, 0), dtype=np.float32)
+
+        self.positions = {point_id: i for i, point_id in enumerate(ids)}
+        self.start_date_ts = np.array([payload.get("exhibition_start_date_ts", 0.0) for payload in payloads], dtype=np.float64)
+        self.end_date_ts = np.array([payload.get("exhibition_end_date_ts", 0.0) for payload in payloads], dtype=np.float64)
+        self._columns: dict[str, NDArray] = {}
+        self._columns_lock = Lock()
+
+    def column(self, key: str) -> NDArray:
+        with self._columns_lock:
+            if key not in self._columns:
+                self._columns[key] = np.array([str(payload.get(key)) for payload in self.payloads], dtype=object)
+
+        return self._columns[key]
+
+
+class LocalVectorIndex:
+    """
+    An in-process mirror of a Qdrant collection that answers exact cosine top-k queries with a single
+    matrix-vector product. It is loaded by scrolling the collection and kept current by a background sync
+    that only fetches the vectors of new or changed points.
+    """
+
+    def __init__(
+        self,
+        document_class: type[EmbeddedDocument] = EmbeddedExhibitionDocument,
+        sync_interval_s: float = settings.RAG_LOCAL_INDEX_SYNC_INTERVAL,
+        max_staleness_s: float = settings.RAG_LOCAL_INDEX_MAX_STALENESS,
+        page_size: int = 1000,
+    ) -> None:
+        self._document_class = document_class
+        self._collection_name = document_class.get_collection_name()
+        self._sync_interval_s = sync_interval_s
+        self._max_staleness_s = max_staleness_s
+        self._page_size = page_size
+
+        self._snapshot: _Snapshot | None = None
+        self._sync_lock = Lock()
+        self._stop_event = Event()
+        self._sync_thread: Thread | None = None
+
+    def __len__(self) -> int:
+        return len(self._snapshot.ids) if self._snapshot else 0
+
+    def is_fresh(self) -> bool:
+        snapshot = self._snapshot
+
+        return snapshot is not None and time.monotonic() - snapshot.synced_at <= self._max_staleness_s
+
+    def start(self) -> None:
+        """
+        Load the collection and keep it in sync in a background thread.
+        """
+        if self._sync_thread is not None:
+            return
+
+        self._stop_event.clear()
+        self._sync_thread = Thread(target=self._sync_loop, name="local-index-sync", daemon=True)
+        self._sync_thread.start()
+
+    def stop(self) -> None:
+        self._stop_event.set()
+        if self._sync_thread is not None:
+            self._sync_thread.join()
+            self._sync_thread = None
+
+    def _sync_loop(self) -> None:
+        while not self._stop_event.is_set():
+            try:
+                self.sync()
+            except Exception as e:
+                logger.error(f"Failed to sync the local index of '{self._collection_name}': {e}")
+
+            self._stop_event.wait(self._sync_interval_s)
+
+    def sync(self) -> None:
+        """
+        Scroll the payloads of the collection and only fetch the vectors of the points that are new or whose
+        payload changed since the last snapshot. Points that disappeared from the collection are dropped.
+        """
+        with self._sync_lock:
+            start = time.perf_counter()
+            previous = self._snapshot
+            previous_positions = previous.positions if previous else {}
+
+            ids, payloads, hashes = [], [], []
+            for record in self._document_class.iter_records(page_size=self._page_size, with_vectors=False):
+                ids.append(str(record.id))
+                payloads.append(record.payload or {})
+                hashes.append(_payload_hash(record.payload or {}))
+
+            changed_ids = [
+                point_id
+                for point_id, payload_hash in zip(ids, hashes)
+                if point_id not in previous_positions or previous.hashes[previous_positions[point_id]] != payload_hash
+            ]
+            fetched_vectors = self._retrieve_vectors(changed_ids)
+
+            kept, vectors = [], []
+            for i, point_id in enumerate(ids):
+                if point_id in fetched_vectors:
+                    vectors.append(fetched_vectors[point_id])
+                elif point_id in previous_positions:
+                    vectors.append(previous.matrix[previous_positions[point_id]])
+                else:
+                    # deleted between the scroll and the retrieve
+                    continue
+                kept.append(i)
+            ids = [ids[i] for i in kept]
+            payloads = [payloads[i] for i in kept]
+            hashes = [hashes[i] for i in kept]
+
+            matrix = np.vstack(vectors).astype(np.float32, copy=False) if vectors else np.empty((0, 0), dtype=np.float32)
+            self._snapshot = _Snapshot(ids=ids, vectors=matrix, payloads=payloads, hashes=hashes)
+
+            logger.info(
+                f"Synced local index of '{self._collection_name}': {len(ids)} points, "
+                f"{len(changed_ids)} new or changed, in {time.perf_counter() - start:.2f}s"
+            )
+
+    def _retrieve_vectors(self, ids: list[str]) -> dict[str, NDArray[np.float32]]:
+        vectors = {}
+        for i in range(0, len(ids), self._page_size):
+            records = connection.retrieve(
+                collection_name=self._collection_name,
+                ids=ids[i : i + self._page_size],
+                with_payload=False,
+                with_vectors=True,
+            )
+            for record in records:
+                vectors[str(record.id)] = np.asarray(record.vector, dtype=np.float32)
+
+        return vectors
+
+    def get_many(self, ids: list[str]) -> list[EmbeddedDocument] | None:
+        """
+        Hydrate the documents with the given ids from the snapshot, in the order of `ids`.
+        Returns None if any of them is missing, so the caller can fall back to Qdrant.
+        """
+        snapshot = self._snapshot
+        if snapshot is None:
+            return None
+
+        positions = snapshot.positions
+        if any(str(point_id) not in positions for point_id in ids):
+            return None
+
+        return [
+            self._document_class.from_record(
+                Record(id=str(point_id), payload=dict(snapshot.payloads[positions[str(point_id)]]), vector=None),
+                strict=False,
+            )
+            for point_id in ids
+        ]
+
+    def search(
+        self,
+        query_vector: list[float] | NDArray[np.float32],
+        limit: int = 10,
+        filters: dict[str, str | float] | None = None,
+        end_date_gte: float | None = None,
+        start_date_lte: float | None = None,
+    ) -> list[EmbeddedDocument]:
+        """
+        Exact cosine top-k over the snapshot, restricted to the points whose payload matches every filter value,
+        whose exhibition ends on or after `end_date_gte` and starts on or before `start_date_lte`.
+        """
+        snapshot = self._snapshot
+        if snapshot is None or len(snapshot.ids) == 0:
+            return []
+
+        query = np.asarray(query_vector, dtype=np.float32)
+        query = query / (np.linalg.norm(query) or 1.0)
+        scores = snapshot.matrix @ query
+
+        mask = np.ones(len(snapshot.ids), dtype=bool)
+        for key, value in (filters or {}).items():
+            mask &= snapshot.column(key) == str(value)
+        if end_date_gte is not None:
+            mask &= snapshot.end_date_ts >= end_date_gte
+        if start_date_lte is not None:
+            mask &= snapshot.start_date_ts <= start_date_lte
+
+        candidates = np.flatnonzero(mask)
+        if len(candidates) == 0:
+            return []
+
+        limit = min(limit, len(candidates))
+        candidate_scores = scores[candidates]
+        top = np.argpartition(-candidate_scores, limit - 1)[:limit]
+        top = top[np.argsort(-candidate_scores[top])]
+
+        return [
+            self._document_class.from_record(
+                Record(id=snapshot.ids[i], payload=dict(snapshot.payloads[i]), vector=None),
+                strict=False,
+            )
+            for i in candidates[top]
+        ]
+
+
+_local_index: LocalVectorIndex | None = None
+_local_index_lock = Lock()
+
+
+def get_local_index() -> LocalVectorIndex:
+    global _local_index
+
+    with _local_index_lock:
+        if _local_index is None:
+            _local_index = LocalVectorIndex()
+
+    return _local_index
@@ -0,0 +1,203 @@
+import asyncio
+import itertools
+import json
+import time
+from threading import Lock
+
+from loguru import logger
+
+from gallery_recommender.domain.data import MaterializedRecommendationData
+from gallery_recommender.domain.embedded_cleaned_data import EmbeddedDocument, EmbeddedExhibitionDocument
+from gallery_recommender.infrastructure.executors import run_in_stage
+from gallery_recommender.settings import settings
+
+from .local_index import get_local_index
+from .retriever import ContextRetriever
+
+PROFILE_FIELDS = ("level", "reason", "duration", "mood")
+
+
+def profile_key(query: dict | str, filters: dict[str, str] | None) -> str | None:
+    """
+    The canonical key of a (user profile, area) combination, or None if the request falls outside the
+    materialized space, i.e. a free-text query, other query fields or filters other than the area.
+    """
+    filters = filters or {}
+    if not isinstance(query, dict) or set(query.keys()) != set(PROFILE_FIELDS):
+        return None
+    if set(filters.keys()) != {"area"}:
+        return None
+
+    profile = {field: str(query[field]).strip().lower() for field in PROFILE_FIELDS}
+
+    return json.dumps({"area": str(filters["area"]), "profile": profile}, sort_keys=True, ensure_ascii=False)
+
+
+def materialize_recommendations(
+    levels: list[str],
+    reasons: list[str],
+    durations: list[str],
+    moods: list[str],
+    areas: list[str],
+    k: int = 10,
+    retriever: ContextRetriever | None = None,
+) -> int:
+    """
+    Enumerate every profile combination per area, run it through `ContextRetriever.search` and replace the
+    stored table with the reranked exhibition ids. The table is swapped in one step, so the API keeps serving the
+    previous one while the new one is built. Returns the number of materialized combinations.
+    """
+    retriever = retriever or ContextRetriever(mock=False)
+
+    rows = []
+    for area, level, reason, duration, mood in itertools.product(areas, levels, reasons, durations, moods):
+        query = {"level": level, "reason": reason, "duration": duration, "mood": mood}
+        filters = {"area": area}
+        documents = retriever.search(query, k=k, filters=filters)
+
+        rows.append(
+            MaterializedRecommendationData(
+                profile_key=profile_key(query, filters),
+                area=area,
+                profile=query,
+                exhibition_ids=[str(document.id) for document in documents],
+            )
+        )
+
+    if not MaterializedRecommendationData.replace_all(rows):
+        raise RuntimeError("Failed to store the materialized recommendations")
+
+    logger.info(f"Materialized recommendations for {len(rows)} profile combinations")
+
+    return len(rows)
+
+
+def invalidate_materialized_recommendations() -> None:
+    MaterializedRecommendationData.delete_mongodb()
+
+
+class MaterializedRecommendations:
+    """
+    An in-process copy of the materialized table, reloaded every `refresh_interval_s` seconds,
+    that answers the discrete profile space with a dict lookup.
+    """
+
+    def __init__(
+        self,
+        document_class: type[EmbeddedDocument] = EmbeddedExhibitionDocument,
+        refresh_interval_s: float = settings.RAG_MATERIALIZED_REFRESH_INTERVAL,
+    ) -> None:
+        self._document_class = document_class
+        self._refresh_interval_s = refresh_interval_s
+        self._table: dict[str, list[str]] = {}
+        self._loaded_at: float | None = None
+        self._lock = Lock()
+
+    def _refresh_if_needed(self) -> None:
+        with self._lock:
+            if self._loaded_at is not None and time.monotonic() - self._loaded_at < self._refresh_interval_s:
+                return
+
+            rows = MaterializedRecommendationData.bulk_find()
+            self._table = {row.profile_key: row.exhibition_ids for row in rows}
+            self._loaded_at = time.monotonic()
+
+            logger.info(f"Loaded {len(self._table)} materialized recommendations")
+
+    def lookup(self, query: dict | str, filters: dict[str, str] | None = None) -> list[EmbeddedDocument] | None:
+        """
+        Returns the precomputed documents for the request, or None if it has to go through the live path.
+        """
+        key = profile_key(query, filters)
+        if key is None:
+            return None
+
+        self._refresh_if_needed()
+        exhibition_ids = self._table.get(key)
+        if exhibition_ids is None:
+            return None
+
+        documents = None
+        if settings.RAG_LOCAL_INDEX_ENABLED and get_local_index().is_fresh():
+            documents = get_local_index().get_many(exhibition_ids)
+        if documents is None:
+            documents = self._document_class.bulk_retrieve(exhibition_ids, strict=False)
+
+        # exhibitions that ended since the table was built are dropped
+        now = time.time()
+        documents = [
+            document for document in documents if getattr(document, "exhibition_end_date_ts", now) >= now
+        ]
+
+        return documents or None
+
+
+_materialized_recommendations: MaterializedRecommendations | None = None
+_materialized_recommendations_lock = Lock()
+
+
+def get_materialized_recommendations() -> MaterializedRecommendations:
+    global _materialized_recommendations
+
+    with _materialized_recommendations_lock:
+        if _materialized_recommendations is None:
+            _materialized_recommendations = MaterializedRecommendations()
+
+    return _materialized_recommendations
+
+
+async def arecommend(
+    retriever: ContextRetriever, query: dict | str, filters: dict[str, str] | None = None, k: int = 10
+) -> list[EmbeddedDocument]:
+    """
+    The reranked documents of a `/recommend` request, served from the materialized table when it covers the
+    profile and retrieved and reranked live otherwise.
+    """
+    return (await arecommend_many(retriever, [query], [filters], k))[0]
+
+
+async def arecommend_many(
+    retriever: ContextRetriever,
+    queries: list[dict | str],
+    filters: list[dict[str, str] | None] | None = None,
+    k: int = 10,
+) -> list[list[EmbeddedDocument]]:
+    """
+    `arecommend` for many requests at once, in the order of `queries`. The requests the materialized table doesn't
+    cover share one batched retrieval and one cross-encoder call.
+    """
+    filters = filters or [None] * len(queries)
+    assert len(filters) == len(queries), "Expected one filter per query"
+
+    documents: list[list[EmbeddedDocument] | None] = [None] * len(queries)
+    if settings.RAG_MATERIALIZED_ENABLED:
+        materialized = get_materialized_recommendations()
+        documents = list(
+            await asyncio.gather(
+                *(
+                    run_in_stage("retrieval", materialized.lookup, query, query_filters)
+                    for query, query_filters in zip(queries, filters)
+                )
+            )
+        )
+
+    live_indices = [i for i, query_documents in enumerate(documents) if query_documents is None]
+    if live_indices:
+        live_queries = [queries[i] for i in live_indices]
+        query_models, candidates = await retriever.aretrieve_many(live_queries, k, [filters[i] for i in live_indices])
+
+        # only the queries with candidates go through the reranker
+        reranked_indices = [i for i, query_candidates in enumerate(candidates) if query_candidates]
+        reranked = await run_in_stage(
+            "rerank",
+            retriever.rerank_many,
+            [query_models[i] for i in reranked_indices],
+            [candidates[i] for i in reranked_indices],
+            [retriever.keep_top_k(live_queries[i], k) for i in reranked_indices],
+        )
+        for i, query_candidates in enumerate(candidates):
+            documents[live_indices[i]] = query_candidates
+        for i, query_documents in zip(reranked_indices, reranked):
+            documents[live_indices[i]] = query_documents
+
+    return documents
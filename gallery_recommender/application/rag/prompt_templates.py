@@ -283,63 +283,27 @@ class QueryExpansionTemplate(PromptTemplateFactory):
     
 
 class SelfQueryTemplate(PromptTemplateFactory):
-    prompt: str = """You are an AI-powered art discovery assistant designed to create personalized exhibition reports.
-    Your task is to generate a concise and engaging report based on the user's input and the provided gallery and exhibition information.
+    prompt: str = """You are an AI language model assistant. Your task is to extract the search constraints stated in the user question.
+    Only extract what the user explicitly asks for:
+    * area: one of {areas}, or null if no area is mentioned
+    * artist: the full name of the artist, or null if no artist is mentioned
+    * date_from and date_to: the window in which the user wants to visit, as YYYY-MM-DD dates, or null if no dates are mentioned
+    Today is {today}.
 
-    Use the following user inputs to tailor your response:
-    * Art Knowledge Level: {level}
-    * Reason for Gallery Visit: {reason}
-    * Time Available: {time_available}
-    * Current Mood: {mood}
-    For each exhibition, create a detailed report using the following format: 
-
-    [Exhibition Title]
-    [Exhibition Date Range]
-    Use this data to calculate the exhibition date range:
-    Exhibition Start Date: {exhibition_start_date} 
-    Exhibition End Date: {exhibition_end_date}
-
-    Exhibition Theme:
-    [Insert space]
-    [Provide a brief, engaging description of the exhibition's theme. Mention key artistic concepts, inspirations, or philosophical ideas.]
-
-    [Artist Name], [Nationality]
-
-    What you get out of this (two bullets points) 
-
-    • Highlight how the artwork conveys its core message (e.g., exploring human emotions, cultural commentary, etc.)
-    • Explain why this exhibition is valuable in the broader art world or for personal reflection
-
-    Fun facts and surprises (two bullets points) 
-
-    • Share something interesting or unexpected about the artworks or artist (e.g., unique techniques or materials used)
-    • Include a fun fact about the gallery itself (e.g., its history or unique features)
-
-    Why It Connects to You  (two bullets points) 
-
-    • Highlight how this exhibition aligns with the user's reason for visiting (e.g., emotional healing, inspiration, etc.)
-    • Mention how it resonates with their current mood or art knowledge level
-
-    Remember:
-
-    * Keep the report concise and engaging, tailoring it specifically to each exhibition and gallery.
-    * Adapt your language to the user's art knowledge level.
-    * Focus on creating an emotional connection between the user and the artworks.
-    * Emphasize the journey of discovery rather than just factual information.
-    * Don't explicitly restate the user's selections; incorporate them naturally into your response.
-    * Include interesting information about both exhibitions and galleries in your report.
-
-    Additional Input Data:
+    Format the response as JSON exactly as below with no additional text:
+        {{
+            "area": null,
+            "artist": null,
+            "date_from": null,
+            "date_to": null
+        }}
 
-    Exhibition Name - {exhibition_name}
-    Original Exhibition Description - {exhibition_description}
-    Artist Name - {artist_name}
-    Artist Nationality - {artist_nationality}"""
+    User question: {question}"""
 
     def create_template(self, mock: bool = False) -> PromptTemplate:
         return PromptTemplate(
             template=self.prompt,
-            input_variables=["level", "reason", "time_available", "mood", "exhibition_name", "exhibition_description", "artist_name", "artist_nationality"],
+            input_variables=["question", "areas", "today"],
         )
 
 
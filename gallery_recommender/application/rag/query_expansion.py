@@ -0,0 +1,64 @@
+import opik
+from langchain_openai import ChatOpenAI
+from loguru import logger
+
+from gallery_recommender.domain.embedded_cleaned_data import EmbeddedDocument
+from gallery_recommender.domain.queries import Query
+from gallery_recommender.settings import settings
+
+from .base import RAGStep
+from .prompt_templates import QueryExpansionTemplate
+
+# the constant of reciprocal-rank fusion, dampens the weight of the top ranks of any single list
+RRF_K = 60
+
+
+class QueryExpansion(RAGStep):
+    @opik.track(name="QueryExpansion.generate")
+    def generate(self, query: Query, expand_to_n: int) -> list[Query]:
+        """
+        Returns the original query followed by up to `expand_to_n` alternative versions of it.
+        """
+        assert expand_to_n > 0, f"'expand_to_n' should be greater than 0. Got {expand_to_n}."
+
+        if self._mock:
+            return [query for _ in range(expand_to_n + 1)]
+
+        query_expansion_template = QueryExpansionTemplate(expand_to_n=expand_to_n)
+        prompt = query_expansion_template.create_template()
+        model = ChatOpenAI(model=settings.OPENAI_MODEL_ID, api_key=settings.OPENAI_API_KEY, temperature=0)
+
+        chain = prompt | model
+        response = chain.invoke({"question": query.content})
+
+        queries_content = response.content.strip().split(query_expansion_template.seperator)
+        queries = [query]
+        queries += [
+            query.replace_content(stripped_content)
+            for content in queries_content[:expand_to_n]
+            if (stripped_content := content.strip())
+        ]
+
+        logger.info(f"Expanded the query into {len(queries) - 1} alternative queries")
+
+        return queries
+
+
+def reciprocal_rank_fusion(ranked_lists: list[list[EmbeddedDocument]], limit: int | None = None) -> list[EmbeddedDocument]:
+    """
+    Merge several ranked lists of documents into one, deduplicated by id and ordered by the sum of
+    1 / (RRF_K + rank) over the lists each document appears in.
+    """
+    scores: dict[str, float] = {}
+    documents: dict[str, EmbeddedDocument] = {}
+    for ranked_list in ranked_lists:
+        for rank, document in enumerate(ranked_list):
+            document_id = str(document.id)
+            scores[document_id] = scores.get(document_id, 0.0) + 1.0 / (RRF_K + rank + 1)
+            documents.setdefault(document_id, document)
+
+    fused_ids = sorted(scores, key=lambda document_id: scores[document_id], reverse=True)
+    if limit is not None:
+        fused_ids = fused_ids[:limit]
+
+    return [documents[document_id] for document_id in fused_ids]
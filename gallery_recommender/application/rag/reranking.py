@@ -1,10 +1,25 @@
-import opik 
+import hashlib
+
+import opik
+from opik import opik_context
 
 from gallery_recommender.application.networks import CrossEncoderModelSingleton
+from gallery_recommender.application.utils.cache import LRUCache
 from gallery_recommender.domain.embedded_cleaned_data import EmbeddedDocument
 from gallery_recommender.domain.queries import Query
+from gallery_recommender.settings import settings
 
 from .base import RAGStep
+
+# Scores keyed by (model, query hash, document id, description hash). A changed description gets a new key,
+# so stale scores are never served and simply age out of the LRU.
+score_cache = LRUCache(max_size=settings.RERANK_SCORE_CACHE_SIZE, ttl_seconds=settings.RERANK_SCORE_CACHE_TTL)
+
+
+def _content_hash(text: str) -> str:
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+
 class Reranker(RAGStep):
     def __init__(self, mock: bool = False) -> None:
         super().__init__(mock=mock)
@@ -15,13 +30,71 @@ class Reranker(RAGStep):
     def generate(self, query: Query, retrieved_docs: list[EmbeddedDocument], keep_top_k: int) -> list[EmbeddedDocument]:
         if self._mock:
             return retrieved_docs
-        
-        query_doc_tuples = [(query.content, doc.description) for doc in retrieved_docs]
-        scores = self._model(query_doc_tuples)
+
+        scores = self._score(query, retrieved_docs)
 
         scores_query_doc_tuples = list(zip(scores, retrieved_docs))
         scores_query_doc_tuples.sort(key=lambda x: x[0], reverse=True)
 
         ranked_docs = [doc for _, doc in scores_query_doc_tuples[:keep_top_k]]
 
-        return ranked_docs
\ No newline at end of file
+        return ranked_docs
+
+    @opik.track(name="Reranker.generate_many")
+    def generate_many(
+        self, queries: list[Query], retrieved_docs: list[list[EmbeddedDocument]], keep_top_k: list[int]
+    ) -> list[list[EmbeddedDocument]]:
+        """
+        Rerank the candidates of several queries, scoring all their pairs in a single cross-encoder call.
+        """
+        if self._mock:
+            return retrieved_docs
+
+        scores = self._score_many(queries, retrieved_docs)
+
+        ranked_docs = []
+        for query_scores, docs, top_k in zip(scores, retrieved_docs, keep_top_k):
+            scores_query_doc_tuples = sorted(zip(query_scores, docs), key=lambda x: x[0], reverse=True)
+            ranked_docs.append([doc for _, doc in scores_query_doc_tuples[:top_k]])
+
+        return ranked_docs
+
+    def _score(self, query: Query, retrieved_docs: list[EmbeddedDocument]) -> list[float]:
+        return self._score_many([query], [retrieved_docs])[0]
+
+    def _score_many(self, queries: list[Query], retrieved_docs: list[list[EmbeddedDocument]]) -> list[list[float]]:
+        """
+        Score the (query, document) pairs, only running the cross-encoder on the pairs missing from the score cache.
+        """
+        pairs, keys = [], []
+        for query, docs in zip(queries, retrieved_docs):
+            query_hash = _content_hash(str(query.content))
+            for doc in docs:
+                pairs.append((query.content, doc.description))
+                keys.append((self._model.model_id, query_hash, str(doc.id), _content_hash(doc.description)))
+
+        scores = [score_cache.get(key) for key in keys]
+
+        missing_indices = [i for i, score in enumerate(scores) if score is None]
+        if missing_indices:
+            missing_scores = self._model([pairs[i] for i in missing_indices])
+            for i, score in zip(missing_indices, missing_scores):
+                score_cache.set(keys[i], score)
+                scores[i] = score
+
+        opik_context.update_current_span(
+            metadata={
+                "num_pairs": len(keys),
+                "num_cached_pairs": len(keys) - len(missing_indices),
+                "score_cache": score_cache.stats(),
+                "batching": self._model.batching_stats(),
+            }
+        )
+
+        # split the flat scores back per query
+        scores_per_query, offset = [], 0
+        for docs in retrieved_docs:
+            scores_per_query.append(scores[offset : offset + len(docs)])
+            offset += len(docs)
+
+        return scores_per_query
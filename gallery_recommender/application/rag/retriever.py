@@ -1,12 +1,18 @@
 import concurrent.futures
 import math
+import time
+from threading import Lock
+
 import opik
 from loguru import logger 
 from qdrant_client.models import MatchValue, Filter, FieldCondition, Range
-import datetime
 
 from gallery_recommender.application import utils
+from gallery_recommender.application.networks import CrossEncoderModelSingleton, EmbeddingModelSingleton
 from gallery_recommender.application.preprocessing.dispatchers import EmbeddingDispatcher
+from gallery_recommender.application.utils.cache import LRUCache
+from gallery_recommender.infrastructure.executors import run_in_stage
+from gallery_recommender.settings import settings
 from gallery_recommender.domain.embedded_cleaned_data import (
     EmbeddedDocument,
     EmbeddedExhibitionDocument, 
@@ -16,36 +22,284 @@ from gallery_recommender.domain.embedded_cleaned_data import (
 from gallery_recommender.domain.queries import Query, EmbeddedQuery
 
 # TODO: Create Reranker class
+from .local_index import LocalVectorIndex, get_local_index
+from .query_expansion import QueryExpansion, reciprocal_rank_fusion
+from .self_query import DATE_FROM_FILTER, DATE_TO_FILTER, SelfQuery, profile_text
 from .reranking import Reranker 
 
-now = datetime.datetime.now().timestamp()
 
 class ContextRetriever:
     def __init__(self, mock: bool = False) -> None:
         self._reranker = Reranker(mock=mock)
+        self._mock = mock
+
+        self._query_expander = QueryExpansion(mock=mock)
+        self._self_query = SelfQuery(mock=mock)
+        # one LLM call and N + 1 searches per expanded query, for every retrieval running at once. The LLM calls
+        # have their own pool so slow generations can't starve the searches of the other requests
+        self._expansion_executor = concurrent.futures.ThreadPoolExecutor(
+            max_workers=settings.API_RETRIEVAL_CONCURRENCY, thread_name_prefix="query-expansion"
+        )
+        self._expanded_search_executor = concurrent.futures.ThreadPoolExecutor(
+            max_workers=settings.API_RETRIEVAL_CONCURRENCY * (settings.RAG_QUERY_EXPANSION_N + 1),
+            thread_name_prefix="expanded-search",
+        )
+
+        # compiled Qdrant filters, keyed by the filter values and the hour they were built in
+        self._filter_cache = LRUCache(max_size=1024)
+
+    def warmup(self) -> None:
+        """
+        Load the models and run a dummy query through them, so the first request doesn't pay for it.
+        """
+        embedding_model = EmbeddingModelSingleton()
+        cross_encoder_model = CrossEncoderModelSingleton()
+        if self._mock:
+            return
+
+        embedding_model("warmup")
+        cross_encoder_model([("warmup", "warmup")])
+
+        logger.info("ContextRetriever warmed up")
 
     @opik.track(name="ContextRetriever.search")
     def search(
         self,
-        query: dict,
+        query: dict | str,
         k: int = 3,
         filters: dict[str, str] | None = None,
     ) -> list: 
-        query_model = Query.from_dict(query)
-        
-        # insert a metadata extractor if needed
-        duration = getattr(query_model, "duration", None) or query.get("duration")
-        k_documents = self._search(query_model, k, filters)
+        query_model, k_documents = self.retrieve(query, k, filters)
 
         logger.info(f"Retrieved {len(k_documents)} documents successfully")
         logger.info(f"Documents: {k_documents}")
         if len(k_documents) > 0:
-            k_for_rerank = self._k_from_duration(duration)
-            k_documents = self.rerank(query=query_model, retrieved_docs=k_documents, keep_top_k=k_for_rerank)
+            k_documents = self.rerank(query=query_model, retrieved_docs=k_documents, keep_top_k=self.keep_top_k(query, k))
         else:
             k_documents = []
 
         return k_documents
+    
+
+    @opik.track(name="ContextRetriever.retrieve")
+    def retrieve(
+        self,
+        query: dict | str,
+        k: int = 3,
+        filters: dict[str, str] | None = None,
+    ) -> tuple[Query, list[EmbeddedDocument]]:
+        """
+        The retrieval stage of `search`: embeds the query and returns the candidates before reranking.
+        """
+        query_model = Query.from_dict(query) if isinstance(query, dict) else Query.from_str(query)
+        
+        search = self._search_expanded if settings.RAG_QUERY_EXPANSION_ENABLED else self._search
+
+        query_model, search_filters = self._apply_self_query(query, query_model, filters)
+
+        k_documents = search(query_model, k, search_filters)
+        if len(k_documents) == 0 and search_filters is not filters:
+            logger.info("No documents match the self-query filters, retrying with the request filters only")
+            k_documents = search(query_model, k, filters)
+
+        return query_model, k_documents
+    
+
+    @opik.track(name="ContextRetriever.search_many")
+    def search_many(
+        self,
+        queries: list[dict | str],
+        k: int = 3,
+        filters: list[dict[str, str] | None] | None = None,
+    ) -> list[list[EmbeddedDocument]]:
+        """
+        `search` for several queries at once: one batched embedding call, one batched Qdrant search and one
+        cross-encoder call for all the rerank pairs. Results are returned in the order of `queries`.
+        """
+        if len(queries) == 0:
+            return []
+
+        query_models, k_documents = self.retrieve_many(queries, k, filters)
+
+        logger.info(f"Retrieved {sum(len(documents) for documents in k_documents)} documents for {len(queries)} queries")
+
+        # only the queries with candidates go through the reranker
+        indices = [i for i, documents in enumerate(k_documents) if len(documents) > 0]
+        reranked = self.rerank_many(
+            queries=[query_models[i] for i in indices],
+            retrieved_docs=[k_documents[i] for i in indices],
+            keep_top_k=[self.keep_top_k(queries[i], k) for i in indices],
+        )
+
+        results: list[list[EmbeddedDocument]] = [[] for _ in queries]
+        for i, documents in zip(indices, reranked):
+            results[i] = documents
+
+        return results
+
+    @opik.track(name="ContextRetriever.retrieve_many")
+    def retrieve_many(
+        self,
+        queries: list[dict | str],
+        k: int = 3,
+        filters: list[dict[str, str] | None] | None = None,
+    ) -> tuple[list[Query], list[list[EmbeddedDocument]]]:
+        """
+        The retrieval stage of `search_many`: embeds every query in one batch and returns the candidates per query.
+        The self-query runs per query as in `retrieve`. With query expansion enabled every query needs its own
+        expansions and fusion, so the queries go through `retrieve` one by one instead.
+        """
+        filters = filters or [None] * len(queries)
+        assert len(filters) == len(queries), "Expected one filter per query"
+
+        if settings.RAG_QUERY_EXPANSION_ENABLED:
+            retrieved = [self.retrieve(query, k, query_filters) for query, query_filters in zip(queries, filters)]
+
+            return [query_model for query_model, _ in retrieved], [documents for _, documents in retrieved]
+
+        query_models, search_filters = self._self_query_many(queries, filters)
+
+        k_documents = self._search_many(query_models, k, search_filters)
+
+        # same fallback as `retrieve`, in one more batch for the queries whose self-query filters matched nothing
+        retry = self._fallback_indices(k_documents, search_filters, filters)
+        if retry:
+            retried = self._search_many([query_models[i] for i in retry], k, [filters[i] for i in retry])
+            for i, documents in zip(retry, retried):
+                k_documents[i] = documents
+
+        return query_models, k_documents
+
+    @opik.track(name="ContextRetriever.aretrieve")
+    async def aretrieve(
+        self,
+        query: dict | str,
+        k: int = 3,
+        filters: dict[str, str] | None = None,
+    ) -> tuple[Query, list[EmbeddedDocument]]:
+        """
+        `retrieve` for the event loop. The self-query and the embedding run on the retrieval stage executor and the
+        Qdrant search is awaited on the shared async client. Query expansion fuses its searches on its own pools, so
+        with expansion enabled the whole of `retrieve` runs on the stage executor instead.
+        """
+        if settings.RAG_QUERY_EXPANSION_ENABLED:
+            return await run_in_stage("retrieval", self.retrieve, query, k, filters)
+
+        query_models, search_filters, embedded_queries = await run_in_stage(
+            "retrieval", self._embed_many, [query], [filters]
+        )
+        query_model, query_search_filters, embedded_query = query_models[0], search_filters[0], embedded_queries[0]
+
+        k_documents = await self._asearch_embedded(embedded_query, k, query_search_filters)
+        if len(k_documents) == 0 and query_search_filters is not filters:
+            logger.info("No documents match the self-query filters, retrying with the request filters only")
+            k_documents = await self._asearch_embedded(embedded_query, k, filters)
+
+        return query_model, k_documents
+
+    @opik.track(name="ContextRetriever.aretrieve_many")
+    async def aretrieve_many(
+        self,
+        queries: list[dict | str],
+        k: int = 3,
+        filters: list[dict[str, str] | None] | None = None,
+    ) -> tuple[list[Query], list[list[EmbeddedDocument]]]:
+        """
+        `retrieve_many` for the event loop: one batched embedding call on the retrieval stage executor, then one
+        batched search awaited on the shared async Qdrant client. Results are returned in the order of `queries`.
+        """
+        filters = filters or [None] * len(queries)
+        assert len(filters) == len(queries), "Expected one filter per query"
+        if len(queries) == 0:
+            return [], []
+
+        if settings.RAG_QUERY_EXPANSION_ENABLED:
+            return await run_in_stage("retrieval", self.retrieve_many, queries, k, filters)
+
+        query_models, search_filters, embedded_queries = await run_in_stage(
+            "retrieval", self._embed_many, queries, filters
+        )
+
+        k_documents = await self._asearch_embedded_many(embedded_queries, k, search_filters)
+
+        # the embeddings don't depend on the filters, so the fallback batch reuses them
+        retry = self._fallback_indices(k_documents, search_filters, filters)
+        if retry:
+            retried = await self._asearch_embedded_many(
+                [embedded_queries[i] for i in retry], k, [filters[i] for i in retry]
+            )
+            for i, documents in zip(retry, retried):
+                k_documents[i] = documents
+
+        return query_models, k_documents
+
+    def _self_query_many(
+        self, queries: list[dict | str], filters: list[dict[str, str] | None]
+    ) -> tuple[list[Query], list[dict[str, str | float] | None]]:
+        query_models, search_filters = [], []
+        for query, query_filters in zip(queries, filters):
+            query_model = Query.from_dict(query) if isinstance(query, dict) else Query.from_str(query)
+            query_model, query_search_filters = self._apply_self_query(query, query_model, query_filters)
+            query_models.append(query_model)
+            search_filters.append(query_search_filters)
+
+        return query_models, search_filters
+
+    def _embed_many(
+        self, queries: list[dict | str], filters: list[dict[str, str] | None]
+    ) -> tuple[list[Query], list[dict[str, str | float] | None], list[EmbeddedQuery]]:
+        """
+        The blocking part of the async retrieval: the self-query of every query and one batched embedding call.
+        """
+        query_models, search_filters = self._self_query_many(queries, filters)
+        embedded_queries: list[EmbeddedQuery] = EmbeddingDispatcher.dispatch(query_models)
+
+        return query_models, search_filters, embedded_queries
+
+    @staticmethod
+    def _fallback_indices(
+        k_documents: list[list[EmbeddedDocument]],
+        search_filters: list[dict[str, str | float] | None],
+        filters: list[dict[str, str] | None],
+    ) -> list[int]:
+        """
+        The queries to search again with the request filters only, as their self-query filters matched nothing.
+        """
+        retry = [
+            i for i, documents in enumerate(k_documents) if len(documents) == 0 and search_filters[i] is not filters[i]
+        ]
+        if retry:
+            logger.info(f"No documents match the self-query filters of {len(retry)} queries, retrying without them")
+
+        return retry
+
+    def _apply_self_query(
+        self, query: dict | str, query_model: Query, filters: dict[str, str] | None
+    ) -> tuple[Query, dict[str, str | float] | None]:
+        """
+        Constraints typed into a free-text query, or into the free-text fields of a profile, are pushed down into
+        the filter. Explicit filters take precedence. The request filters are returned as-is when nothing is extracted.
+        """
+        if not settings.RAG_SELF_QUERY_ENABLED:
+            return query_model, filters
+
+        text = query if isinstance(query, str) else profile_text(query)
+        query_model = self._self_query.generate(query_model, text=text)
+        extracted_filters = query_model.metadata.get("self_query")
+        if not extracted_filters:
+            return query_model, filters
+
+        return query_model, {**extracted_filters, **(filters or {})}
+
+    def keep_top_k(self, query: dict | str, k: int) -> int:
+        """
+        The number of documents kept after reranking, derived from the visit duration when the query has one.
+        """
+        duration = query.get("duration") if isinstance(query, dict) else None
+        if duration is None:
+            return k
+
+        return self._k_from_duration(duration)
 
 
 
@@ -61,38 +315,258 @@ class ContextRetriever:
         assert k >= 1
         embedded_query: EmbeddedQuery = EmbeddingDispatcher.dispatch(query)
 
-        # build a Qdrant `Filter` if any filters passed
-        if filters:
-            must = [
-                FieldCondition(
-                    key="exhibition_end_date_ts",
-                    range=Range(gte=int(now)),
-                )
-            ]
-            for key, val in filters.items():
-                must.append(
-                    FieldCondition(
-                        key=key,
-                        match=MatchValue(value=str(val)),
-                    )
-                )
-            qdrant_filter = Filter(must=must)
-        else:
-            qdrant_filter = None
+        return self._search_embedded(embedded_query, k, filters)
+
+    def _search_embedded(
+        self,
+        embedded_query: EmbeddedQuery,
+        k: int = 100,
+        filters: dict[str, str | float] | None = None,
+    ) -> list[EmbeddedDocument]:
+        qdrant_filter = self._build_filter(filters)
 
         def _search_data_category(
             data_category_odm: type[EmbeddedDocument], embedded_query: EmbeddedQuery
         ):
+            if data_category_odm is EmbeddedExhibitionDocument:
+                local_index = self._fresh_local_index()
+                if local_index is not None:
+                    return self._search_local_index(local_index, embedded_query, k, filters)
+
+            # the exhibitions were validated by the embedding pipeline that wrote them
             return data_category_odm.search(
                 query_vector=embedded_query.embedding,
                 limit=k // 2,
                 query_filter=qdrant_filter,
+                strict=False,
             )
 
         exhibition_documents = _search_data_category(EmbeddedExhibitionDocument, embedded_query)
 
         return exhibition_documents
 
+    @opik.track(name="ContextRetriever._search_expanded")
+    def _search_expanded(
+        self,
+        query: Query,
+        k: int = 100,
+        filters: dict[str, str | float] | None = None,
+    ) -> list[EmbeddedDocument]:
+        """
+        Search the original query and its LLM expansions concurrently and merge the candidates with reciprocal-rank
+        fusion. The original query is searched while the expansions are generated, and only the expansions whose
+        search finishes within `RAG_QUERY_EXPANSION_BUDGET_MS` are fused in. The original query is waited for up to
+        `RAG_QUERY_EXPANSION_SEARCH_TIMEOUT_MS`.
+        """
+        assert k >= 1
+        deadline = time.monotonic() + settings.RAG_QUERY_EXPANSION_BUDGET_MS / 1000
+
+        original_search = self._expanded_search_executor.submit(self._search, query, k, filters)
+        expansion = self._expansion_executor.submit(
+            self._query_expander.generate, query, settings.RAG_QUERY_EXPANSION_N
+        )
+
+        try:
+            expanded_queries = expansion.result(timeout=max(0.0, deadline - time.monotonic()))[1:]
+        except concurrent.futures.TimeoutError:
+            logger.warning("Query expansion exceeded the latency budget, searching the original query only")
+            expanded_queries = []
+        except Exception as e:
+            logger.error(f"Query expansion failed, searching the original query only: {e}")
+            expanded_queries = []
+
+        expanded_searches = []
+        if expanded_queries:
+            # the expansions are embedded in a single batch, then searched concurrently
+            embedded_queries: list[EmbeddedQuery] = EmbeddingDispatcher.dispatch(expanded_queries)
+            expanded_searches = [
+                self._expanded_search_executor.submit(self._search_embedded, embedded_query, k, filters)
+                for embedded_query in embedded_queries
+            ]
+
+        try:
+            ranked_lists = [original_search.result(timeout=settings.RAG_QUERY_EXPANSION_SEARCH_TIMEOUT_MS / 1000)]
+        except concurrent.futures.TimeoutError:
+            logger.warning("The search of the original query timed out, fusing the expanded searches only")
+            ranked_lists = []
+        if expanded_searches:
+            done, not_done = concurrent.futures.wait(
+                expanded_searches, timeout=max(0.0, deadline - time.monotonic())
+            )
+            ranked_lists += [
+                search.result() for search in expanded_searches if search in done and search.exception() is None
+            ]
+            if not_done:
+                logger.warning(f"Dropped {len(not_done)} expanded searches that exceeded the latency budget")
+
+        # as many candidates as the plain search, so expansion doesn't grow the cost of the reranking
+        return reciprocal_rank_fusion(ranked_lists, limit=k // 2)
+
+    def _search_many(
+        self,
+        queries: list[Query],
+        k: int = 100,
+        filters: list[dict[str, str | float] | None] | None = None,
+    ) -> list[list[EmbeddedDocument]]:
+        """
+        Returns the EmbeddedDocuments of every query, in the order of `queries`
+        """
+        assert k >= 1
+        filters = filters or [None] * len(queries)
+        embedded_queries: list[EmbeddedQuery] = EmbeddingDispatcher.dispatch(queries)
+
+        local_index = self._fresh_local_index()
+        if local_index is not None:
+            return self._search_local_index_many(local_index, embedded_queries, k, filters)
+
+        return EmbeddedExhibitionDocument.search_batch(
+            query_vectors=[embedded_query.embedding for embedded_query in embedded_queries],
+            limit=k // 2,
+            query_filters=[self._build_filter(query_filters) for query_filters in filters],
+            strict=False,
+        )
+
+    async def _asearch_embedded(
+        self,
+        embedded_query: EmbeddedQuery,
+        k: int,
+        filters: dict[str, str | float] | None,
+    ) -> list[EmbeddedDocument]:
+        local_index = self._fresh_local_index()
+        if local_index is not None:
+            return await run_in_stage("retrieval", self._search_local_index, local_index, embedded_query, k, filters)
+
+        return await EmbeddedExhibitionDocument.asearch(
+            query_vector=embedded_query.embedding,
+            limit=k // 2,
+            query_filter=self._build_filter(filters),
+            strict=False,
+        )
+
+    async def _asearch_embedded_many(
+        self,
+        embedded_queries: list[EmbeddedQuery],
+        k: int,
+        filters: list[dict[str, str | float] | None],
+    ) -> list[list[EmbeddedDocument]]:
+        local_index = self._fresh_local_index()
+        if local_index is not None:
+            return await run_in_stage(
+                "retrieval", self._search_local_index_many, local_index, embedded_queries, k, filters
+            )
+
+        return await EmbeddedExhibitionDocument.asearch_batch(
+            query_vectors=[embedded_query.embedding for embedded_query in embedded_queries],
+            limit=k // 2,
+            query_filters=[self._build_filter(query_filters) for query_filters in filters],
+            strict=False,
+        )
+
+    @staticmethod
+    def _fresh_local_index() -> LocalVectorIndex | None:
+        """
+        The in-process index of the exhibitions when it is enabled and fresh, None to search Qdrant instead.
+        """
+        if not settings.RAG_LOCAL_INDEX_ENABLED:
+            return None
+
+        local_index = get_local_index()
+        if local_index.is_fresh():
+            return local_index
+        logger.warning("Local index is stale, falling back to Qdrant")
+
+        return None
+
+    def _search_local_index_many(
+        self,
+        local_index: LocalVectorIndex,
+        embedded_queries: list[EmbeddedQuery],
+        k: int,
+        filters: list[dict[str, str | float] | None],
+    ) -> list[list[EmbeddedDocument]]:
+        return [
+            self._search_local_index(local_index, embedded_query, k, query_filters)
+            for embedded_query, query_filters in zip(embedded_queries, filters)
+        ]
+
+    def _search_local_index(
+        self,
+        local_index: LocalVectorIndex,
+        embedded_query: EmbeddedQuery,
+        k: int,
+        filters: dict[str, str | float] | None,
+    ) -> list[EmbeddedDocument]:
+        match_filters, date_from, date_to = self._split_filters(filters)
+        end_date_gte = self._current_hour() if filters else None
+        if date_from is not None:
+            end_date_gte = max(end_date_gte, float(date_from))
+
+        return local_index.search(
+            query_vector=embedded_query.embedding,
+            limit=k // 2,
+            filters=match_filters,
+            end_date_gte=end_date_gte,
+            start_date_lte=float(date_to) if date_to is not None else None,
+        )
+
+    @staticmethod
+    def _split_filters(
+        filters: dict[str, str | float] | None,
+    ) -> tuple[dict[str, str | float], float | None, float | None]:
+        """
+        Split the visit window extracted by the self-query from the filters matched on payload values.
+        """
+        match_filters = dict(filters or {})
+        date_from = match_filters.pop(DATE_FROM_FILTER, None)
+        date_to = match_filters.pop(DATE_TO_FILTER, None)
+
+        return match_filters, date_from, date_to
+
+    def _build_filter(self, filters: dict[str, str | float] | None) -> Filter | None:
+        """
+        Build a Qdrant `Filter` if any filters passed. Filters are reused for the rest of the hour they were built in,
+        since the end date condition only moves forward by the hour.
+        """
+        if not filters:
+            return None
+
+        now = self._current_hour()
+        key = (frozenset((k, str(v)) for k, v in filters.items()), now)
+        qdrant_filter = self._filter_cache.get(key)
+        if qdrant_filter is not None:
+            return qdrant_filter
+
+        match_filters, date_from, date_to = self._split_filters(filters)
+        must = [
+            FieldCondition(
+                key="exhibition_end_date_ts",
+                range=Range(gte=max(now, float(date_from)) if date_from is not None else now),
+            )
+        ]
+        if date_to is not None:
+            # the exhibition has to open before the end of the visit window
+            must.append(
+                FieldCondition(
+                    key="exhibition_start_date_ts",
+                    range=Range(lte=float(date_to)),
+                )
+            )
+        for field, val in match_filters.items():
+            must.append(
+                FieldCondition(
+                    key=field,
+                    match=MatchValue(value=str(val)),
+                )
+            )
+        qdrant_filter = Filter(must=must)
+        self._filter_cache.set(key, qdrant_filter)
+
+        return qdrant_filter
+
+    @staticmethod
+    def _current_hour() -> int:
+        return int(time.time() // 3600 * 3600)
+
     def rerank(self, query: str | Query, retrieved_docs: list[EmbeddedDocument], keep_top_k: int) -> list[EmbeddedDocument]:
         if isinstance(query, str):
             query = Query.from_str(query)
@@ -104,7 +578,39 @@ class ContextRetriever:
         return reranked_documents
     
 
+    def rerank_many(
+        self, queries: list[Query], retrieved_docs: list[list[EmbeddedDocument]], keep_top_k: list[int]
+    ) -> list[list[EmbeddedDocument]]:
+        if len(queries) == 0:
+            return []
+
+        reranked_documents = self._reranker.generate_many(
+            queries=queries, retrieved_docs=retrieved_docs, keep_top_k=keep_top_k
+        )
+
+        logger.info(f"{sum(len(documents) for documents in reranked_documents)} documents reranked successfully")
+
+        return reranked_documents
+
     def _k_from_duration(self, duration: str) -> int:
         hours = int(duration.split(" ")[0])
         k = math.floor((hours * 60) / 45)
-        return max(1,k)
\ No newline at end of file
+        return max(1,k)
+
+
+_context_retriever: ContextRetriever | None = None
+_context_retriever_lock = Lock()
+
+
+def get_context_retriever() -> ContextRetriever:
+    """
+    Returns the process-wide ContextRetriever. It is stateless apart from thread-safe caches,
+    so a single warm instance is shared by every request.
+    """
+    global _context_retriever
+
+    with _context_retriever_lock:
+        if _context_retriever is None:
+            _context_retriever = ContextRetriever(mock=False)
+
+    return _context_retriever
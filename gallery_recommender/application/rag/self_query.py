@@ -0,0 +1,199 @@
+import datetime
+import json
+import re
+
+import opik
+from langchain_openai import ChatOpenAI
+from loguru import logger
+from pydantic import BaseModel
+
+from gallery_recommender.application.networks.cache import normalize_text
+from gallery_recommender.application.utils.cache import LRUCache
+from gallery_recommender.domain.queries import Query
+from gallery_recommender.settings import settings
+
+from .base import RAGStep
+from .prompt_templates import SelfQueryTemplate
+
+# filter keys of the visit window, turned into range conditions on the exhibition dates by the retriever
+DATE_FROM_FILTER = "visit_from_ts"
+DATE_TO_FILTER = "visit_to_ts"
+
+# extracted filters keyed by (canonical query, day), since relative dates like "tomorrow" move with the day
+self_query_cache = LRUCache(max_size=settings.RAG_SELF_QUERY_CACHE_SIZE, ttl_seconds=24 * 3600.0)
+
+_ISO_DATE = r"(\d{4}-\d{2}-\d{2})"
+_DATE_RANGE_PATTERN = re.compile(rf"(?:from|between)\s+{_ISO_DATE}\s+(?:to|and|until)\s+{_ISO_DATE}")
+_DATE_PATTERN = re.compile(_ISO_DATE)
+_ARTIST_PATTERN = re.compile(
+    r"(?:\bartist\s*[:=]\s*|\b(?:works?|art|paintings?|pieces?|exhibitions?|shows?)\s+by\s+)"
+    r"([A-Z][\w'.-]*(?:\s+[A-Z][\w'.-]*){0,3})"
+)
+
+
+class SelfQueryFilters(BaseModel):
+    area: str | None = None
+    artist: str | None = None
+    date_from: float | None = None
+    date_to: float | None = None
+
+    def is_empty(self) -> bool:
+        return all(value is None for value in self.model_dump().values())
+
+    def to_filters(self) -> dict[str, str | float]:
+        filters = {}
+        if self.area is not None:
+            filters["area"] = self.area
+        if self.artist is not None:
+            filters["artist"] = self.artist
+        if self.date_from is not None:
+            filters[DATE_FROM_FILTER] = self.date_from
+        if self.date_to is not None:
+            filters[DATE_TO_FILTER] = self.date_to
+
+        return filters
+
+
+class SelfQuery(RAGStep):
+    @opik.track(name="SelfQuery.generate")
+    def generate(self, query: Query, text: str | None = None) -> Query:
+        """
+        Returns the query with the extracted filters under `metadata["self_query"]`. The filters are extracted from
+        `text`, the query content by default. The rules run first and the LLM is only asked when they extract
+        nothing and `RAG_SELF_QUERY_LLM_FALLBACK` is set.
+        """
+        text = query.content if text is None else text
+        if self._mock or not isinstance(text, str) or not text.strip():
+            return query
+
+        today = datetime.date.today()
+        key = (normalize_text(text).casefold(), today.isoformat())
+        extracted = self_query_cache.get(key)
+        if extracted is None:
+            extracted = extract_filters(text, today)
+            if extracted.is_empty() and settings.RAG_SELF_QUERY_LLM_FALLBACK:
+                extracted = self._extract_with_llm(text, today)
+            self_query_cache.set(key, extracted)
+
+        if extracted.is_empty():
+            return query
+
+        logger.info(f"Self-query extracted the filters {extracted.model_dump(exclude_none=True)}")
+
+        return Query(id=query.id, content=query.content, metadata={**query.metadata, "self_query": extracted.to_filters()})
+
+    def _extract_with_llm(self, question: str, today: datetime.date) -> SelfQueryFilters:
+        prompt = SelfQueryTemplate().create_template()
+        model = ChatOpenAI(model=settings.OPENAI_MODEL_ID, api_key=settings.OPENAI_API_KEY, temperature=0)
+
+        chain = prompt | model
+        try:
+            response = chain.invoke(
+                {"question": question, "areas": ", ".join(settings.RAG_SELF_QUERY_AREAS), "today": today.isoformat()}
+            )
+            extracted = json.loads(response.content)
+        except Exception as e:
+            logger.error(f"Failed to extract the filters of the query with the LLM: {e}")
+
+            return SelfQueryFilters()
+
+        area = _match_area(str(extracted.get("area") or ""))
+        artist = extracted.get("artist") or None
+        date_from = _parse_date(extracted.get("date_from"))
+        date_to = _parse_date(extracted.get("date_to"))
+
+        return SelfQueryFilters(
+            area=area,
+            artist=artist.strip() if artist else None,
+            date_from=_start_of_day(date_from) if date_from else None,
+            date_to=_end_of_day(date_to) if date_to else None,
+        )
+
+
+def profile_text(profile: dict) -> str:
+    """
+    The free text of a user profile, its string values without the field names, to extract the filters from.
+    """
+    return "\n".join(value.strip() for value in profile.values() if isinstance(value, str) and value.strip())
+
+
+def extract_filters(question: str, today: datetime.date | None = None) -> SelfQueryFilters:
+    """
+    Rule-based extraction of the area, artist and visit window of a free-text query.
+    """
+    today = today or datetime.date.today()
+    date_window = _extract_date_window(question.lower(), today)
+
+    return SelfQueryFilters(
+        area=_match_area(question),
+        artist=_extract_artist(question),
+        date_from=_start_of_day(date_window[0]) if date_window else None,
+        date_to=_end_of_day(date_window[1]) if date_window else None,
+    )
+
+
+def _match_area(text: str) -> str | None:
+    normalized = f" {re.sub(r'[^a-z0-9]+', ' ', text.lower())} "
+    for area in settings.RAG_SELF_QUERY_AREAS:
+        area_words = re.sub(r"[^a-z0-9]+", " ", area.lower()).strip()
+        if area_words and f" {area_words} " in normalized:
+            return area
+
+    return None
+
+
+def _extract_artist(question: str) -> str | None:
+    match = _ARTIST_PATTERN.search(question)
+
+    return match.group(1).strip() if match else None
+
+
+def _extract_date_window(question: str, today: datetime.date) -> tuple[datetime.date, datetime.date] | None:
+    if match := _DATE_RANGE_PATTERN.search(question):
+        date_from, date_to = _parse_date(match.group(1)), _parse_date(match.group(2))
+        if date_from and date_to:
+            return (date_from, date_to) if date_from <= date_to else (date_to, date_from)
+
+    if "today" in question or "tonight" in question:
+        return today, today
+    if "tomorrow" in question:
+        tomorrow = today + datetime.timedelta(days=1)
+        return tomorrow, tomorrow
+    if "weekend" in question:
+        # on a Sunday "this weekend" is today, otherwise the coming Saturday and Sunday
+        if today.weekday() == 6:
+            return today, today
+        saturday = today + datetime.timedelta(days=5 - today.weekday())
+        return saturday, saturday + datetime.timedelta(days=1)
+    if "next week" in question:
+        monday = today + datetime.timedelta(days=7 - today.weekday())
+        return monday, monday + datetime.timedelta(days=6)
+    if "this week" in question:
+        return today, today + datetime.timedelta(days=6 - today.weekday())
+    if "this month" in question:
+        next_month = (today.replace(day=1) + datetime.timedelta(days=32)).replace(day=1)
+        return today, next_month - datetime.timedelta(days=1)
+
+    if match := _DATE_PATTERN.search(question):
+        date = _parse_date(match.group(1))
+        if date:
+            return date, date
+
+    return None
+
+
+def _parse_date(value: str | None) -> datetime.date | None:
+    if not value:
+        return None
+    try:
+        return datetime.date.fromisoformat(str(value))
+    except ValueError:
+        return None
+
+
+def _start_of_day(date: datetime.date) -> float:
+    return datetime.datetime.combine(date, datetime.time.min).timestamp()
+
+
+def _end_of_day(date: datetime.date) -> float:
+    return datetime.datetime.combine(date, datetime.time.max).timestamp()
@@ -1,3 +1,4 @@
 from .misc import flatten, batch, compute_num_tokens
+from .cache import LRUCache
 
-__all__ = ["flatten", "batch", "compute_num_tokens"]
\ No newline at end of file
+__all__ = ["flatten", "batch", "compute_num_tokens", "LRUCache"]
\ No newline at end of file
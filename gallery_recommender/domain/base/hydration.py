@@ -0,0 +1,76 @@
+import datetime
+import functools
+import types
+import uuid
+from typing import Annotated, Any, Callable, Type, TypeVar, Union, get_args, get_origin
+
+import numpy as np
+from pydantic import BaseModel
+
+from gallery_recommender.domain.types import to_float32_array
+
+M = TypeVar("M", bound=BaseModel)
+
+
+def _parse_datetime(value: Any) -> Any:
+    if isinstance(value, str):
+        return datetime.datetime.fromisoformat(value)
+
+    return value
+
+
+def _parse_uuid(value: Any) -> Any:
+    if isinstance(value, str):
+        return uuid.UUID(value)
+
+    return value
+
+
+def _parse_vector(value: Any) -> Any:
+    if value is None:
+        return None
+
+    return to_float32_array(value)
+
+
+def _coercer_for(annotation: Any) -> Callable[[Any], Any] | None:
+    # unwrap Optional[X] / X | None
+    if get_origin(annotation) in (Union, types.UnionType):
+        args = [arg for arg in get_args(annotation) if arg is not type(None)]
+        if len(args) != 1:
+            return None
+        annotation = args[0]
+    if get_origin(annotation) is Annotated:
+        annotation = get_args(annotation)[0]
+
+    if annotation is np.ndarray:
+        return _parse_vector
+    if annotation is datetime.datetime:
+        return _parse_datetime
+    if isinstance(annotation, type) and issubclass(annotation, uuid.UUID):
+        return _parse_uuid
+
+    return None
+
+
+@functools.lru_cache(maxsize=None)
+def _field_coercers(cls: Type[BaseModel]) -> dict[str, Callable[[Any], Any]]:
+    coercers = {}
+    for field_name, field_info in cls.model_fields.items():
+        coercer = _coercer_for(field_info.annotation)
+        if coercer is not None:
+            coercers[field_name] = coercer
+
+    return coercers
+
+
+def construct_trusted(cls: Type[M], data: dict) -> M:
+    """
+    Build a model from data we wrote ourselves without running the full pydantic validation. Only the fields
+    that don't survive the round trip through the database as-is, datetimes, UUIDs and vectors, are coerced.
+    """
+    for field_name, coercer in _field_coercers(cls).items():
+        if field_name in data:
+            data[field_name] = coercer(data[field_name])
+
+    return cls.model_construct(**data)
@@ -1,18 +1,25 @@
 import uuid
 from abc import ABC
-from typing import Generic, Type, TypeVar
+from typing import AsyncIterator, Generic, Iterator, Mapping, Type, TypeVar
 from loguru import logger
 from pydantic import BaseModel, Field
-from pymongo import errors
+from pymongo import IndexModel, UpdateOne, errors
 
 from gallery_recommender.domain.exceptions import ImproperlyConfigured
-from gallery_recommender.infrastructure.db.mongo import connection
+from gallery_recommender.infrastructure.db.mongo import async_connection, connection
 from gallery_recommender.settings import settings
 
+from .hydration import construct_trusted
+
 T = TypeVar("T", bound="NoSQLBaseData")
 
+# a list of the fields to fetch, or a mapping of fields to 0/1 as in MongoDB
+Projection = list[str] | Mapping[str, int]
+Sort = list[tuple[str, int]]
+
 # establishing a connection to the database
 _database = connection.get_database(settings.DATABASE_NAME)
+_async_database = async_connection.get_database(settings.DATABASE_NAME)
 
 # all the other data classes will inherit from this class to interact with the NoSQL database
 class NoSQLBaseData(BaseModel, Generic[T], ABC):
@@ -31,11 +38,17 @@ class NoSQLBaseData(BaseModel, Generic[T], ABC):
     
 
     @classmethod
-    def from_mongo(cls: Type[T], data: dict) -> T:
+    def from_mongo(cls: Type[T], data: dict, strict: bool | None = None) -> T:
         if not data:
             raise ValueError("Data is Empty")
         _id = data.pop("_id")
-        return cls(**dict(data, id=uuid.UUID(str(_id))))
+
+        # validated unless the caller opts out for documents it wrote itself, see `construct_trusted`
+        strict = settings.DATA_STRICT_VALIDATION if strict is None else strict
+        if strict:
+            return cls(**dict(data, id=uuid.UUID(str(_id))))
+
+        return construct_trusted(cls, dict(data, id=uuid.UUID(str(_id))))
     
     def to_mongo(self: T, **kwargs) -> dict:
         # Use model_dump to convert the model to a dict.
@@ -137,6 +150,80 @@ class NoSQLBaseData(BaseModel, Generic[T], ABC):
             return False
         
 
+    # a method to idempotently write data to the database
+    @classmethod
+    def bulk_upsert(cls: Type[T], data: list[T], batch_size: int | None = None, **kwargs) -> list[dict[str, int]]:
+        """
+        Insert the documents or update the stored ones with the same natural key, see `get_natural_key`, in
+        unordered `bulk_write` batches. Returns the inserted, updated, unchanged and failed counts of each batch.
+        """
+        collection = _database[cls.get_collection_name()]
+        natural_key = cls.get_natural_key()
+        batch_size = batch_size or settings.DATABASE_UPSERT_BATCH_SIZE
+
+        batch_counts = []
+        for i in range(0, len(data), batch_size):
+            operations = []
+            for document in data[i : i + batch_size]:
+                fields = document.to_mongo(**kwargs)
+                # the _id is only written on insert, so an updated document keeps the id it is referenced by
+                _id = fields.pop("_id")
+                operations.append(
+                    UpdateOne(
+                        {key: fields[key] for key in natural_key},
+                        {"$set": fields, "$setOnInsert": {"_id": _id}},
+                        upsert=True,
+                    )
+                )
+
+            try:
+                result = collection.bulk_write(operations, ordered=False).bulk_api_result
+                num_errors = 0
+            except errors.BulkWriteError as e:
+                logger.exception(f"Failed to upsert part of a batch of type: {cls.__name__}")
+                result = e.details
+                num_errors = len(result.get("writeErrors", []))
+
+            batch_counts.append(
+                {
+                    "inserted": result.get("nUpserted", 0),
+                    "updated": result.get("nModified", 0),
+                    "unchanged": result.get("nMatched", 0) - result.get("nModified", 0),
+                    "errors": num_errors,
+                }
+            )
+
+        return batch_counts
+
+
+    # a method to swap the whole content of a collection at once
+    @classmethod
+    def replace_all(cls: Type[T], data: list[T], **kwargs) -> bool:
+        """
+        Replace every document of the collection with `data`. The documents are written to a staging collection
+        with the declared indexes, which is then renamed over the live one, so the readers see either the previous
+        or the new documents and never an empty or partially written collection.
+        """
+        collection_name = cls.get_collection_name()
+        staging = _database[f"{collection_name}_staging"]
+        try:
+            # leftovers of an interrupted replace
+            staging.drop()
+            _database.create_collection(staging.name)
+            if cls.get_indexes():
+                staging.create_indexes(cls.get_indexes())
+            if data:
+                staging.insert_many(document.to_mongo(**kwargs) for document in data)
+            staging.rename(collection_name, dropTarget=True)
+
+            return True
+        except errors.PyMongoError:
+            logger.exception(f"Failed to replace the data of type: {cls.__name__}")
+            staging.drop()
+
+            return False
+
+
     # a method to find data in the database
     @classmethod
     def find(cls: Type[T], filter_dict: dict = None, **filter_options) -> T | None:
@@ -160,17 +247,108 @@ class NoSQLBaseData(BaseModel, Generic[T], ABC):
     @classmethod
     def bulk_find(cls: Type[T], filter_dict: dict = None, **filter_options) -> list[T]:
         try: 
-            collection = _database[cls.get_collection_name()]
-            query = filter_dict or filter_options
-            instances = collection.find(query)
-            return [data for instance in instances if (data := cls.from_mongo(instance)) is not None]
+            return list(cls.iter_find(filter_dict, **filter_options))
         
         except errors.OperationFailure:
             logger.error("Failed to retrieve data")
 
             return []
+
+
+    # a method to stream data from the database
+    @classmethod
+    def iter_find(
+        cls: Type[T],
+        filter_dict: dict = None,
+        projection: Projection | None = None,
+        batch_size: int = 1000,
+        sort: Sort | None = None,
+        limit: int = 0,
+        **filter_options,
+    ) -> Iterator[T]:
+        """
+        Yield the matching documents, fetching `batch_size` of them per round trip. With a `projection` only those
+        fields cross the wire and the models are partial, built without validation from the projected fields.
+        """
+        collection = _database[cls.get_collection_name()]
+        query = filter_dict or filter_options
+        projection = _with_id(projection)
+        with collection.find(query, projection=projection, batch_size=batch_size, sort=sort, limit=limit) as cursor:
+            for instance in cursor:
+                yield cls._from_cursor(instance, projection)
         
 
+    # async counterparts, for the FastAPI handlers, sharing one connection pool through `async_connection`
+    @classmethod
+    async def abulk_insert(cls: Type[T], data: list[T], **kwargs) -> bool:
+        collection = _async_database[cls.get_collection_name()]
+        try:
+            await collection.insert_many([data.to_mongo(**kwargs) for data in data])
+
+            return True
+        except (errors.BulkWriteError, errors.WriteError):
+            logger.exception(f"Failed to insert data of type: {cls.__name__}")
+
+            return False
+
+
+    @classmethod
+    async def afind(cls: Type[T], filter_dict: dict = None, **filter_options) -> T | None:
+        collection = _async_database[cls.get_collection_name()]
+        try:
+            query = filter_dict or filter_options
+            instance = await collection.find_one(query)
+
+            if instance:
+                return cls.from_mongo(instance)
+
+            return None
+
+        except errors.OperationFailure:
+            logger.error("Failed to retrieve data")
+
+            return None
+
+
+    @classmethod
+    async def abulk_find(cls: Type[T], filter_dict: dict = None, **filter_options) -> list[T]:
+        try:
+            return [data async for data in cls.aiter_find(filter_dict, **filter_options)]
+
+        except errors.OperationFailure:
+            logger.error("Failed to retrieve data")
+
+            return []
+
+
+    @classmethod
+    async def aiter_find(
+        cls: Type[T],
+        filter_dict: dict = None,
+        projection: Projection | None = None,
+        batch_size: int = 1000,
+        sort: Sort | None = None,
+        limit: int = 0,
+        **filter_options,
+    ) -> AsyncIterator[T]:
+        # the cursor fetches `batch_size` documents per round trip, so the memory stays flat on large collections
+        collection = _async_database[cls.get_collection_name()]
+        query = filter_dict or filter_options
+        projection = _with_id(projection)
+        cursor = collection.find(query, projection=projection, batch_size=batch_size, sort=sort, limit=limit)
+        try:
+            async for instance in cursor:
+                yield cls._from_cursor(instance, projection)
+        finally:
+            await cursor.close()
+
+
+    @classmethod
+    def _from_cursor(cls: Type[T], data: dict, projection: Projection | None) -> T:
+        # a projected document misses required fields, so it can't go through the strict validation
+        return cls.from_mongo(data, strict=False if projection is not None else None)
+
+
     @classmethod
     def get_collection_name(cls: Type[T]) -> str:
         # get the collection name from the class name
@@ -179,3 +357,123 @@ class NoSQLBaseData(BaseModel, Generic[T], ABC):
                 f"Collection name not found in {cls.__name__}.Settings")
         
         return cls.Settings.name
+
+
+    @classmethod
+    def get_indexes(cls: Type[T]) -> list[IndexModel]:
+        if not hasattr(cls, "Settings") or not hasattr(cls.Settings, "indexes"):
+            return []
+
+        return cls.Settings.indexes
+
+
+    @classmethod
+    def ensure_indexes(cls: Type[T], drop_undeclared: bool = False) -> dict[str, list[str]]:
+        """
+        Diff the indexes declared in `Settings.indexes` against the collection's and only create the missing ones
+        and recreate the ones whose keys or options changed. Running it again on an indexed collection is a no-op.
+        Each index name is reported in exactly one of the returned buckets.
+        """
+        collection = _database[cls.get_collection_name()]
+        declared = {index.document["name"]: index for index in cls.get_indexes()}
+        existing = collection.index_information()
+
+        changes = {"created": [], "recreated": [], "dropped": [], "unchanged": [], "failed": []}
+        for name, index in declared.items():
+            if name in existing and _same_index(index.document, existing[name]):
+                changes["unchanged"].append(name)
+                continue
+
+            try:
+                if name in existing:
+                    _recreate_index(collection, index, existing[name])
+                    changes["recreated"].append(name)
+                else:
+                    collection.create_indexes([index])
+                    changes["created"].append(name)
+            except errors.OperationFailure:
+                # e.g. a unique index over documents that are already duplicated. A changed index keeps its old version
+                logger.exception(f"Failed to create the index '{name}' of '{cls.get_collection_name()}'")
+                changes["failed"].append(name)
+
+        if drop_undeclared:
+            for name in existing.keys() - declared.keys() - {"_id_"}:
+                collection.drop_index(name)
+                changes["dropped"].append(name)
+
+        logger.info(f"Ensured the indexes of '{cls.get_collection_name()}': {changes}")
+
+        return changes
+
+
+    @classmethod
+    def get_natural_key(cls: Type[T]) -> tuple[str, ...]:
+        # the fields identifying a document across crawls, `bulk_upsert` matches the stored documents on them
+        if not hasattr(cls, "Settings") or not hasattr(cls.Settings, "natural_key"):
+            raise ImproperlyConfigured(
+                f"Natural key not found in {cls.__name__}.Settings")
+
+        return tuple(cls.Settings.natural_key)
+
+
+def _with_id(projection: Projection | None) -> Projection | None:
+    # the models are built from `_id`, so a projection can't exclude it. MongoDB returns it unless told otherwise
+    if isinstance(projection, Mapping):
+        return {field: value for field, value in projection.items() if field != "_id"}
+
+    return projection
+
+
+# options MongoDB adds to `index_information` on its own
+_SERVER_INDEX_OPTIONS = {"v", "ns", "2dsphereIndexVersion", "textIndexVersion"}
+
+
+def _recreate_index(collection, index: IndexModel, existing: dict) -> None:
+    # MongoDB doesn't keep two indexes on the same keys with different options, so the old index has to be dropped
+    # before the new one is built. The rebuild of a unique index is checked for duplicates first, and the old index
+    # is put back if the build still fails, so a failed change never leaves the collection without the index
+    declared = index.document
+    if declared.get("unique") and _has_duplicates(collection, declared):
+        raise errors.DuplicateKeyError(f"Duplicated keys for the unique index '{declared['name']}'", 11000)
+
+    collection.drop_index(declared["name"])
+    try:
+        collection.create_indexes([index])
+    except errors.OperationFailure:
+        collection.create_indexes([_existing_index(declared["name"], existing)])
+        raise
+
+
+def _has_duplicates(collection, declared: dict) -> bool:
+    pipeline = []
+    if "partialFilterExpression" in declared:
+        pipeline.append({"$match": declared["partialFilterExpression"]})
+    elif declared.get("sparse"):
+        pipeline.append({"$match": {"$or": [{field: {"$exists": True}} for field in declared["key"]]}})
+    pipeline += [
+        {"$group": {"_id": {field.replace(".", "_"): f"${field}" for field in declared["key"]}, "count": {"$sum": 1}}},
+        {"$match": {"count": {"$gt": 1}}},
+        {"$limit": 1},
+    ]
+
+    return any(True for _ in collection.aggregate(pipeline))
+
+
+def _existing_index(name: str, existing: dict) -> IndexModel:
+    options = {
+        option: value for option, value in existing.items() if option != "key" and option not in _SERVER_INDEX_OPTIONS
+    }
+
+    return IndexModel([tuple(key) for key in existing["key"]], name=name, **options)
+
+
+def _same_index(declared: dict, existing: dict) -> bool:
+    if list(declared["key"].items()) != [tuple(key) for key in existing["key"]]:
+        return False
+
+    declared_options = {option: value for option, value in declared.items() if option not in ("key", "name")}
+    existing_options = {
+        option: value for option, value in existing.items() if option != "key" and option not in _SERVER_INDEX_OPTIONS
+    }
+
+    return declared_options == existing_options
@@ -1,22 +1,39 @@
+import asyncio
+import time
 import uuid
 from abc import ABC
-from typing import Any, Callable, Dict, Generic, Type, TypeVar
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, Generic, Iterator, Type, TypeVar
 from uuid import UUID
 
 import numpy as np
 from loguru import logger
 from pydantic import UUID4, BaseModel, Field
-from qdrant_client.http import exceptions
-from qdrant_client.http.models import Distance, VectorParams
+from qdrant_client.http.models import (
+    BinaryQuantization,
+    Distance,
+    HnswConfigDiff,
+    ProductQuantization,
+    ScalarQuantization,
+    SearchParams,
+    VectorParams,
+)
 from qdrant_client.http.models import PayloadSchemaType
-from qdrant_client.models import CollectionInfo, PointStruct, Record
+from qdrant_client.models import CollectionInfo, Filter, PointStruct, Record, SearchRequest
 
 
 from gallery_recommender.application.networks.embeddings import EmbeddingModelSingleton
 from gallery_recommender.domain.exceptions import ImproperlyConfigured
 from gallery_recommender.domain.types import DataCategory
-from gallery_recommender.infrastructure.db.qdrant import connection
-from gallery_recommender.infrastructure.db.qdrant import QdrantDatabaseConnector
+from gallery_recommender.infrastructure.db.qdrant import async_connection, connection
+from gallery_recommender.infrastructure.db.qdrant import (
+    QdrantDatabaseConnector,
+    is_qdrant_error,
+    is_transient_error,
+)
+from gallery_recommender.settings import settings
+
+from .hydration import construct_trusted
 
 T = TypeVar("T", bound="VectorBaseData")
 
@@ -34,7 +51,7 @@ class VectorBaseData(BaseModel, Generic[T], ABC):
         return hash(self.id)
 
     @classmethod
-    def from_record(cls: Type[T], point: Record) -> T:
+    def from_record(cls: Type[T], point: Record, strict: bool | None = None) -> T:
         _id = UUID(point.id, version=4)
         payload = point.payload or {}
 
@@ -45,7 +62,11 @@ class VectorBaseData(BaseModel, Generic[T], ABC):
         if cls._has_class_attribute("embedding"):
             attributes["embedding"] = point.vector or None
 
-        return cls(**attributes)
+        strict = settings.DATA_STRICT_VALIDATION if strict is None else strict
+        if strict:
+            return cls(**attributes)
+
+        return construct_trusted(cls, attributes)
 
     def to_point(self: T, **kwargs) -> PointStruct:
         exclude_unset = kwargs.pop("exclude_unset", False)
@@ -54,9 +75,12 @@ class VectorBaseData(BaseModel, Generic[T], ABC):
         payload = self.model_dump(exclude_unset=exclude_unset, by_alias=by_alias, **kwargs)
 
         _id = str(payload.pop("id"))
-        vector = payload.pop("embedding", {})
-        if vector and isinstance(vector, np.ndarray):
+        vector = payload.pop("embedding", None)
+        # the float32 embedding is only turned into a list of floats here, at the client boundary
+        if isinstance(vector, np.ndarray):
             vector = vector.tolist()
+        elif not vector:
+            vector = {}
 
         return PointStruct(id=_id, vector=vector, payload=payload)
 
@@ -83,7 +107,15 @@ class VectorBaseData(BaseModel, Generic[T], ABC):
     def bulk_insert(cls: Type[T], documents: list["VectorBaseData"]) -> bool:
         try:
             cls._bulk_insert(documents)
-        except exceptions.UnexpectedResponse:
+        except Exception as e:
+            if not is_qdrant_error(e):
+                raise
+            # only a missing collection is worth creating and retrying, ask instead of guessing from the error
+            if connection.collection_exists(collection_name=cls.get_collection_name()):
+                logger.error(f"Failed to insert documents in '{cls.get_collection_name()}': {e}")
+
+                return False
+
             logger.info(
                 f"Collection '{cls.get_collection_name()}' does not exist. Trying to create the collection and reinsert the documents."
             )
@@ -92,7 +124,9 @@ class VectorBaseData(BaseModel, Generic[T], ABC):
 
             try:
                 cls._bulk_insert(documents)
-            except exceptions.UnexpectedResponse:
+            except Exception as e:
+                if not is_qdrant_error(e):
+                    raise
                 logger.error(f"Failed to insert documents in '{cls.get_collection_name()}'.")
 
                 return False
@@ -105,11 +139,112 @@ class VectorBaseData(BaseModel, Generic[T], ABC):
 
         connection.upsert(collection_name=cls.get_collection_name(), points=points)
 
+    @classmethod
+    def bulk_ingest(
+        cls: Type[T],
+        documents: list["VectorBaseData"],
+        max_batch_bytes: int = settings.QDRANT_UPSERT_BATCH_BYTES,
+        max_batch_points: int = settings.QDRANT_UPSERT_MAX_BATCH_POINTS,
+        max_concurrency: int = settings.QDRANT_UPSERT_CONCURRENCY,
+        wait: bool = settings.QDRANT_UPSERT_WAIT,
+        max_retries: int = settings.QDRANT_UPSERT_MAX_RETRIES,
+    ) -> dict:
+        """
+        Upsert many documents with chunks sized by their serialized bytes, sent concurrently by `max_concurrency`
+        workers and retried with exponential backoff on transient errors. With `wait=False` the chunks are only
+        acknowledged, and the last chunk is sent with `wait=True` once the others are acknowledged. Qdrant only
+        orders the updates within a shard, so this barrier makes every point searchable on a single-shard collection
+        only; sharded collections are always upserted with `wait=True`. Returns the ingestion stats.
+        """
+        start = time.perf_counter()
+        if len(documents) == 0:
+            return {"num_points": 0, "num_failed_points": 0, "num_batches": 0, "num_retries": 0, "points_per_second": 0.0}
+
+        collection_info = cls.get_or_create_collection()
+        if (collection_info.config.params.shard_number or 1) > 1:
+            wait = True
+        if QdrantDatabaseConnector.is_embedded():
+            # the embedded engine isn't thread-safe, concurrent upserts corrupt the collection
+            max_concurrency = 1
+
+        batches = cls._batch_points([doc.to_point() for doc in documents], max_batch_bytes, max_batch_points)
+        num_retries = 0
+        failed_points = 0
+
+        def _upsert(points: list[PointStruct], wait_for_batch: bool) -> int:
+            for attempt in range(max_retries + 1):
+                try:
+                    connection.upsert(collection_name=cls.get_collection_name(), points=points, wait=wait_for_batch)
+
+                    return attempt
+                except Exception as e:
+                    if attempt == max_retries or not is_transient_error(e):
+                        raise
+
+                    backoff = 0.5 * 2**attempt
+                    logger.warning(
+                        f"Failed to upsert {len(points)} points into '{cls.get_collection_name()}' ({e}), "
+                        f"retrying in {backoff:.1f}s"
+                    )
+                    time.sleep(backoff)
+
+        # the last batch is held back as the consistency barrier of the non-blocking upserts
+        barrier = batches.pop() if not wait else None
+        with ThreadPoolExecutor(max_workers=max_concurrency, thread_name_prefix="qdrant-upsert") as executor:
+            futures = [(batch, executor.submit(_upsert, batch, wait)) for batch in batches]
+            for batch, future in futures:
+                try:
+                    num_retries += future.result()
+                except Exception as e:
+                    logger.error(f"Failed to insert {len(batch)} points in '{cls.get_collection_name()}': {e}")
+                    failed_points += len(batch)
+
+        if barrier is not None:
+            try:
+                num_retries += _upsert(barrier, True)
+            except Exception as e:
+                logger.error(f"Failed to insert {len(barrier)} points in '{cls.get_collection_name()}': {e}")
+                failed_points += len(barrier)
+            batches.append(barrier)
+
+        duration = time.perf_counter() - start
+        num_points = len(documents) - failed_points
+        stats = {
+            "num_points": num_points,
+            "num_failed_points": failed_points,
+            "num_batches": len(batches),
+            "num_retries": num_retries,
+            "duration_s": round(duration, 3),
+            "points_per_second": round(num_points / duration, 1) if duration > 0 else 0.0,
+        }
+        logger.info(f"Ingested {num_points} points into '{cls.get_collection_name()}': {stats}")
+
+        return stats
+
+    @staticmethod
+    def _batch_points(points: list[PointStruct], max_batch_bytes: int, max_batch_points: int) -> list[list[PointStruct]]:
+        batches, current_batch, current_bytes = [], [], 0
+        for point in points:
+            point_bytes = len(point.model_dump_json())
+            if current_batch and (current_bytes + point_bytes > max_batch_bytes or len(current_batch) >= max_batch_points):
+                batches.append(current_batch)
+                current_batch, current_bytes = [], 0
+
+            current_batch.append(point)
+            current_bytes += point_bytes
+
+        if current_batch:
+            batches.append(current_batch)
+
+        return batches
+
     @classmethod
     def bulk_find(cls: Type[T], limit: int = 10, **kwargs) -> tuple[list[T], UUID | None]:
         try:
             documents, next_offset = cls._bulk_find(limit=limit, **kwargs)
-        except exceptions.UnexpectedResponse:
+        except Exception as e:
+            if not is_qdrant_error(e):
+                raise
             logger.error(f"Failed to search documents in '{cls.get_collection_name()}'.")
 
             documents, next_offset = [], None
@@ -138,30 +273,141 @@ class VectorBaseData(BaseModel, Generic[T], ABC):
         return documents, next_offset
 
     @classmethod
-    def search(cls: Type[T], query_vector: list, limit: int = 10, **kwargs) -> list[T]:
+    def iter_scroll(
+        cls: Type[T],
+        page_size: int = 1000,
+        with_vectors: bool = False,
+        scroll_filter: Filter | None = None,
+        prefetch: bool = True,
+    ) -> Iterator[T]:
+        """
+        Lazily iterate over every document of the collection. See `iter_records`.
+        """
+        for record in cls.iter_records(
+            page_size=page_size, with_payload=True, with_vectors=with_vectors, scroll_filter=scroll_filter, prefetch=prefetch
+        ):
+            yield cls.from_record(record)
+
+    @classmethod
+    def iter_records(
+        cls: Type[T],
+        page_size: int = 1000,
+        with_payload: bool | list[str] = True,
+        with_vectors: bool = False,
+        scroll_filter: Filter | None = None,
+        prefetch: bool = True,
+    ) -> Iterator[Record]:
+        """
+        Lazily iterate over the raw records of the collection, page by page. `with_payload` can be a list of payload
+        fields to only transfer those. With `prefetch`, the next page is fetched in the background while the current
+        one is consumed, so at most two pages are held in memory whatever the size of the collection.
+        """
+        collection_name = cls.get_collection_name()
+
+        def _fetch_page(offset: str | None) -> tuple[list[Record], str | None]:
+            return connection.scroll(
+                collection_name=collection_name,
+                limit=page_size,
+                with_payload=with_payload,
+                with_vectors=with_vectors,
+                scroll_filter=scroll_filter,
+                offset=offset,
+            )
+
+        if not prefetch:
+            offset = None
+            while True:
+                records, offset = _fetch_page(offset)
+                yield from records
+
+                if offset is None:
+                    return
+
+        with ThreadPoolExecutor(max_workers=1, thread_name_prefix=f"{collection_name}-scroll") as executor:
+            next_page = executor.submit(_fetch_page, None)
+            while next_page is not None:
+                records, offset = next_page.result()
+                next_page = executor.submit(_fetch_page, offset) if offset is not None else None
+
+                yield from records
+
+    @classmethod
+    def bulk_retrieve(cls: Type[T], ids: list[str | UUID], strict: bool | None = None, **kwargs) -> list[T]:
+        """
+        Fetch the documents with the given ids, in the order of `ids`. Missing ids are skipped.
+        """
+        try:
+            records = connection.retrieve(
+                collection_name=cls.get_collection_name(),
+                ids=[str(_id) for _id in ids],
+                with_payload=kwargs.pop("with_payload", True),
+                with_vectors=kwargs.pop("with_vectors", False),
+                **kwargs,
+            )
+        except Exception as e:
+            if not is_qdrant_error(e):
+                raise
+            logger.error(f"Failed to retrieve documents in '{cls.get_collection_name()}'.")
+
+            return []
+
+        documents = {str(record.id): cls.from_record(record, strict=strict) for record in records}
+
+        return [documents[str(_id)] for _id in ids if str(_id) in documents]
+
+    @classmethod
+    def search(
+        cls: Type[T],
+        query_vector: list | np.ndarray,
+        limit: int = 10,
+        search_params: SearchParams | None = None,
+        strict: bool | None = None,
+        **kwargs,
+    ) -> list[T]:
+        """
+        `search_params` (hnsw_ef, exact, quantization rescore/oversampling) default to the ones declared on `Config`.
+        `strict` overrides `DATA_STRICT_VALIDATION` for the hydration of the results.
+        """
         try:
-            documents = cls._search(query_vector=query_vector, limit=limit, **kwargs)
-        except exceptions.UnexpectedResponse:
+            documents = cls._search(
+                query_vector=query_vector,
+                limit=limit,
+                search_params=search_params or cls.get_search_params(),
+                strict=strict,
+                **kwargs,
+            )
+        except Exception as e:
+            if not is_qdrant_error(e):
+                raise
             logger.error(f"Failed to search documents in '{cls.get_collection_name()}'.")
             documents = []
 
         return documents
 
     @classmethod
-    def _search(cls: Type[T], query_vector: list, limit: int = 10, **kwargs) -> list[T]:
+    def _search(
+        cls: Type[T],
+        query_vector: list | np.ndarray,
+        limit: int = 10,
+        search_params: SearchParams | None = None,
+        strict: bool | None = None,
+        **kwargs,
+    ) -> list[T]:
         collection_name = cls.get_collection_name()
         
         logger.info(f"Qdrant connection info at search: {QdrantDatabaseConnector.get_connection_info()}")
         try:
             records = connection.search(
             collection_name=collection_name,
-            query_vector=query_vector,
+            # the cached query embeddings are read-only, and the embedded engine normalizes the query in place
+            query_vector=query_vector.tolist() if isinstance(query_vector, np.ndarray) else query_vector,
             limit=limit,
+            search_params=search_params,
             with_payload=kwargs.pop("with_payload", True),
             with_vectors=kwargs.pop("with_vectors", False),
             **kwargs,
             )
-            documents = [cls.from_record(record) for record in records]
+            documents = [cls.from_record(record, strict=strict) for record in records]
         except Exception as e:
             logger.error(f"Failed to search documents in '{cls.get_collection_name()}': {e}")
             documents = []
@@ -169,22 +415,190 @@ class VectorBaseData(BaseModel, Generic[T], ABC):
         return documents
         
 
+    @classmethod
+    def search_batch(
+        cls: Type[T],
+        query_vectors: list[list | np.ndarray],
+        limit: int = 10,
+        query_filters: list[Filter | None] | None = None,
+        search_params: SearchParams | None = None,
+        strict: bool | None = None,
+    ) -> list[list[T]]:
+        """
+        Run several searches in a single round trip. Results are returned in the order of `query_vectors`.
+        """
+        requests = cls._search_requests(query_vectors, limit, query_filters, search_params)
+
+        try:
+            batch_records = connection.search_batch(collection_name=cls.get_collection_name(), requests=requests)
+        except Exception as e:
+            if not is_qdrant_error(e):
+                raise
+            logger.error(f"Failed to search documents in '{cls.get_collection_name()}'.")
+
+            return [[] for _ in query_vectors]
+
+        return [[cls.from_record(record, strict=strict) for record in records] for records in batch_records]
+
+    @classmethod
+    def _search_requests(
+        cls: Type[T],
+        query_vectors: list[list | np.ndarray],
+        limit: int,
+        query_filters: list[Filter | None] | None,
+        search_params: SearchParams | None,
+    ) -> list[SearchRequest]:
+        query_filters = query_filters or [None] * len(query_vectors)
+        search_params = search_params or cls.get_search_params()
+
+        return [
+            SearchRequest(
+                vector=query_vector.tolist() if isinstance(query_vector, np.ndarray) else query_vector,
+                filter=query_filter,
+                params=search_params,
+                limit=limit,
+                with_payload=True,
+                with_vector=False,
+            )
+            for query_vector, query_filter in zip(query_vectors, query_filters)
+        ]
+
+    # async counterparts, for the FastAPI handlers, sharing one connection pool through `async_connection`.
+    # On the embedded engine there is no async client, so they run the sync methods in a thread.
+    @classmethod
+    async def asearch(
+        cls: Type[T],
+        query_vector: list | np.ndarray,
+        limit: int = 10,
+        search_params: SearchParams | None = None,
+        strict: bool | None = None,
+        **kwargs,
+    ) -> list[T]:
+        if async_connection is None:
+            return await asyncio.to_thread(cls.search, query_vector, limit, search_params, strict, **kwargs)
+
+        try:
+            records = await async_connection.search(
+                collection_name=cls.get_collection_name(),
+                query_vector=query_vector.tolist() if isinstance(query_vector, np.ndarray) else query_vector,
+                limit=limit,
+                search_params=search_params or cls.get_search_params(),
+                with_payload=kwargs.pop("with_payload", True),
+                with_vectors=kwargs.pop("with_vectors", False),
+                **kwargs,
+            )
+        except Exception as e:
+            if not is_qdrant_error(e):
+                raise
+            logger.error(f"Failed to search documents in '{cls.get_collection_name()}'.")
+
+            return []
+
+        return [cls.from_record(record, strict=strict) for record in records]
+
+    @classmethod
+    async def asearch_batch(
+        cls: Type[T],
+        query_vectors: list[list | np.ndarray],
+        limit: int = 10,
+        query_filters: list[Filter | None] | None = None,
+        search_params: SearchParams | None = None,
+        strict: bool | None = None,
+    ) -> list[list[T]]:
+        if async_connection is None:
+            return await asyncio.to_thread(cls.search_batch, query_vectors, limit, query_filters, search_params, strict)
+
+        requests = cls._search_requests(query_vectors, limit, query_filters, search_params)
+
+        try:
+            batch_records = await async_connection.search_batch(
+                collection_name=cls.get_collection_name(), requests=requests
+            )
+        except Exception as e:
+            if not is_qdrant_error(e):
+                raise
+            logger.error(f"Failed to search documents in '{cls.get_collection_name()}'.")
+
+            return [[] for _ in query_vectors]
+
+        return [[cls.from_record(record, strict=strict) for record in records] for records in batch_records]
+
+    @classmethod
+    async def abulk_insert(cls: Type[T], documents: list["VectorBaseData"]) -> bool:
+        if async_connection is None:
+            return await asyncio.to_thread(cls.bulk_insert, documents)
+
+        points = [doc.to_point() for doc in documents]
+        try:
+            await async_connection.upsert(collection_name=cls.get_collection_name(), points=points)
+        except Exception as e:
+            if not is_qdrant_error(e):
+                raise
+            if await async_connection.collection_exists(collection_name=cls.get_collection_name()):
+                logger.error(f"Failed to insert documents in '{cls.get_collection_name()}': {e}")
+
+                return False
+
+            logger.info(
+                f"Collection '{cls.get_collection_name()}' does not exist. Trying to create the collection and reinsert the documents."
+            )
+
+            await asyncio.to_thread(cls.get_or_create_collection)
+
+            try:
+                await async_connection.upsert(collection_name=cls.get_collection_name(), points=points)
+            except Exception as e:
+                if not is_qdrant_error(e):
+                    raise
+                logger.error(f"Failed to insert documents in '{cls.get_collection_name()}'.")
+
+                return False
+
+        return True
+
+    @classmethod
+    async def abulk_find(cls: Type[T], limit: int = 10, **kwargs) -> tuple[list[T], UUID | None]:
+        if async_connection is None:
+            return await asyncio.to_thread(cls.bulk_find, limit, **kwargs)
+
+        offset = kwargs.pop("offset", None)
+        try:
+            records, next_offset = await async_connection.scroll(
+                collection_name=cls.get_collection_name(),
+                limit=limit,
+                with_payload=kwargs.pop("with_payload", True),
+                with_vectors=kwargs.pop("with_vectors", False),
+                offset=str(offset) if offset else None,
+                **kwargs,
+            )
+        except Exception as e:
+            if not is_qdrant_error(e):
+                raise
+            logger.error(f"Failed to search documents in '{cls.get_collection_name()}'.")
+
+            return [], None
+
+        documents = [cls.from_record(record) for record in records]
+        if next_offset is not None:
+            next_offset = UUID(next_offset, version=4)
+
+        return documents, next_offset
+
     @classmethod
     def get_or_create_collection(cls: Type[T]) -> CollectionInfo:
         collection_name = cls.get_collection_name()
 
-        try:
-            return connection.get_collection(collection_name=collection_name)
-        except exceptions.UnexpectedResponse:
+        # ask explicitly instead of catching the error of a missing collection, which differs per transport
+        if not connection.collection_exists(collection_name=collection_name):
             use_vector_index = cls.get_use_vector_index()
 
             collection_created = cls._create_collection(
                 collection_name=collection_name, use_vector_index=use_vector_index
             )
             if collection_created is False:
-                raise RuntimeError(f"Couldn't create collection {collection_name}") from None
+                raise RuntimeError(f"Couldn't create collection {collection_name}")
 
-            return connection.get_collection(collection_name=collection_name)
+        return connection.get_collection(collection_name=collection_name)
 
     @classmethod
     def create_collection(cls: Type[T]) -> bool:
@@ -196,13 +610,69 @@ class VectorBaseData(BaseModel, Generic[T], ABC):
     @classmethod
     def _create_collection(cls, collection_name: str, use_vector_index: bool = True) -> bool:
         if use_vector_index is True:
-            vectors_config = VectorParams(size=EmbeddingModelSingleton().embedding_size, distance=Distance.COSINE)
+            vectors_config = VectorParams(
+                size=EmbeddingModelSingleton().embedding_size,
+                distance=Distance.COSINE,
+                on_disk=cls.get_vectors_on_disk(),
+            )
+            hnsw_config = cls.get_hnsw_config()
+            quantization_config = cls.get_quantization_config()
         else:
             vectors_config = {}
+            hnsw_config = None
+            quantization_config = None
 
-        return connection.create_collection(collection_name=collection_name, vectors_config=vectors_config)
+        return connection.create_collection(
+            collection_name=collection_name,
+            vectors_config=vectors_config,
+            hnsw_config=hnsw_config,
+            quantization_config=quantization_config,
+        )
     
 
+    @classmethod
+    def reconcile_payload_indexes(cls: Type[T], drop_undeclared: bool = False) -> dict[str, list[str]]:
+        """
+        Diff the payload indexes declared in `Config.payload_indexes` against the collection's payload schema and
+        only create the missing ones and recreate the ones whose type changed. The undeclared ones, e.g. the keyword
+        index every field used to get, are only dropped when asked. Running it again on a reconciled collection is
+        a no-op.
+        """
+        collection_name = cls.get_collection_name()
+        if QdrantDatabaseConnector.is_embedded():
+            # the embedded engine doesn't build payload indexes, filters are evaluated by scanning
+            logger.info(f"Skipping the payload indexes of '{collection_name}' on the embedded Qdrant")
+
+            return {"created": [], "recreated": [], "dropped": [], "unchanged": []}
+
+        declared = {field: PayloadSchemaType(schema_type) for field, schema_type in cls.get_payload_indexes().items()}
+        existing = {
+            field: PayloadSchemaType(index_info.data_type)
+            for field, index_info in (cls.get_or_create_collection().payload_schema or {}).items()
+        }
+
+        changes = {"created": [], "recreated": [], "dropped": [], "unchanged": []}
+        for field, schema_type in declared.items():
+            if existing.get(field) == schema_type:
+                changes["unchanged"].append(field)
+                continue
+
+            if field in existing:
+                connection.delete_payload_index(collection_name=collection_name, field_name=field)
+                changes["recreated"].append(field)
+            else:
+                changes["created"].append(field)
+            connection.create_payload_index(collection_name=collection_name, field_name=field, field_schema=schema_type)
+
+        if drop_undeclared:
+            for field in existing.keys() - declared.keys():
+                connection.delete_payload_index(collection_name=collection_name, field_name=field)
+                changes["dropped"].append(field)
+
+        logger.info(f"Reconciled the payload indexes of '{collection_name}': {changes}")
+
+        return changes
+
     @classmethod
     def create_payload_schema(cls: Type[T]) -> bool:
         collection_name = cls.get_collection_name()
@@ -248,6 +718,41 @@ class VectorBaseData(BaseModel, Generic[T], ABC):
 
         return cls.Config.use_vector_index
 
+    @classmethod
+    def get_payload_indexes(cls: Type[T]) -> dict[str, PayloadSchemaType]:
+        if not hasattr(cls, "Config") or not hasattr(cls.Config, "payload_indexes"):
+            return {}
+
+        return cls.Config.payload_indexes
+
+    @classmethod
+    def get_hnsw_config(cls: Type[T]) -> HnswConfigDiff | None:
+        if not hasattr(cls, "Config") or not hasattr(cls.Config, "hnsw_config"):
+            return None
+
+        return cls.Config.hnsw_config
+
+    @classmethod
+    def get_quantization_config(cls: Type[T]) -> ScalarQuantization | BinaryQuantization | ProductQuantization | None:
+        if not hasattr(cls, "Config") or not hasattr(cls.Config, "quantization_config"):
+            return None
+
+        return cls.Config.quantization_config
+
+    @classmethod
+    def get_vectors_on_disk(cls: Type[T]) -> bool | None:
+        if not hasattr(cls, "Config") or not hasattr(cls.Config, "vectors_on_disk"):
+            return None
+
+        return cls.Config.vectors_on_disk
+
+    @classmethod
+    def get_search_params(cls: Type[T]) -> SearchParams | None:
+        if not hasattr(cls, "Config") or not hasattr(cls.Config, "search_params"):
+            return None
+
+        return cls.Config.search_params
+
     @classmethod
     def group_by_class(
         cls: Type["VectorBaseData"], documents: list["VectorBaseData"]
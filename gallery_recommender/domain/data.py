@@ -1,6 +1,9 @@
 from abc import ABC
 import datetime
 from pydantic import UUID4, Field
+from pymongo import ASCENDING, IndexModel
+
+from gallery_recommender.settings import settings
 
 from .base import NoSQLBaseData
 from .types import DataCategory
@@ -28,6 +31,8 @@ class GalleryData(Data):
 
     class Settings:
         name = DataCategory.GALLERY
+        natural_key = ("name",)
+        indexes = [IndexModel([("name", ASCENDING)], unique=True)]
 
 
 class ExhibitionData(Data):
@@ -51,6 +56,12 @@ class ExhibitionData(Data):
 
     class Settings:
         name = DataCategory.EXHIBITION
+        natural_key = ("name", "gallery_id")
+        indexes = [
+            IndexModel([("name", ASCENDING), ("gallery_id", ASCENDING)], unique=True),
+            # the active exhibitions, `exhibition_end_date >= now`
+            IndexModel([("exhibition_end_date", ASCENDING)]),
+        ]
 
 
 class UserData(Data):
@@ -75,4 +86,19 @@ class QueryData(Data):
 
 class ReflectionData(Data):
     class Settings:
-        name = DataCategory.REFLECTION
\ No newline at end of file
+        name = DataCategory.REFLECTION
+
+
+class MaterializedRecommendationData(NoSQLBaseData):
+    # precomputed, reranked exhibition ids for one (user profile, area) combination
+    profile_key: str
+    area: str
+    profile: dict
+    exhibition_ids: list[str]
+    # aware UTC, MongoDB's TTL monitor reads a naive datetime as UTC whatever the timezone of the host
+    created_at: datetime.datetime = Field(default_factory=lambda: datetime.datetime.now(datetime.timezone.utc))
+
+    class Settings:
+        name = DataCategory.RECOMMENDATION
+        # a table the pipeline stopped refreshing expires and the requests fall back to the live path
+        indexes = [IndexModel([("created_at", ASCENDING)], expireAfterSeconds=settings.DATABASE_MATERIALIZED_TTL)]
@@ -1,14 +1,23 @@
 from abc import ABC, abstractmethod
 from typing import List, Dict, Any, Optional
 from pydantic import UUID4, Field
+from qdrant_client.http.models import (
+    HnswConfigDiff,
+    PayloadSchemaType,
+    QuantizationSearchParams,
+    ScalarQuantization,
+    ScalarQuantizationConfig,
+    ScalarType,
+    SearchParams,
+)
 import datetime
 
-from .types import DataCategory
+from .types import DataCategory, Float32Array
 from .base import VectorBaseData  # your base vector document class
 
 
 class EmbeddedDocument(VectorBaseData, ABC):
-    embedding: Optional[List[float]] = None
+    embedding: Optional[Float32Array] = None
     metadata: Dict[str, Any] = Field(default_factory=dict)
     id: UUID4
 
@@ -59,6 +68,24 @@ class EmbeddedExhibitionDocument(EmbeddedDocument):
         name = "embedded_exhibitions"
         category = DataCategory.EXHIBITION
         use_vector_index = True
+        # the only payload fields the retriever filters on, see `VectorBaseData.reconcile_payload_indexes`
+        payload_indexes = {
+            "area": PayloadSchemaType.KEYWORD,
+            "artist": PayloadSchemaType.KEYWORD,
+            "exhibition_start_date_ts": PayloadSchemaType.FLOAT,
+            "exhibition_end_date_ts": PayloadSchemaType.FLOAT,
+        }
+        # applied when the collection is created, see tools/vector_search_eval for the recall vs latency trade-off
+        hnsw_config = HnswConfigDiff(m=16, ef_construct=128)
+        quantization_config = ScalarQuantization(
+            scalar=ScalarQuantizationConfig(type=ScalarType.INT8, quantile=0.99, always_ram=True)
+        )
+        vectors_on_disk = False
+        # the int8 candidates are oversampled and rescored with the original vectors
+        search_params = SearchParams(
+            hnsw_ef=128,
+            quantization=QuantizationSearchParams(rescore=True, oversampling=2.0),
+        )
 
 
 class EmbeddedReflectionDocument(EmbeddedDocument):
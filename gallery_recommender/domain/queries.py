@@ -1,6 +1,7 @@
 from pydantic import Field
 
 from gallery_recommender.domain.data import DataCategory
+from gallery_recommender.domain.types import Float32Array
 from gallery_recommender.domain.base import VectorBaseData
 from gallery_recommender.application.utils.misc import query_dict_to_str
 
@@ -30,7 +31,7 @@ class Query(VectorBaseData):
     
 
 class EmbeddedQuery(Query):
-    embedding: list[float]
+    embedding: Float32Array
 
     class Config:
         category = DataCategory.QUERIES
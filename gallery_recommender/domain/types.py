@@ -1,4 +1,9 @@
 from enum import StrEnum
+from typing import Annotated, Any
+
+import numpy as np
+from numpy.typing import NDArray
+from pydantic import PlainSerializer, PlainValidator, WithJsonSchema
 
 
 class DataCategory(StrEnum):
@@ -11,3 +16,28 @@ class DataCategory(StrEnum):
     EXHIBITION = "exhibition"
     USER = "user"
     REFLECTION = "reflection"
+    RECOMMENDATION = "recommendation"
+
+
+def to_float32_array(value: Any) -> NDArray[np.float32]:
+    """
+    Vectors are kept as 1-d float32 arrays. Arrays that already are, e.g. the rows of an encoded batch, are kept
+    as they are instead of being copied.
+    """
+    if isinstance(value, np.ndarray) and value.dtype == np.float32 and value.ndim == 1:
+        return value
+
+    array = np.asarray(value, dtype=np.float32)
+    if array.ndim != 1:
+        raise ValueError(f"Expected a 1-d vector, got an array of shape {array.shape}")
+
+    return array
+
+
+# An embedding stored as a contiguous float32 array, only turned into a list of floats when dumped to JSON
+Float32Array = Annotated[
+    np.ndarray,
+    PlainValidator(to_float32_array),
+    PlainSerializer(lambda array: array.tolist(), return_type=list[float], when_used="json"),
+    WithJsonSchema({"type": "array", "items": {"type": "number"}}),
+]
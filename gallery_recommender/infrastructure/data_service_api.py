@@ -1,23 +1,45 @@
+from contextlib import asynccontextmanager
+
 from fastapi import FastAPI, APIRouter
 from datetime import datetime
 from fastapi.responses import JSONResponse
 from bson.json_util import dumps
 from collections import defaultdict
 
+from gallery_recommender.application.indexing import ensure_indexes
 from gallery_recommender.domain import ExhibitionData
 
-app = FastAPI()
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    ensure_indexes()
+    yield
+
+app = FastAPI(lifespan=lifespan)
 data_router = APIRouter()
 ExhibitionModel = ExhibitionData
 
+# the fields of the exhibition cards, the descriptions are left in the database
+ACTIVE_EXHIBITION_FIELDS = [
+    "name",
+    "area",
+    "latitude",
+    "longitude",
+    "exhibition_start_date",
+    "exhibition_end_date",
+    "exhibition_image_url",
+]
+
 @data_router.get("/exhibitions/active")
-def get_active_exhibitions():
+async def get_active_exhibitions():
     now = datetime.now()
-    active_cursor = ExhibitionModel.bulk_find({"exhibition_end_date": {"$gte": now}})
+    active_cursor = ExhibitionModel.aiter_find(
+        {"exhibition_end_date": {"$gte": now}}, projection=ACTIVE_EXHIBITION_FIELDS
+    )
 
     grouped = defaultdict(list)
 
-    for doc in active_cursor:
+    async for doc in active_cursor:
         area = getattr(doc, "area", "")
         grouped[area].append({
             "uid": str(getattr(doc, "id", "")),
@@ -1,5 +1,5 @@
 from loguru import logger
-from pymongo import MongoClient
+from pymongo import AsyncMongoClient, MongoClient
 from pymongo.errors import ConnectionFailure
 from gallery_recommender.settings import settings
 
@@ -9,7 +9,7 @@ class MongoDatabaseConnector:
     def __new__(cls, *args, **kwargs) -> MongoClient:
         if cls._instance is None:
             try:
-                cls._instance = MongoClient(settings.DATABASE_HOST)
+                cls._instance = MongoClient(settings.DATABASE_HOST, maxPoolSize=settings.DATABASE_MAX_POOL_SIZE)
             except ConnectionFailure as e:
                 logger.error(f"Failed to connect to MongoDB: {e}")
                 raise
@@ -17,5 +17,22 @@ class MongoDatabaseConnector:
         logger.info(f"Connected to MongoDB: {settings.DATABASE_HOST}")
 
         return cls._instance
+
+
+class AsyncMongoDatabaseConnector:
+    _instance: AsyncMongoClient | None = None
+
+    def __new__(cls, *args, **kwargs) -> AsyncMongoClient:
+        if cls._instance is None:
+            try:
+                cls._instance = AsyncMongoClient(settings.DATABASE_HOST, maxPoolSize=settings.DATABASE_MAX_POOL_SIZE)
+            except ConnectionFailure as e:
+                logger.error(f"Failed to connect to MongoDB: {e}")
+                raise
+
+        logger.info(f"Connected to MongoDB (async): {settings.DATABASE_HOST}")
+
+        return cls._instance
     
-connection = MongoDatabaseConnector()
\ No newline at end of file
+connection = MongoDatabaseConnector()
+async_connection = AsyncMongoDatabaseConnector()
@@ -1,12 +1,56 @@
+import re
+
+import grpc
+import httpx
 from loguru import logger
-from qdrant_client import QdrantClient
-from qdrant_client.http.exceptions import UnexpectedResponse
+from qdrant_client import AsyncQdrantClient, QdrantClient
+from qdrant_client.http.exceptions import ResponseHandlingException, UnexpectedResponse
 from qdrant_client.http.models import PayloadSchemaType
 
 
 
 from gallery_recommender.settings import settings
 
+# the errors of a failed request, e.g. on a missing collection: the REST transport raises UnexpectedResponse and
+# the gRPC transport grpc.RpcError
+QDRANT_ERRORS = (UnexpectedResponse, grpc.RpcError)
+
+# the embedded engine raises a bare ValueError on a missing collection
+_EMBEDDED_COLLECTION_NOT_FOUND = re.compile(r"^Collection .+ not found$")
+
+_TRANSIENT_GRPC_CODES = {
+    grpc.StatusCode.UNAVAILABLE,
+    grpc.StatusCode.DEADLINE_EXCEEDED,
+    grpc.StatusCode.RESOURCE_EXHAUSTED,
+    grpc.StatusCode.ABORTED,
+}
+
+
+def is_qdrant_error(error: Exception) -> bool:
+    """
+    Whether an exception is a failed Qdrant request rather than a bug of the caller. Of the ValueErrors, only the
+    one of a missing collection on the embedded engine is, told apart by its message.
+    """
+    if isinstance(error, QDRANT_ERRORS):
+        return True
+
+    return isinstance(error, ValueError) and _EMBEDDED_COLLECTION_NOT_FOUND.match(str(error)) is not None
+
+
+def is_transient_error(error: Exception) -> bool:
+    """
+    Whether a failed request is worth retrying: transport errors, 5xx and 429. A 4xx, e.g. a wrong vector
+    dimension, fails the same way on every attempt.
+    """
+    if isinstance(error, UnexpectedResponse):
+        return error.status_code is None or error.status_code >= 500 or error.status_code == 429
+    if isinstance(error, grpc.RpcError):
+        return error.code() in _TRANSIENT_GRPC_CODES
+
+    # the REST client wraps the httpx transport errors
+    return isinstance(error, (ResponseHandlingException, httpx.TransportError, ConnectionError, TimeoutError))
+
+
 class QdrantDatabaseConnector:
     _instance: QdrantClient | None = None
     _last_info = {}
@@ -14,7 +58,21 @@ class QdrantDatabaseConnector:
     def __new__(cls, *args, **kwargs) -> QdrantClient:
         if cls._instance is None:
             try:
-                if settings.USE_QDRANT_CLOUD:
+                if settings.QDRANT_LOCAL_PATH:
+                    cls._last_info = {
+                    "mode": "embedded",
+                    "uri": settings.QDRANT_LOCAL_PATH,
+                    "api_key": None,
+                    }
+                    if settings.QDRANT_LOCAL_PATH == ":memory:":
+                        cls._instance = QdrantClient(location=":memory:")
+                    else:
+                        cls._instance = QdrantClient(path=settings.QDRANT_LOCAL_PATH)
+
+                    logger.info(
+                        f"Connection to Qdrant EMBEDDED: {settings.QDRANT_LOCAL_PATH} | No server required."
+                    )
+                elif settings.USE_QDRANT_CLOUD:
                     api_key = settings.QDRANT_APIKEY
                     # Mask the API key except last 4 chars
                     api_key_masked = f"{api_key[:4]}...{api_key[-4:]}" if api_key else None
@@ -22,11 +80,9 @@ class QdrantDatabaseConnector:
                     "mode": "cloud",
                     "uri": settings.QDRANT_CLOUD_URL,
                     "api_key": api_key_masked,
+                    "transport": "grpc" if settings.QDRANT_PREFER_GRPC else "rest",
                     }
-                    cls._instance = QdrantClient(
-                        url=settings.QDRANT_CLOUD_URL,
-                        api_key=api_key,
-                    )
+                    cls._instance = QdrantClient(**cls.client_kwargs())
                     uri = settings.QDRANT_CLOUD_URL
 
                     logger.info(
@@ -37,11 +93,9 @@ class QdrantDatabaseConnector:
                     "mode": "local",
                     "uri": f"{settings.QDRANT_DATABASE_HOST}:{settings.QDRANT_DATABASE_PORT}",
                     "api_key": None,
+                    "transport": "grpc" if settings.QDRANT_PREFER_GRPC else "rest",
                     }
-                    cls._instance = QdrantClient(
-                        host=settings.QDRANT_DATABASE_HOST,
-                        port=settings.QDRANT_DATABASE_PORT,
-                    )
+                    cls._instance = QdrantClient(**cls.client_kwargs())
                     uri = f"{settings.QDRANT_DATABASE_HOST}:{settings.QDRANT_DATABASE_PORT}"
 
                     logger.info(
@@ -57,11 +111,60 @@ class QdrantDatabaseConnector:
                 raise
 
         return cls._instance
-    
+
+    @classmethod
+    def client_kwargs(cls) -> dict:
+        """
+        The arguments of a client connecting to the configured Qdrant server, shared by the sync and async clients.
+        """
+        if settings.USE_QDRANT_CLOUD:
+            kwargs = {"url": settings.QDRANT_CLOUD_URL, "api_key": settings.QDRANT_APIKEY}
+        else:
+            kwargs = {"host": settings.QDRANT_DATABASE_HOST, "port": settings.QDRANT_DATABASE_PORT}
+
+        return {
+            **kwargs,
+            "prefer_grpc": settings.QDRANT_PREFER_GRPC,
+            "grpc_port": settings.QDRANT_GRPC_PORT,
+            "timeout": settings.QDRANT_TIMEOUT,
+            # keep the REST connections alive, the client disables keep-alive for localhost by default
+            "limits": httpx.Limits(
+                max_connections=settings.QDRANT_POOL_SIZE, max_keepalive_connections=settings.QDRANT_POOL_SIZE
+            ),
+            # ping the idle gRPC channel so it isn't silently dropped by load balancers
+            "grpc_options": {
+                "grpc.keepalive_time_ms": settings.QDRANT_GRPC_KEEPALIVE_MS,
+                "grpc.keepalive_permit_without_calls": 1,
+                "grpc.http2.max_pings_without_data": 0,
+            },
+        }
+
     @classmethod
     def get_connection_info(cls):
         return cls._last_info
-    
 
-    
-connection = QdrantDatabaseConnector()
\ No newline at end of file
+    @classmethod
+    def is_embedded(cls) -> bool:
+        return cls._last_info.get("mode") == "embedded"
+
+
+class AsyncQdrantDatabaseConnector:
+    """
+    One AsyncQdrantClient, and so one connection pool, for every coroutine of the process. The embedded engine
+    can't be opened twice, so in embedded mode there is no async client and the async methods of `VectorBaseData`
+    run the sync ones in a thread instead.
+    """
+
+    _instance: AsyncQdrantClient | None = None
+
+    def __new__(cls, *args, **kwargs) -> AsyncQdrantClient | None:
+        if cls._instance is None and not settings.QDRANT_LOCAL_PATH:
+            cls._instance = AsyncQdrantClient(**QdrantDatabaseConnector.client_kwargs())
+
+            logger.info(f"Async connection to Qdrant: {QdrantDatabaseConnector.get_connection_info().get('uri')}")
+
+        return cls._instance
+
+
+connection = QdrantDatabaseConnector()
+async_connection = AsyncQdrantDatabaseConnector()
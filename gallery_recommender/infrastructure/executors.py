@@ -0,0 +1,71 @@
+import asyncio
+import contextvars
+import functools
+from concurrent.futures import ThreadPoolExecutor
+from threading import Lock
+from typing import Any, Callable, TypeVar
+
+from loguru import logger
+
+from gallery_recommender.settings import settings
+
+R = TypeVar("R")
+
+
+class StageExecutor:
+    """
+    A bounded thread pool for one stage of a request (retrieval, rerank, db, ...).
+    Blocking calls are awaited from the event loop without stalling the other connections,
+    and at most `max_concurrency` calls of the stage run at the same time.
+    """
+
+    def __init__(self, name: str, max_concurrency: int) -> None:
+        self._name = name
+        self._max_concurrency = max_concurrency
+        self._executor = ThreadPoolExecutor(max_workers=max_concurrency, thread_name_prefix=f"{name}-stage")
+
+    async def run(self, fn: Callable[..., R], *args: Any, **kwargs: Any) -> R:
+        loop = asyncio.get_running_loop()
+        # copy the context so opik traces started in the request are continued inside the worker thread
+        context = contextvars.copy_context()
+        call = functools.partial(context.run, fn, *args, **kwargs)
+
+        return await loop.run_in_executor(self._executor, call)
+
+    def shutdown(self) -> None:
+        self._executor.shutdown(wait=True, cancel_futures=True)
+
+
+_STAGE_CONCURRENCY = {
+    "retrieval": lambda: settings.API_RETRIEVAL_CONCURRENCY,
+    "rerank": lambda: settings.API_RERANK_CONCURRENCY,
+    "db": lambda: settings.API_DB_CONCURRENCY,
+    "tasks": lambda: settings.API_TASKS_CONCURRENCY,
+    "llm": lambda: settings.API_LLM_CONCURRENCY,
+}
+
+_executors: dict[str, StageExecutor] = {}
+_lock = Lock()
+
+
+def get_stage_executor(stage: str) -> StageExecutor:
+    if stage not in _STAGE_CONCURRENCY:
+        raise ValueError(f"Unknown stage: {stage}. Expected one of {list(_STAGE_CONCURRENCY)}")
+
+    with _lock:
+        if stage not in _executors:
+            _executors[stage] = StageExecutor(stage, _STAGE_CONCURRENCY[stage]())
+
+    return _executors[stage]
+
+
+async def run_in_stage(stage: str, fn: Callable[..., R], *args: Any, **kwargs: Any) -> R:
+    return await get_stage_executor(stage).run(fn, *args, **kwargs)
+
+
+def shutdown_stage_executors() -> None:
+    with _lock:
+        for stage, executor in _executors.items():
+            logger.info(f"Shutting down the {stage} stage executor")
+            executor.shutdown()
+        _executors.clear()
@@ -1,10 +1,11 @@
 from loguru import logger
+import asyncio
 import os
 import datetime
 from openai import OpenAI, AsyncOpenAI
 from comet_ml import Experiment
 from opik.integrations.openai import track_openai
-from fastapi import FastAPI, HTTPException, WebSocket, WebSocketDisconnect, APIRouter
+from fastapi import FastAPI, HTTPException, WebSocket, WebSocketDisconnect, APIRouter, Depends, Request
 from fastapi.responses import StreamingResponse, HTMLResponse
 from pydantic import BaseModel
 import opik
@@ -16,13 +17,19 @@ from gallery_recommender.infrastructure.gcp.deploy.storage import save_report, f
 import json
 
 from gallery_recommender import settings
-from gallery_recommender.application.rag import ContextRetriever
-from gallery_recommender.infrastructure.db.qdrant import QdrantDatabaseConnector
+from gallery_recommender.application.indexing import ensure_indexes, initialize_indices
+from gallery_recommender.application.rag import ContextRetriever, get_context_retriever
+from gallery_recommender.application.rag.local_index import get_local_index
+from gallery_recommender.application.rag.materialized import arecommend, arecommend_many
+from gallery_recommender.application.rag.reranking import score_cache
+from gallery_recommender.application.networks import CrossEncoderModelSingleton
+from gallery_recommender.application.preprocessing.embedding_data_handlers import QueryEmbeddingHandler
+from gallery_recommender.infrastructure.db.qdrant import async_connection as async_qdrant_connection
+from gallery_recommender.infrastructure.executors import run_in_stage, shutdown_stage_executors
 from gallery_recommender.model.inference import InferenceExecutor, ChatGPTInference
 from gallery_recommender.application.utils import misc
 from gallery_recommender.infrastructure.opik_utils import configure_opik
 from gallery_recommender.domain.data import GalleryData, ExhibitionData, ReflectionData
-from gallery_recommender.domain.embedded_cleaned_data import EmbeddedExhibitionDocument
 from gallery_recommender.application.rag.prompt_templates import ExhibitionReportTemplate, RecommendationTemplate, UnlistedExhibitionReportTemplate
 
 os.environ["TOKENIZERS_PARALLELISM"] = "false"
@@ -54,27 +61,21 @@ class OpenAIInference(ChatGPTInference):
 
 
 
-def initialize_indices():
-    filterable_fields = list(EmbeddedExhibitionDocument.model_fields.keys())
-
-    for field in filterable_fields:
-        try:
-            QdrantDatabaseConnector._instance.create_payload_index(
-            collection_name=EmbeddedExhibitionDocument.Config.name,
-            field_name=field,
-            field_type="keyword" if field != "exhibition_start_date_ts" and field != "exhibition_end_date_ts" else "float",  # or "integer", "float" as needed
-            )
-            logger.info(f"Created index for field: {field}")
-        except Exception as e:
-            logger.warning(f"Index for {field} may already exist or failed to create: {e}")
-
-
-
 # app = FastAPI()
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     initialize_indices()
+    ensure_indexes()
+    app.state.context_retriever = get_context_retriever()
+    app.state.context_retriever.warmup()
+    if settings.RAG_LOCAL_INDEX_ENABLED:
+        get_local_index().start()
     yield
+    if settings.RAG_LOCAL_INDEX_ENABLED:
+        get_local_index().stop()
+    shutdown_stage_executors()
+    if async_qdrant_connection is not None:
+        await async_qdrant_connection.close()
 
 app = FastAPI(lifespan=lifespan)
 recommend_router = APIRouter()
@@ -86,6 +87,9 @@ class QueryRequest(BaseModel):
     uid: Optional[str] = None
     create_report: Optional[bool] = False
 
+class BatchQueryRequest(BaseModel):
+    requests: List[QueryRequest]
+
 class QueryResponse(BaseModel):
     report: dict
 
@@ -93,6 +97,12 @@ class StreamRequest(BaseModel):
     query: str
     filters: Optional[Dict[str, str]] = None
 
+def get_retriever(request: Request) -> ContextRetriever:
+    retriever = getattr(request.app.state, "context_retriever", None)
+
+    return retriever or get_context_retriever()
+
+
 @opik.track
 def call_llm_service(query: dict, context: str, prompt_template: str, filters: dict = None) -> dict:
     llm = OpenAIInference(query, settings.OPENAI_MODEL_ID, openai.api_key)
@@ -101,60 +111,47 @@ def call_llm_service(query: dict, context: str, prompt_template: str, filters: d
 
 @opik.track
 def rag(query: dict) -> str:
-    retriever = ContextRetriever(mock=False)
+    retriever = get_context_retriever()
     docs = retriever.search(query, k=3)
     context = " ".join([d.description for d in docs])
     report= call_llm_service(query, filters, context)
     return report
 
 
+async def _find_gallery(gallery_id: str) -> GalleryData | None:
+    try:
+        logger.info(f"Gallery ID: {gallery_id}")
+        gallery = await GalleryModel.afind(_id=str(gallery_id))
+        logger.info(f"Gallery found: {gallery}")
+        return gallery
+    except Exception as e:
+        logger.info(f"Gallery not found: {e}")
+        return None
+
+
+def _create_report_task(uid: str, query: dict) -> None:
+    try:
+        logger.info(f"Query type before task: {type(query)}")
+        create_task(uid, {"query": query}, create_report=False)
+        logger.info(f"Task created for {uid}")
+    except Exception as e:
+        logger.error(f"Error in creating task for {uid}: {e}")
+
+
 @recommend_router.post("/recommend")
-async def recommend_endpoint(req: QueryRequest):
+async def recommend_endpoint(req: QueryRequest, retriever: ContextRetriever = Depends(get_retriever)):
     # session_id = str(uuid.uuid4())
     try:
-        retriever = ContextRetriever(mock=False)
-        docs = retriever.search(req.query, k=10, filters=req.filters)
-        flat_cards = []
-        for doc in docs:
-            gallery = {}
-            try:
-                gallery_id = str(doc.gallery_id)
-                logger.info(f"Gallery ID: {gallery_id}")
-                gallery = GalleryModel.find(_id=str(gallery_id))
-                logger.info(f"Gallery found: {gallery}")
-            except Exception as e:
-                logger.info(f"Gallery not found: {e}")
-                gallery = {}
-
-            card = {
-                "UID": str(getattr(doc, "id", "")),
-                "descriptions": getattr(doc, "description", "") if doc else "",
-                "Gallery Name English": getattr(gallery, "name_english", "") if gallery else "",
-                "Exhibition Name English": getattr(doc, "exhibition_name_english", ""),
-                "Exhibition Image URL": getattr(doc, "exhibition_image_url", ""),
-                "Latitude": getattr(gallery, "latitude", "") if gallery else "",
-                "Longitude": getattr(gallery, "longitude", "") if gallery else "",
-            }
-            flat_cards.append(card)
-        
-        # ---- Cloud Task ----
-        # this is for generating the individual reports for each exhibition in the background
-        for card in flat_cards:
-            uid = card["UID"]
-            try:
-                logger.info(f"Query type before task: {type(req.query)}")
-                create_task(uid, {"query": req.query}, create_report=False)
-                logger.info(f"Task created for {uid}")
-            except Exception as e:
-                logger.error(f"Error in creating task for {uid}: {e}")
+        # the blocking stages run on their own bounded executors and Qdrant is awaited on the async client,
+        # so the event loop keeps serving other requests. Categorical profiles are served from the precomputed
+        # table when it is enabled, free-text queries fall through to the live path
+        docs = await arecommend(retriever, req.query, req.filters, k=10)
 
-        # ---- Content generation ----
-        context = " ".join(
-            f"{{Exhibition Name: {d.name}, Description: {d.description}}} \n" for d in docs
-        )
+        galleries = await _find_galleries(docs)
+        flat_cards = _to_cards(docs, galleries)
 
-        try:    
-            result = call_llm_service(req.query, context, RecommendationTemplate().create_template(), filters=req.filters) # returns dict
+        try:
+            result = await _recommendation_report(req, docs, flat_cards)
             logger.info(f"Result: {result!r}")
             return JSONResponse(content={
             "recommended_exhibitions": flat_cards,
@@ -167,9 +164,101 @@ async def recommend_endpoint(req: QueryRequest):
     except Exception as e:
         logger.error(f"Error in recommend endpoint: {e}")
         raise
+
+
+@recommend_router.post("/recommend/batch")
+async def recommend_batch_endpoint(req: BatchQueryRequest, retriever: ContextRetriever = Depends(get_retriever)):
+    """
+    `/recommend` for many user profiles at once. The live profiles share one embedding batch, one Qdrant batch
+    search and one cross-encoder call. Results are returned in the order of `requests`.
+    """
+    try:
+        docs_per_request = await arecommend_many(
+            retriever, [r.query for r in req.requests], [r.filters for r in req.requests], k=10
+        )
+
+        # the galleries are shared by many profiles, so each one is only looked up once
+        unique_docs = list({str(doc.gallery_id): doc for docs in docs_per_request for doc in docs}.values())
+        galleries_by_id = dict(zip((str(doc.gallery_id) for doc in unique_docs), await _find_galleries(unique_docs)))
+
+        cards_per_request = [
+            _to_cards(docs, [galleries_by_id.get(str(doc.gallery_id)) for doc in docs]) for docs in docs_per_request
+        ]
+        results = await asyncio.gather(
+            *(
+                _recommendation_report(r, docs, cards)
+                for r, docs, cards in zip(req.requests, docs_per_request, cards_per_request)
+            )
+        )
+
+        return JSONResponse(content={
+            "results": [
+                {"recommended_exhibitions": cards, "report": result["report"]}
+                for cards, result in zip(cards_per_request, results)
+            ]
+        })
+
+    except Exception as e:
+        logger.error(f"Error in recommend batch endpoint: {e}")
+        raise
+
+
+async def _find_galleries(docs: list) -> list:
+    return await asyncio.gather(
+        *(_find_gallery(str(doc.gallery_id)) for doc in docs)
+    )
+
+
+def _to_cards(docs: list, galleries: list) -> list[dict]:
+    flat_cards = []
+    for doc, gallery in zip(docs, galleries):
+        card = {
+            "UID": str(getattr(doc, "id", "")),
+            "descriptions": getattr(doc, "description", "") if doc else "",
+            "Gallery Name English": getattr(gallery, "name_english", "") if gallery else "",
+            "Exhibition Name English": getattr(doc, "exhibition_name_english", ""),
+            "Exhibition Image URL": getattr(doc, "exhibition_image_url", ""),
+            "Latitude": getattr(gallery, "latitude", "") if gallery else "",
+            "Longitude": getattr(gallery, "longitude", "") if gallery else "",
+        }
+        flat_cards.append(card)
+
+    return flat_cards
+
+
+async def _recommendation_report(req: QueryRequest, docs: list, flat_cards: list[dict]) -> dict:
+    # ---- Cloud Task ----
+    # this is for generating the individual reports for each exhibition in the background
+    await asyncio.gather(
+        *(run_in_stage("tasks", _create_report_task, card["UID"], req.query) for card in flat_cards)
+    )
+
+    # ---- Content generation ----
+    context = " ".join(
+        f"{{Exhibition Name: {d.name}, Description: {d.description}}} \n" for d in docs
+    )
+
+    return await run_in_stage(
+        "llm", call_llm_service, req.query, context, RecommendationTemplate().create_template(), filters=req.filters
+    ) # returns dict
     
 
 
+@recommend_router.get("/metrics/reranker")
+async def reranker_metrics_endpoint():
+    return JSONResponse(content={
+        "batching": CrossEncoderModelSingleton().batching_stats(),
+        "score_cache": score_cache.stats(),
+    })
+
+
+@recommend_router.get("/metrics/embeddings")
+async def embedding_metrics_endpoint():
+    return JSONResponse(content={
+        "query_cache": QueryEmbeddingHandler.cache_stats(),
+    })
+
+
 @exhibition_reports_router.post("/exhibition_reports")
 async def exhibition_reports_endpoint(req: QueryRequest):
     try:
@@ -185,46 +274,31 @@ async def exhibition_reports_endpoint(req: QueryRequest):
 
         # if the report is not requested, return the cached report
         if req.create_report == False:
-            cached_report = fetch_report(req.uid)
+            cached_report = await run_in_stage("db", fetch_report, req.uid)
             if cached_report:
                 logger.info(f"Cached report found for {req.uid}")
                 return JSONResponse(content={"report": cached_report})
             else:
                 logger.info(f"No cached report found for {req.uid}, generating new report")
-                doc = ExhibitionModel.find(_id=req.uid)
-                if doc:
-                    context = (
-                        f"Exhibition Name: {getattr(doc, 'name', '')}, "
-                        f"Description: {getattr(doc, 'description', '')}, "
-                        f"Exhibition Start Date: {getattr(doc, 'exhibition_start_date', '')}, "
-                        f"Exhibition End Date: {getattr(doc, 'exhibition_end_date', '')}, "
-                        f"artist_name: {getattr(doc, 'artist', '')}"
-                    )
-                    report = call_llm_service(
-                        query, context, prompt_template=UnlistedExhibitionReportTemplate().create_template()
-                    )
-                    save_report(req.uid, report["report"])
-                    return JSONResponse(content={"report": report["report"]})
-                else:
-                    return JSONResponse(content={"report": "Exhibition not found"})
         else:
             logger.info(f"Regenerate report is requested for {req.uid}")
-            doc = ExhibitionModel.find(_id=req.uid)
-            if doc:
-                context = (
-                    f"Exhibition Name: {getattr(doc, 'name', '')}, "
-                    f"Description: {getattr(doc, 'description', '')}, "
-                    f"Exhibition Start Date: {getattr(doc, 'exhibition_start_date', '')}, "
-                    f"Exhibition End Date: {getattr(doc, 'exhibition_end_date', '')}, "
-                    f"artist_name: {getattr(doc, 'artist', '')}"
-                )
-                report = call_llm_service(
-                    query, context, prompt_template=UnlistedExhibitionReportTemplate().create_template()
-                )
-                save_report(req.uid, report["report"])
-                return JSONResponse(content={"report": report["report"]})
-            else:
-                return JSONResponse(content={"report": "Exhibition not found"})
+
+        doc = await ExhibitionModel.afind(_id=req.uid)
+        if doc:
+            context = (
+                f"Exhibition Name: {getattr(doc, 'name', '')}, "
+                f"Description: {getattr(doc, 'description', '')}, "
+                f"Exhibition Start Date: {getattr(doc, 'exhibition_start_date', '')}, "
+                f"Exhibition End Date: {getattr(doc, 'exhibition_end_date', '')}, "
+                f"artist_name: {getattr(doc, 'artist', '')}"
+            )
+            report = await run_in_stage(
+                "llm", call_llm_service, query, context, prompt_template=UnlistedExhibitionReportTemplate().create_template()
+            )
+            await run_in_stage("db", save_report, req.uid, report["report"])
+            return JSONResponse(content={"report": report["report"]})
+        else:
+            return JSONResponse(content={"report": "Exhibition not found"})
 
 
     except Exception as e:
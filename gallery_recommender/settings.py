@@ -17,6 +17,13 @@ class Settings(BaseSettings):
     # MongoDB
     DATABASE_HOST: str = "localhost"
     DATABASE_NAME: str = "gallery_demo"
+    DATABASE_MAX_POOL_SIZE: int = 100  # per client, the sync and async clients each keep their own pool
+    DATABASE_UPSERT_BATCH_SIZE: int = 1000  # operations per bulk_write round trip
+    DATABASE_MATERIALIZED_TTL: int = 7 * 24 * 3600  # seconds before MongoDB expires a materialized recommendation
+
+    # Records read back from MongoDB and Qdrant are validated again, set to False to hydrate them without validation.
+    # The retrieval path of /recommend always skips it, it only reads the exhibitions the embedding pipeline wrote.
+    DATA_STRICT_VALIDATION: bool = True
         
     # Comet ML (Optional Monitoring)
     COMET_API_KEY: str | None = None
@@ -37,6 +44,22 @@ class Settings(BaseSettings):
     QDRANT_APIKEY: str | None = None
     QDRANT_DATABASE_HOST: str = "localhost"
     QDRANT_DATABASE_PORT: int = 6333
+    # run qdrant-client's embedded engine instead of connecting to a server: ":memory:" or a directory.
+    # An on-disk path can only be opened by one process at a time.
+    QDRANT_LOCAL_PATH: str | None = None
+    # transport: gRPC skips the JSON encoding of the vectors, both keep persistent connections
+    QDRANT_PREFER_GRPC: bool = False
+    QDRANT_GRPC_PORT: int = 6334
+    QDRANT_TIMEOUT: int = 10  # seconds
+    QDRANT_POOL_SIZE: int = 32  # max REST connections kept alive per client
+    QDRANT_GRPC_KEEPALIVE_MS: int = 30_000
+
+    # Qdrant bulk ingestion: upserts chunked by payload size and sent by a bounded pool of workers
+    QDRANT_UPSERT_BATCH_BYTES: int = 4 * 1024 * 1024
+    QDRANT_UPSERT_MAX_BATCH_POINTS: int = 1000
+    QDRANT_UPSERT_CONCURRENCY: int = 4
+    QDRANT_UPSERT_WAIT: bool = False  # acknowledge chunks before they are applied, the last chunk is the barrier
+    QDRANT_UPSERT_MAX_RETRIES: int = 3
 
     # AWS Authentication
     AWS_REGION: str = "ap-northeast-1"
@@ -71,6 +94,60 @@ class Settings(BaseSettings):
     TEXT_EMBEDDING_MODEL: str = "paraphrase-multilingual-MiniLM-L12-v2"
     RERANKING_CROSS_ENCODER_MODEL: str = "cross-encoder/ms-marco-MiniLM-L-4-v2"
     RAG_MODEL_DEVICE: str = "cpu"
+    RAG_MODEL_BACKEND: str = "torch"  # "torch" or "onnx" (CPU inference through ONNX Runtime)
+    RAG_ONNX_QUANTIZE: bool = True  # dynamically quantize the exported ONNX models to int8
+    RAG_ONNX_CACHE_DIR: str = ".cache/onnx"
+
+    # In-process NumPy mirror of the embedded exhibitions collection for exact search
+    RAG_LOCAL_INDEX_ENABLED: bool = False
+    RAG_LOCAL_INDEX_SYNC_INTERVAL: float = 60.0
+    RAG_LOCAL_INDEX_MAX_STALENESS: float = 300.0
+
+    # Precomputed recommendations for the categorical user-profile space
+    RAG_MATERIALIZED_ENABLED: bool = False
+    RAG_MATERIALIZED_REFRESH_INTERVAL: float = 60.0
+
+    # Query expansion: alternative queries searched in parallel and merged with reciprocal-rank fusion
+    RAG_QUERY_EXPANSION_ENABLED: bool = False
+    RAG_QUERY_EXPANSION_N: int = 3
+    RAG_QUERY_EXPANSION_BUDGET_MS: float = 1500.0  # expansions not searched within the budget are dropped
+    RAG_QUERY_EXPANSION_SEARCH_TIMEOUT_MS: float = 10_000.0  # max wait for the search of the original query
+
+    # Self-query: area, artist and date window extracted from free-text queries and pushed into the search filter.
+    # Off by default, the extracted filters narrow the results of the existing profiles
+    RAG_SELF_QUERY_ENABLED: bool = False
+    RAG_SELF_QUERY_LLM_FALLBACK: bool = False  # ask the LLM when the rules don't extract anything
+    RAG_SELF_QUERY_AREAS: list[str] = ["DOWNTOWN", "WATERFRONT", "HISTORIC_DISTRICT"]
+    RAG_SELF_QUERY_CACHE_SIZE: int = 4096
+
+    # Embedding cache (content-addressed, persisted on disk between pipeline runs)
+    EMBEDDING_CACHE_ENABLED: bool = True
+    EMBEDDING_CACHE_DIR: str = ".cache/embeddings"
+    EMBEDDING_CACHE_MAX_ENTRIES: int = 200_000
+
+    # Batched encoding (inputs are sorted by token length and encoded in micro-batches)
+    EMBEDDING_BATCHED_ENCODE: bool = True
+    EMBEDDING_BATCH_SIZE: int = 32
+
+    # In-memory LRU in front of query embeddings
+    QUERY_EMBEDDING_CACHE_SIZE: int = 4096
+    QUERY_EMBEDDING_CACHE_TTL: float = 3600.0
+
+    # Cross-encoder score cache keyed by (query, document id, description hash)
+    RERANK_SCORE_CACHE_SIZE: int = 50_000
+    RERANK_SCORE_CACHE_TTL: float = 6 * 3600.0
+
+    # Micro-batching of cross-encoder calls from concurrent requests
+    RERANK_MICROBATCH_ENABLED: bool = True
+    RERANK_MICROBATCH_MAX_SIZE: int = 256
+    RERANK_MICROBATCH_MAX_WAIT_MS: float = 5.0
+
+    # Inference API: max concurrent blocking calls per request stage
+    API_RETRIEVAL_CONCURRENCY: int = 4
+    API_RERANK_CONCURRENCY: int = 4
+    API_DB_CONCURRENCY: int = 16
+    API_TASKS_CONCURRENCY: int = 8
+    API_LLM_CONCURRENCY: int = 16
 
 
     @classmethod
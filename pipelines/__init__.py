@@ -1,5 +1,6 @@
 from .digital_data_etl import digital_data_etl
 from .feature_engineering import feature_engineering
 from .end_to_end import end_to_end
+from .materialize_recommendations import materialize_recommendations
 
-__all__ = ["digital_data_etl", "feature_engineering", "end_to_end"]
\ No newline at end of file
+__all__ = ["digital_data_etl", "feature_engineering", "end_to_end", "materialize_recommendations"]
\ No newline at end of file
@@ -1,11 +1,13 @@
 from zenml import pipeline
 
-from steps.etl import crawl_links, delete_data
+from steps.etl import crawl_links, create_mongo_indices_step, delete_data
 
 
 @pipeline
 def digital_data_etl(collection_names: list[str], links: list[str], reflections: bool = False) -> str:
-    delete_status = delete_data(collection_names)
+    # the unique indexes back the natural keys the crawler upserts on
+    mongo_indexes = create_mongo_indices_step()
+    delete_status = delete_data(collection_names, after=mongo_indexes.invocation_id)
     last_step = crawl_links(links, reflections=reflections, _after_delete=delete_status)
 
     return last_step.invocation_id
@@ -0,0 +1,21 @@
+from zenml import pipeline
+
+from steps import feature_engineering as fe_steps
+from steps.etl import create_mongo_indices_step
+
+
+@pipeline
+def materialize_recommendations(
+    levels: list[str],
+    reasons: list[str],
+    durations: list[str],
+    moods: list[str],
+    areas: list[str],
+    k: int = 10,
+) -> str:
+    mongo_indexes = create_mongo_indices_step()
+    last_step = fe_steps.materialize_recommendations_step(
+        levels, reasons, durations, moods, areas, k=k, after=mongo_indexes.invocation_id
+    )
+
+    return last_step.invocation_id
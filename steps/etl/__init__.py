@@ -1,4 +1,5 @@
 from .crawl_links import crawl_links
+from .create_indices import create_mongo_indices_step
 from .delete import delete_data
 
-__all__ = ["crawl_links", "delete_data"]
\ No newline at end of file
+__all__ = ["crawl_links", "create_mongo_indices_step", "delete_data"]
\ No newline at end of file
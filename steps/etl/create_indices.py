@@ -1,6 +1,19 @@
-from zenml import step
-from gallery_recommender.application.indexing import initialize_indices
+from typing_extensions import Annotated
+from zenml import get_step_context, step
+
+from gallery_recommender.application.indexing import ensure_indexes, initialize_indices
+
+@step(enable_cache=False)
+def create_qdrant_indices_step(drop_undeclared: bool = False) -> None:
+    # dropping the undeclared payload indexes is an explicit, one-off cleanup, never done by the services on startup
+    initialize_indices(drop_undeclared=drop_undeclared)
+
 
 @step(enable_cache=False)
-def create_qdrant_indices_step() -> None:
-    initialize_indices()
\ No newline at end of file
+def create_mongo_indices_step() -> Annotated[dict, "mongo_indexes"]:
+    changes = ensure_indexes()
+
+    step_context = get_step_context()
+    step_context.add_output_metadata(output_name="mongo_indexes", metadata=changes)
+
+    return changes
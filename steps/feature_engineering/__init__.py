@@ -2,6 +2,7 @@ from .query_data_warehouse import query_data_warehouse
 from .load_to_vector_db import load_to_vector_db
 from .clean import clean_data
 from .rag import embed_data
+from .materialize import materialize_recommendations_step
 
 
-__all__ = ["query_data_warehouse", "load_to_vector_db", "clean_data", "embed_data"]
\ No newline at end of file
+__all__ = ["query_data_warehouse", "load_to_vector_db", "clean_data", "embed_data", "materialize_recommendations_step"]
\ No newline at end of file
@@ -1,9 +1,9 @@
 from loguru import logger 
 from typing_extensions import Annotated
-from zenml import step
+from zenml import get_step_context, step
 
 from gallery_recommender.domain.base import VectorBaseData
-from gallery_recommender.application import utils
+from gallery_recommender.application.rag.materialized import invalidate_materialized_recommendations
 
 
 @step
@@ -12,15 +12,27 @@ def load_to_vector_db(
 ) -> Annotated[bool, "sucessful"]:
     logger.info(f"Loading {len(data)} data to vector database")
 
+    metadata = {}
+    successful = True
     grouped_data = VectorBaseData.group_by_class(data)
     for data_class, data_list in grouped_data.items():
         logger.info(f"Loading documents into {data_class.get_collection_name()}")
-        for documents_batch in utils.misc.batch(data_list, size=4):
-            try:
-                data_class.bulk_insert(documents_batch)
-            except Exception:
-                logger.error(f"Failed to insert data into {data_class.get_collection_name()}")
+        try:
+            stats = data_class.bulk_ingest(data_list)
+        except Exception as e:
+            logger.error(f"Failed to insert data into {data_class.get_collection_name()}: {e}")
 
-                return False
+            return False
+
+        metadata[data_class.get_collection_name()] = stats
+        if stats["num_failed_points"] > 0:
+            successful = False
+
+    if len(data) > 0:
+        # the precomputed recommendations were built from the previous points
+        invalidate_materialized_recommendations()
+
+    step_context = get_step_context()
+    step_context.add_output_metadata(output_name="sucessful", metadata=metadata)
             
-    return True
\ No newline at end of file
+    return successful
@@ -0,0 +1,30 @@
+from loguru import logger
+from typing_extensions import Annotated
+from zenml import get_step_context, step
+
+from gallery_recommender.application.rag.materialized import materialize_recommendations
+
+
+@step(enable_cache=False)
+def materialize_recommendations_step(
+    levels: list[str],
+    reasons: list[str],
+    durations: list[str],
+    moods: list[str],
+    areas: list[str],
+    k: int = 10,
+) -> Annotated[int, "materialized_recommendations"]:
+    """Precompute the reranked exhibitions for every (user profile, area) combination"""
+    num_profiles = materialize_recommendations(levels, reasons, durations, moods, areas, k=k)
+    logger.info(f"Materialized {num_profiles} recommendation profiles")
+
+    step_context = get_step_context()
+    step_context.add_output_metadata(
+        output_name="materialized_recommendations",
+        metadata={
+            "num_profiles": num_profiles,
+            "num_areas": len(areas),
+        },
+    )
+
+    return num_profiles
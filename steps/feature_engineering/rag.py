@@ -3,7 +3,9 @@ from loguru import logger
 from zenml import get_step_context, step
 
 
+from gallery_recommender.application.networks import EmbeddingModelSingleton
 from gallery_recommender.application.preprocessing.dispatchers import EmbeddingDispatcher
+from gallery_recommender.domain.base import VectorBaseData
 from gallery_recommender.domain.embedded_cleaned_data import EmbeddedDocument
 
 
@@ -13,19 +15,22 @@ def embed_data(
 ) -> Annotated[list, "embedded_documents"]:
     metadata = {"embedding": {}, "num_data": len(cleaned_documents)}
 
+    embedding_model = EmbeddingModelSingleton()
+    embedding_model.reset_cache_stats()
+    embedding_model.reset_encode_stats()
+
     embedded_documents = []
-    for doc in cleaned_documents:
-        # EmbeddingDispatcher.dispatch may return a single embedded document
-        # or a list—adjust based on its implementation.
-        result = EmbeddingDispatcher.dispatch(doc)
-        logger.info(f"Embedding document: {doc}")
-        if isinstance(result, list):
-            embedded_documents.extend(result)
-        else:
-            embedded_documents.append(result)
+    # dispatch a whole category at once, so the model can encode it in length-sorted micro-batches
+    grouped_documents = VectorBaseData.group_by_category(cleaned_documents)
+    for category, documents in grouped_documents.items():
+        logger.info(f"Embedding {len(documents)} documents of category: {category}")
+        embedded_documents.extend(EmbeddingDispatcher.dispatch(documents))
 
     metadata["embedding"] = _add_embeddings_metadata(embedded_documents, metadata["embedding"])
     metadata["num_embedded_documents"] = len(embedded_documents)
+    metadata["embedding_cache"] = embedding_model.cache_stats()
+    metadata["encode_stats"] = embedding_model.encode_stats
+    logger.info(f"Embedding cache stats: {metadata['embedding_cache']}")
 
     step_context = get_step_context()
     step_context.add_output_metadata(
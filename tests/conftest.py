@@ -0,0 +1,100 @@
+import os
+
+import numpy as np
+import pytest
+
+# the tests run against an in-memory Qdrant, set before the settings and the connections are created
+os.environ.setdefault("QDRANT_LOCAL_PATH", ":memory:")
+
+
+@pytest.fixture
+def mongo_database(monkeypatch):
+    """
+    An in-memory MongoDB database in place of the one of the data models.
+    """
+    import mongomock
+
+    from gallery_recommender.domain.base import nosql
+    from gallery_recommender.settings import settings
+
+    # pymongo >= 4.11 passes the `sort` of UpdateOne to the bulk builder, which mongomock doesn't accept yet
+    add_update = mongomock.collection.BulkOperationBuilder.add_update
+
+    def _add_update(self, *args, sort=None, **kwargs):
+        assert sort is None, "mongomock can't sort the documents of an update"
+
+        return add_update(self, *args, **kwargs)
+
+    monkeypatch.setattr(mongomock.collection.BulkOperationBuilder, "add_update", _add_update)
+
+    database = mongomock.MongoClient().get_database(settings.DATABASE_NAME)
+    monkeypatch.setattr(nosql, "_database", database)
+
+    return database
+
+
+@pytest.fixture
+def exhibitions_collection():
+    """
+    An empty collection of 3-dimensional exhibition embeddings in the in-memory Qdrant.
+    """
+    from qdrant_client.http.models import Distance, VectorParams
+
+    from gallery_recommender.domain.embedded_cleaned_data import EmbeddedExhibitionDocument
+    from gallery_recommender.infrastructure.db.qdrant import connection
+
+    collection_name = EmbeddedExhibitionDocument.get_collection_name()
+    connection.create_collection(collection_name, vectors_config=VectorParams(size=3, distance=Distance.COSINE))
+
+    yield collection_name
+
+    connection.delete_collection(collection_name)
+
+
+class KeywordEmbeddingModel:
+    """
+    Embeds a text by how often it mentions each of `KEYWORDS`, so the tests control which exhibitions a query is
+    close to without a real model.
+    """
+
+    KEYWORDS = ("painting", "sculpture", "photography")
+
+    model_id = "keyword-embedding-model"
+    backend = "torch"
+    embedding_size = len(KEYWORDS)
+    max_input_length = 128
+
+    def __call__(self, texts: list[str], to_list: bool = True, persistent_cache: bool = True):
+        # the small baseline keeps the texts without keywords off the zero vector, which has no cosine similarity
+        return np.array(
+            [[text.lower().count(keyword) + 0.01 for keyword in self.KEYWORDS] for text in texts], dtype=np.float32
+        )
+
+
+class ScoreByLengthCrossEncoder:
+    model_id = "score-by-length-cross-encoder"
+
+    def __call__(self, pairs: list[tuple[str, str]]) -> list[float]:
+        return [float(len(document)) for _, document in pairs]
+
+    def batching_stats(self) -> dict:
+        return {}
+
+
+@pytest.fixture
+def retriever(monkeypatch, exhibitions_collection):
+    """
+    A ContextRetriever searching the in-memory Qdrant, with the keyword embeddings and a pass-through reranker.
+    """
+    from gallery_recommender.application.networks import CrossEncoderModelSingleton
+    from gallery_recommender.application.networks.base import SingletonMeta
+    from gallery_recommender.application.preprocessing import embedding_data_handlers
+    from gallery_recommender.application.rag.retriever import ContextRetriever
+
+    monkeypatch.setattr(embedding_data_handlers, "embedding_model", KeywordEmbeddingModel())
+    monkeypatch.setitem(SingletonMeta._instances, CrossEncoderModelSingleton, ScoreByLengthCrossEncoder())
+    embedding_data_handlers.query_embedding_cache.clear()
+
+    yield ContextRetriever(mock=True)
+
+    embedding_data_handlers.query_embedding_cache.clear()
@@ -0,0 +1,51 @@
+import datetime
+import uuid
+
+from gallery_recommender.domain.data import GalleryData
+from gallery_recommender.domain.embedded_cleaned_data import EmbeddedExhibitionDocument
+
+NOW = datetime.datetime(2026, 6, 1)
+
+
+def make_exhibition(
+    embedding: list[float],
+    area: str = "DOWNTOWN",
+    ends_in_days: int = 30,
+    now: datetime.datetime = NOW,
+    artist: str = "artist",
+) -> EmbeddedExhibitionDocument:
+    start_date = now - datetime.timedelta(days=10)
+    end_date = now + datetime.timedelta(days=ends_in_days)
+
+    return EmbeddedExhibitionDocument(
+        id=uuid.uuid4(),
+        embedding=embedding,
+        area=area,
+        name=f"exhibition in {area}",
+        description="description",
+        artist=artist,
+        exhibition_image_url="https://example.com/image.jpg",
+        exhibition_start_date=start_date,
+        exhibition_end_date=end_date,
+        exhibition_start_date_ts=start_date.timestamp(),
+        exhibition_end_date_ts=end_date.timestamp(),
+        gallery_id=uuid.uuid4(),
+    )
+
+
+def make_gallery(name: str, description: str = "description") -> GalleryData:
+    return GalleryData(
+        name=name,
+        name_japanese=name,
+        name_english=name,
+        description=description,
+        address_japanese="address",
+        address_english="address",
+        area="DOWNTOWN",
+        gallery_image_url="https://example.com/image.jpg",
+        website="https://example.com",
+        hours="10:00-18:00",
+        latitude=35.0,
+        longitude=139.0,
+        phone_number="000-0000-0000",
+    )
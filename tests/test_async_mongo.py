@@ -0,0 +1,73 @@
+import asyncio
+import uuid
+
+import pytest
+from pymongo import AsyncMongoClient, errors
+
+from gallery_recommender.domain.base import nosql
+from gallery_recommender.domain.data import GalleryData
+from gallery_recommender.settings import settings
+
+from .factories import make_gallery
+
+
+@pytest.fixture
+def run_with_database(monkeypatch):
+    """
+    Runs a coroutine against a throwaway database of the MongoDB at `DATABASE_HOST`, e.g. the one of
+    docker-compose. The async client has no in-memory counterpart, so the tests are skipped without a server.
+    """
+
+    def _run(test):
+        async def _with_database():
+            client = AsyncMongoClient(settings.DATABASE_HOST, serverSelectionTimeoutMS=1000)
+            try:
+                await client.admin.command("ping")
+            except errors.ServerSelectionTimeoutError:
+                await client.close()
+                pytest.skip(f"No MongoDB server at {settings.DATABASE_HOST}")
+
+            database = client.get_database(f"test_{uuid.uuid4().hex[:8]}")
+            monkeypatch.setattr(nosql, "_async_database", database)
+            try:
+                await test()
+            finally:
+                await client.drop_database(database.name)
+                await client.close()
+
+        asyncio.run(_with_database())
+
+    return _run
+
+
+def test_abulk_insert_and_afind_round_trip(run_with_database):
+    gallery = make_gallery("gallery")
+
+    async def test():
+        assert await GalleryData.abulk_insert([gallery, make_gallery("other gallery")])
+
+        found = await GalleryData.afind(name="gallery")
+        assert (found.id, found.name) == (gallery.id, "gallery")
+        assert await GalleryData.afind(name="missing") is None
+
+    run_with_database(test)
+
+
+def test_aiter_find_streams_sorted_and_projected_documents(run_with_database):
+    galleries = [make_gallery(f"gallery {i}") for i in range(5)]
+
+    async def test():
+        await GalleryData.abulk_insert(galleries)
+
+        found = [
+            gallery
+            async for gallery in GalleryData.aiter_find(
+                {}, projection=["name"], sort=[("name", -1)], limit=3, batch_size=2
+            )
+        ]
+
+        assert [gallery.name for gallery in found] == ["gallery 4", "gallery 3", "gallery 2"]
+        assert [gallery.id for gallery in found] == [galleries[4].id, galleries[3].id, galleries[2].id]
+        assert len(await GalleryData.abulk_find()) == 5
+
+    run_with_database(test)
@@ -0,0 +1,105 @@
+import asyncio
+
+import pytest
+from qdrant_client import AsyncQdrantClient
+from qdrant_client.http.models import Distance, VectorParams
+
+from gallery_recommender.domain.base import vector as vector_module
+from gallery_recommender.domain.embedded_cleaned_data import EmbeddedExhibitionDocument
+from gallery_recommender.infrastructure.db.qdrant import connection
+
+from .factories import make_exhibition
+
+PAINTING, SCULPTURE, PHOTOGRAPHY = [1.0, 0.0, 0.0], [0.0, 1.0, 0.0], [0.0, 0.0, 1.0]
+
+
+@pytest.fixture
+def run_with_async_client(monkeypatch):
+    """
+    Runs a coroutine with an in-memory AsyncQdrantClient as the shared async connection, so the async methods go
+    through the async client instead of falling back to the sync one as they do on the embedded engine.
+    """
+
+    def _run(test):
+        async def _with_client():
+            client = AsyncQdrantClient(location=":memory:")
+            await client.create_collection(
+                EmbeddedExhibitionDocument.get_collection_name(),
+                vectors_config=VectorParams(size=3, distance=Distance.COSINE),
+            )
+            monkeypatch.setattr(vector_module, "async_connection", client)
+            try:
+                await test()
+            finally:
+                await client.close()
+
+        asyncio.run(_with_client())
+
+    return _run
+
+
+def test_abulk_insert_then_asearch_on_the_async_client(run_with_async_client):
+    exhibitions = [make_exhibition(PAINTING), make_exhibition(SCULPTURE), make_exhibition(PHOTOGRAPHY)]
+
+    async def test():
+        assert await EmbeddedExhibitionDocument.abulk_insert(exhibitions)
+
+        results = await EmbeddedExhibitionDocument.asearch(query_vector=[0.9, 0.1, 0.0], limit=2, strict=False)
+        assert [result.id for result in results] == [exhibitions[0].id, exhibitions[1].id]
+        assert isinstance(results[0], EmbeddedExhibitionDocument)
+
+        batch_results = await EmbeddedExhibitionDocument.asearch_batch(
+            query_vectors=[PHOTOGRAPHY, SCULPTURE], limit=1
+        )
+        assert [[result.id for result in results] for results in batch_results] == [
+            [exhibitions[2].id],
+            [exhibitions[1].id],
+        ]
+
+    run_with_async_client(test)
+
+
+def test_abulk_find_pages_through_the_async_client(run_with_async_client):
+    exhibitions = [make_exhibition(PAINTING) for _ in range(3)]
+
+    async def test():
+        await EmbeddedExhibitionDocument.abulk_insert(exhibitions)
+
+        first_page, next_offset = await EmbeddedExhibitionDocument.abulk_find(limit=2)
+        second_page, last_offset = await EmbeddedExhibitionDocument.abulk_find(limit=2, offset=next_offset)
+
+        assert {document.id for document in first_page + second_page} == {exhibition.id for exhibition in exhibitions}
+        assert last_offset is None
+
+    run_with_async_client(test)
+
+
+def test_the_async_methods_fall_back_to_the_sync_client_on_the_embedded_engine(exhibitions_collection):
+    assert vector_module.async_connection is None
+    exhibitions = [make_exhibition(PAINTING), make_exhibition(SCULPTURE)]
+
+    async def test():
+        assert await EmbeddedExhibitionDocument.abulk_insert(exhibitions)
+
+        results = await EmbeddedExhibitionDocument.asearch(query_vector=SCULPTURE, limit=1)
+        batch_results = await EmbeddedExhibitionDocument.asearch_batch(query_vectors=[PAINTING], limit=1)
+        documents, _ = await EmbeddedExhibitionDocument.abulk_find(limit=10)
+
+        return results, batch_results, documents
+
+    results, batch_results, documents = asyncio.run(test())
+
+    assert [result.id for result in results] == [exhibitions[1].id]
+    assert [result.id for result in batch_results[0]] == [exhibitions[0].id]
+    assert len(documents) == connection.count(collection_name=exhibitions_collection).count == 2
+
+
+def test_aretrieve_matches_retrieve(retriever, exhibitions_collection):
+    exhibitions = [make_exhibition(PAINTING), make_exhibition(SCULPTURE), make_exhibition(PHOTOGRAPHY)]
+    connection.upsert(exhibitions_collection, points=[exhibition.to_point() for exhibition in exhibitions])
+
+    query_model, documents = asyncio.run(retriever.aretrieve("sculpture", k=2))
+
+    assert query_model.content == "sculpture"
+    assert [document.id for document in documents] == [exhibitions[1].id]
+    assert documents == retriever.retrieve("sculpture", k=2)[1]
@@ -0,0 +1,207 @@
+import asyncio
+import datetime
+
+import pytest
+from qdrant_client.models import FieldCondition, Filter, MatchValue
+
+from gallery_recommender.application.rag import materialized as materialized_module
+from gallery_recommender.application.rag.materialized import (
+    MaterializedRecommendations,
+    arecommend,
+    arecommend_many,
+    profile_key,
+)
+from gallery_recommender.application.rag.self_query import SelfQuery
+from gallery_recommender.domain.data import MaterializedRecommendationData
+from gallery_recommender.domain.embedded_cleaned_data import EmbeddedExhibitionDocument
+from gallery_recommender.domain.queries import Query
+from gallery_recommender.infrastructure.db.qdrant import connection
+from gallery_recommender.settings import settings
+
+from .factories import make_exhibition
+from .test_query_expansion import Expander
+
+PROFILE = {"level": "Beginner", "reason": "relax", "duration": "2 hours", "mood": "calm"}
+
+
+@pytest.fixture
+def exhibitions(exhibitions_collection):
+    # open now, as the filtered searches and the materialized lookups only return the running exhibitions
+    now = datetime.datetime.now()
+    exhibitions = {
+        "painting": make_exhibition([1.0, 0.0, 0.0], now=now),
+        "sculpture": make_exhibition([0.0, 1.0, 0.0], area="WATERFRONT", now=now),
+        "photography": make_exhibition([0.0, 0.0, 1.0], now=now),
+    }
+    connection.upsert(exhibitions_collection, points=[exhibition.to_point() for exhibition in exhibitions.values()])
+
+    return exhibitions
+
+
+def names(exhibitions: dict, documents: list) -> list[str]:
+    ids = {exhibition.id: name for name, exhibition in exhibitions.items()}
+
+    return [ids[document.id] for document in documents]
+
+
+def test_search_batch_returns_the_results_in_the_order_of_the_vectors(exhibitions):
+    waterfront = Filter(must=[FieldCondition(key="area", match=MatchValue(value="WATERFRONT"))])
+
+    results = EmbeddedExhibitionDocument.search_batch(
+        query_vectors=[[0.0, 0.0, 1.0], [1.0, 0.0, 0.0], [1.0, 0.0, 0.0]],
+        limit=1,
+        query_filters=[None, None, waterfront],
+    )
+
+    assert [names(exhibitions, documents) for documents in results] == [["photography"], ["painting"], ["sculpture"]]
+    assert EmbeddedExhibitionDocument.search_batch(query_vectors=[]) == []
+
+
+def test_search_many_keeps_the_order_of_the_queries(retriever, exhibitions):
+    results = retriever.search_many(["sculpture", "painting", "photography"], k=2)
+
+    assert [names(exhibitions, documents) for documents in results] == [["sculpture"], ["painting"], ["photography"]]
+    assert retriever.search_many([]) == []
+
+
+def test_the_queries_without_candidates_skip_the_reranker(monkeypatch, retriever, exhibitions):
+    reranked = []
+    rerank_many = retriever.rerank_many
+
+    def _rerank_many(queries, retrieved_docs, keep_top_k):
+        reranked.extend(query.content for query in queries)
+
+        return rerank_many(queries, retrieved_docs, keep_top_k)
+
+    monkeypatch.setattr(retriever, "rerank_many", _rerank_many)
+
+    results = retriever.search_many(["painting", "sculpture"], k=2, filters=[{"area": "NOWHERE"}, None])
+
+    assert [names(exhibitions, documents) for documents in results] == [[], ["sculpture"]]
+    assert reranked == ["sculpture"]
+
+
+def test_retrieve_many_matches_retrieve_on_the_sync_and_async_paths(retriever, exhibitions):
+    queries = ["photography", "painting", "sculpture"]
+    filters = [None, {"area": "DOWNTOWN"}, None]
+
+    query_models, batch = retriever.retrieve_many(queries, k=4, filters=filters)
+    async_query_models, async_batch = asyncio.run(retriever.aretrieve_many(queries, k=4, filters=filters))
+    one_by_one = [retriever.retrieve(query, k=4, filters=query_filters)[1] for query, query_filters in zip(queries, filters)]
+
+    assert [query_model.content for query_model in query_models] == queries
+    assert [query_model.content for query_model in async_query_models] == queries
+    assert batch == async_batch == one_by_one
+    assert names(exhibitions, batch[1]) == ["painting", "photography"]
+    assert asyncio.run(retriever.aretrieve_many([])) == ([], [])
+
+
+class CountingExpander(Expander):
+    def __init__(self, expansions: list[str]) -> None:
+        super().__init__(expansions)
+        self.expanded = []
+
+    def generate(self, query: Query, expand_to_n: int) -> list[Query]:
+        self.expanded.append(query.content)
+
+        return super().generate(query, expand_to_n)
+
+
+def test_retrieve_many_expands_every_query_on_its_own(monkeypatch, retriever, exhibitions):
+    monkeypatch.setattr(settings, "RAG_QUERY_EXPANSION_ENABLED", True)
+    retriever._query_expander = CountingExpander(["sculpture"])
+    queries = ["painting", "photography"]
+    filters = [{"area": "DOWNTOWN"}, None]
+
+    _, batch = retriever.retrieve_many(queries, k=4, filters=filters)
+    _, async_batch = asyncio.run(retriever.aretrieve_many(queries, k=4, filters=filters))
+    one_by_one = [retriever.retrieve(query, k=4, filters=query_filters)[1] for query, query_filters in zip(queries, filters)]
+
+    assert retriever._query_expander.expanded == queries * 3
+    assert batch == async_batch == one_by_one
+    # the expansion of the unfiltered query brings in the waterfront exhibition, not the one of the downtown query
+    assert "sculpture" not in names(exhibitions, batch[0])
+    assert "sculpture" in names(exhibitions, batch[1])
+
+
+def test_retrieve_many_retries_only_the_queries_whose_self_query_filters_match_nothing(monkeypatch, retriever, exhibitions):
+    monkeypatch.setattr(settings, "RAG_SELF_QUERY_ENABLED", True)
+    retriever._self_query = SelfQuery()
+    queries = ["painting by Nobody Known", "painting in the waterfront"]
+
+    query_models, batch = retriever.retrieve_many(queries, k=2)
+    _, async_batch = asyncio.run(retriever.aretrieve_many(queries, k=2))
+
+    assert [query_model.metadata["self_query"] for query_model in query_models] == [
+        {"artist": "Nobody Known"},
+        {"area": "WATERFRONT"},
+    ]
+    # the unknown artist falls back to the unfiltered search, the waterfront filter is kept
+    assert [names(exhibitions, documents) for documents in batch] == [["painting"], ["sculpture"]]
+    assert async_batch == batch
+
+
+@pytest.fixture
+def materialized(monkeypatch, mongo_database, exhibitions):
+    """
+    A materialized table recommending the photography exhibition to `PROFILE` downtown.
+    """
+    monkeypatch.setattr(settings, "RAG_MATERIALIZED_ENABLED", True)
+    MaterializedRecommendationData.replace_all(
+        [
+            MaterializedRecommendationData(
+                profile_key=profile_key(PROFILE, {"area": "DOWNTOWN"}),
+                area="DOWNTOWN",
+                profile=PROFILE,
+                exhibition_ids=[str(exhibitions["photography"].id)],
+            )
+        ]
+    )
+    monkeypatch.setattr(materialized_module, "_materialized_recommendations", MaterializedRecommendations())
+
+
+def test_arecommend_many_mixes_the_materialized_hits_and_the_live_misses(monkeypatch, retriever, exhibitions, materialized):
+    retrieved = []
+    retrieve_many = retriever.retrieve_many
+
+    def _retrieve_many(queries, k, filters):
+        retrieved.extend(queries)
+
+        return retrieve_many(queries, k, filters)
+
+    monkeypatch.setattr(retriever, "retrieve_many", _retrieve_many)
+    monkeypatch.setattr(settings, "RAG_QUERY_EXPANSION_ENABLED", True)
+    retriever._query_expander = Expander([])
+
+    results = asyncio.run(
+        arecommend_many(
+            retriever,
+            ["sculpture", PROFILE, PROFILE, "painting"],
+            [None, {"area": "DOWNTOWN"}, {"area": "WATERFRONT"}, None],
+            k=2,
+        )
+    )
+
+    assert [names(exhibitions, documents) for documents in results] == [
+        ["sculpture"],
+        ["photography"],
+        ["sculpture"],
+        ["painting"],
+    ]
+    # the materialized profile never reaches the live path
+    assert retrieved == ["sculpture", PROFILE, "painting"]
+
+
+def test_arecommend_serves_the_materialized_profiles_and_the_empty_batch(retriever, exhibitions, materialized):
+    assert names(exhibitions, asyncio.run(arecommend(retriever, PROFILE, {"area": "DOWNTOWN"}, k=2))) == ["photography"]
+    assert names(exhibitions, asyncio.run(arecommend(retriever, "painting", k=2))) == ["painting"]
+    assert asyncio.run(arecommend_many(retriever, [])) == []
+
+
+def test_arecommend_many_retrieves_everything_live_without_the_materialized_table(retriever, exhibitions):
+    assert not settings.RAG_MATERIALIZED_ENABLED
+
+    results = asyncio.run(arecommend_many(retriever, [PROFILE, "painting"], [{"area": "DOWNTOWN"}, None], k=2))
+
+    assert [len(documents) for documents in results] == [1, 1]
+    assert names(exhibitions, results[1]) == ["painting"]
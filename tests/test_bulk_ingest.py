@@ -0,0 +1,127 @@
+import grpc
+import httpx
+import pytest
+from qdrant_client.http.exceptions import UnexpectedResponse
+from qdrant_client.models import PointStruct
+
+from gallery_recommender.domain.base import vector as vector_module
+from gallery_recommender.domain.base.vector import VectorBaseData
+from gallery_recommender.domain.embedded_cleaned_data import EmbeddedExhibitionDocument
+from gallery_recommender.infrastructure.db.qdrant import connection, is_transient_error
+
+from .factories import make_exhibition
+
+
+def make_points(payload_sizes: list[int]) -> list[PointStruct]:
+    return [PointStruct(id=i, vector=[0.0], payload={"text": "x" * size}) for i, size in enumerate(payload_sizes)]
+
+
+def batch_ids(batches: list[list[PointStruct]]) -> list[list[int]]:
+    return [[point.id for point in batch] for batch in batches]
+
+
+def test_batches_are_cut_at_the_max_number_of_points():
+    batches = VectorBaseData._batch_points(make_points([1] * 5), max_batch_bytes=10**6, max_batch_points=2)
+
+    assert batch_ids(batches) == [[0, 1], [2, 3], [4]]
+
+
+def test_batches_are_cut_at_the_max_serialized_size():
+    points = make_points([100, 100, 100, 10])
+    point_bytes = len(points[0].model_dump_json())
+
+    batches = VectorBaseData._batch_points(points, max_batch_bytes=2 * point_bytes, max_batch_points=100)
+
+    assert batch_ids(batches) == [[0, 1], [2, 3]]
+
+
+def test_a_point_larger_than_the_max_size_gets_its_own_batch():
+    batches = VectorBaseData._batch_points(make_points([10, 10_000, 10]), max_batch_bytes=1000, max_batch_points=100)
+
+    assert batch_ids(batches) == [[0], [1], [2]]
+
+
+def test_no_points_make_no_batches():
+    assert VectorBaseData._batch_points([], max_batch_bytes=1000, max_batch_points=100) == []
+
+
+@pytest.mark.parametrize(
+    "error, transient",
+    [
+        (UnexpectedResponse(503, "Service Unavailable", b"", httpx.Headers()), True),
+        (UnexpectedResponse(429, "Too Many Requests", b"", httpx.Headers()), True),
+        (UnexpectedResponse(400, "Bad Request", b"", httpx.Headers()), False),
+        (httpx.ConnectError("connection refused"), True),
+        (TimeoutError(), True),
+        (ValueError("wrong vector dimension"), False),
+    ],
+)
+def test_only_transport_errors_5xx_and_429_are_transient(error, transient):
+    assert is_transient_error(error) is transient
+
+
+def test_grpc_errors_are_transient_by_status_code():
+    class RpcError(grpc.RpcError):
+        def __init__(self, code: grpc.StatusCode) -> None:
+            self._code = code
+
+        def code(self) -> grpc.StatusCode:
+            return self._code
+
+    assert is_transient_error(RpcError(grpc.StatusCode.UNAVAILABLE))
+    assert not is_transient_error(RpcError(grpc.StatusCode.INVALID_ARGUMENT))
+
+
+@pytest.mark.parametrize("wait", [True, False])
+def test_bulk_ingest_upserts_every_point(exhibitions_collection, wait):
+    exhibitions = [make_exhibition([1.0, float(i), 0.0]) for i in range(7)]
+
+    stats = EmbeddedExhibitionDocument.bulk_ingest(exhibitions, max_batch_points=2, max_concurrency=2, wait=wait)
+
+    assert (stats["num_points"], stats["num_failed_points"], stats["num_batches"]) == (7, 0, 4)
+    assert connection.count(collection_name=exhibitions_collection).count == 7
+
+
+@pytest.fixture
+def failing_upsert(monkeypatch):
+    """
+    Makes the next upserts raise the errors appended to the returned list, and records every attempt.
+    """
+    upsert = connection.upsert
+    errors, attempts = [], []
+
+    def _upsert(*args, **kwargs):
+        attempts.append(kwargs["points"])
+        if errors:
+            raise errors.pop(0)
+
+        return upsert(*args, **kwargs)
+
+    monkeypatch.setattr(connection, "upsert", _upsert)
+    monkeypatch.setattr(vector_module.time, "sleep", lambda seconds: None)
+
+    return errors, attempts
+
+
+def test_bulk_ingest_retries_the_transient_errors(exhibitions_collection, failing_upsert):
+    errors, attempts = failing_upsert
+    errors.append(UnexpectedResponse(503, "Service Unavailable", b"", httpx.Headers()))
+
+    exhibitions = [make_exhibition([1.0, 0.0, 0.0]) for _ in range(2)]
+    stats = EmbeddedExhibitionDocument.bulk_ingest(exhibitions, max_batch_points=2, max_retries=3, wait=True)
+
+    assert (stats["num_retries"], stats["num_failed_points"]) == (1, 0)
+    assert len(attempts) == 2
+    assert connection.count(collection_name=exhibitions_collection).count == 2
+
+
+def test_bulk_ingest_does_not_retry_the_client_errors(exhibitions_collection, failing_upsert):
+    errors, attempts = failing_upsert
+    errors.append(UnexpectedResponse(400, "Bad Request", b"", httpx.Headers()))
+
+    exhibitions = [make_exhibition([1.0, 0.0, 0.0]) for _ in range(2)]
+    stats = EmbeddedExhibitionDocument.bulk_ingest(exhibitions, max_batch_points=2, max_retries=3, wait=True)
+
+    assert (stats["num_points"], stats["num_failed_points"]) == (0, 2)
+    assert len(attempts) == 1
+    assert connection.count(collection_name=exhibitions_collection).count == 0
@@ -0,0 +1,50 @@
+import uuid
+
+from gallery_recommender.domain.data import GalleryData
+
+from .factories import make_gallery
+
+
+def test_bulk_upsert_inserts_new_documents_in_batches(mongo_database):
+    counts = GalleryData.bulk_upsert([make_gallery(f"gallery {i}") for i in range(5)], batch_size=2)
+
+    assert [batch["inserted"] for batch in counts] == [2, 2, 1]
+    assert mongo_database[GalleryData.get_collection_name()].count_documents({}) == 5
+
+
+def test_bulk_upsert_is_idempotent_and_keeps_the_stored_ids(mongo_database):
+    gallery = make_gallery("gallery")
+    GalleryData.bulk_upsert([gallery])
+
+    # a new crawl builds a new model, with a new id, for the same gallery
+    counts = GalleryData.bulk_upsert([make_gallery("gallery")])
+
+    assert counts == [{"inserted": 0, "updated": 0, "unchanged": 1, "errors": 0}]
+    stored = GalleryData.bulk_find()
+    assert [document.id for document in stored] == [gallery.id]
+
+
+def test_bulk_upsert_updates_the_documents_with_the_same_natural_key(mongo_database):
+    gallery = make_gallery("gallery")
+    GalleryData.bulk_upsert([gallery, make_gallery("other gallery")])
+
+    counts = GalleryData.bulk_upsert([make_gallery("gallery", description="new description")])
+
+    assert counts == [{"inserted": 0, "updated": 1, "unchanged": 0, "errors": 0}]
+    stored = GalleryData.find(name="gallery")
+    assert (stored.id, stored.description) == (gallery.id, "new description")
+    assert mongo_database[GalleryData.get_collection_name()].count_documents({}) == 2
+
+
+def test_bulk_upsert_of_nothing_writes_nothing(mongo_database):
+    assert GalleryData.bulk_upsert([]) == []
+    assert mongo_database[GalleryData.get_collection_name()].count_documents({}) == 0
+
+
+def test_the_ids_are_stored_as_strings(mongo_database):
+    gallery = make_gallery("gallery")
+    GalleryData.bulk_upsert([gallery])
+
+    stored = mongo_database[GalleryData.get_collection_name()].find_one({"name": "gallery"})
+    assert stored["_id"] == str(gallery.id)
+    assert isinstance(GalleryData.find(name="gallery").id, uuid.UUID)
@@ -0,0 +1,84 @@
+import itertools
+import types
+
+import numpy as np
+import pytest
+
+from gallery_recommender.application.networks import cache as cache_module
+from gallery_recommender.application.networks.cache import EmbeddingCache, normalize_text
+
+
+@pytest.fixture
+def cache(tmp_path, monkeypatch):
+    # every access gets its own timestamp, so the LRU order doesn't depend on the clock resolution
+    clock = itertools.count(1)
+    monkeypatch.setattr(cache_module, "time", types.SimpleNamespace(time=lambda: float(next(clock))))
+
+    return EmbeddingCache(cache_dir=tmp_path, max_entries=3)
+
+
+def _vectors(num_vectors: int, dim: int = 4) -> np.ndarray:
+    return np.arange(num_vectors * dim, dtype=np.float32).reshape(num_vectors, dim)
+
+
+def test_normalize_text_collapses_unicode_forms_and_whitespace():
+    assert normalize_text("  ｍｏｄｅｒｎ \n art ") == normalize_text("modern art")
+    assert normalize_text("modern  art") == "modern art"
+
+
+def test_get_many_returns_the_stored_vectors_and_none_for_misses(cache):
+    vectors = _vectors(2)
+    cache.put_many("model", ["a", "b"], vectors)
+
+    results = cache.get_many("model", ["b", "missing", "a"])
+
+    np.testing.assert_array_equal(results[0], vectors[1])
+    assert results[1] is None
+    np.testing.assert_array_equal(results[2], vectors[0])
+    assert results[0].dtype == np.float32
+
+
+def test_entries_are_keyed_by_model_and_normalized_text(cache):
+    cache.put_many("model", ["modern  art"], _vectors(1))
+
+    assert cache.get_many("model", [" modern art "])[0] is not None
+    assert cache.get_many("other-model", ["modern art"])[0] is None
+
+
+def test_stats_count_hits_and_misses(cache):
+    cache.put_many("model", ["a"], _vectors(1))
+    cache.get_many("model", ["a", "a", "b"])
+
+    stats = cache.stats()
+    assert (stats["hits"], stats["misses"]) == (2, 1)
+    assert stats["hit_rate"] == pytest.approx(2 / 3, abs=1e-4)
+
+    cache.reset_stats()
+    assert (cache.stats()["hits"], cache.stats()["misses"]) == (0, 0)
+
+
+def test_storing_a_cached_text_again_does_not_count_it_twice(cache):
+    cache.put_many("model", ["a", "b"], _vectors(2))
+    cache.put_many("model", ["a", "c"], _vectors(2))
+
+    assert len(cache) == 3
+    assert cache.stats()["evictions"] == 0
+
+
+def test_the_least_recently_used_entries_are_evicted(cache):
+    for text in ("a", "b", "c"):
+        cache.put_many("model", [text], _vectors(1))
+    # "a" becomes the most recently used entry
+    cache.get_many("model", ["a"])
+    cache.put_many("model", ["d"], _vectors(1))
+
+    assert len(cache) == 3
+    assert cache.stats()["evictions"] == 1
+    assert cache.get_many("model", ["b"]) == [None]
+    assert all(result is not None for result in cache.get_many("model", ["a", "c", "d"]))
+
+
+def test_the_entry_count_survives_a_reopen(tmp_path):
+    EmbeddingCache(cache_dir=tmp_path, max_entries=10).put_many("model", ["a", "b"], _vectors(2))
+
+    assert len(EmbeddingCache(cache_dir=tmp_path, max_entries=10)) == 2
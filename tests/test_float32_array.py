@@ -0,0 +1,47 @@
+import json
+
+import numpy as np
+import pytest
+from pydantic import ValidationError
+
+from gallery_recommender.domain.queries import EmbeddedQuery
+from gallery_recommender.domain.types import to_float32_array
+
+from .factories import make_exhibition
+
+
+def test_lists_and_float64_arrays_become_float32_vectors():
+    for value in ([1.0, 2.0], np.array([1.0, 2.0], dtype=np.float64)):
+        array = to_float32_array(value)
+
+        assert array.dtype == np.float32
+        np.testing.assert_array_equal(array, [1.0, 2.0])
+
+
+def test_float32_vectors_are_not_copied():
+    row = np.ones((2, 3), dtype=np.float32)[0]
+
+    assert to_float32_array(row) is row
+
+
+def test_only_1d_vectors_are_accepted():
+    with pytest.raises(ValueError):
+        to_float32_array([[1.0, 2.0]])
+
+    with pytest.raises(ValidationError):
+        EmbeddedQuery(content="modern art", embedding=[[1.0, 2.0]])
+
+
+def test_the_embedding_is_a_list_of_floats_only_in_json():
+    query = EmbeddedQuery(content="modern art", embedding=[0.5, 0.25])
+
+    assert isinstance(query.embedding, np.ndarray)
+    assert isinstance(query.model_dump()["embedding"], np.ndarray)
+    assert json.loads(query.model_dump_json())["embedding"] == [0.5, 0.25]
+
+
+def test_to_point_sends_the_embedding_as_a_list_of_floats():
+    point = make_exhibition([0.5, 0.25, 0.0]).to_point()
+
+    assert point.vector == [0.5, 0.25, 0.0]
+    assert "embedding" not in point.payload
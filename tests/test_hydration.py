@@ -0,0 +1,59 @@
+import datetime
+import uuid
+
+import numpy as np
+import pytest
+from pydantic import ValidationError
+from qdrant_client.models import Record
+
+from gallery_recommender.domain.base.hydration import construct_trusted
+from gallery_recommender.domain.data import GalleryData
+from gallery_recommender.domain.embedded_cleaned_data import EmbeddedExhibitionDocument
+
+from .factories import make_exhibition
+
+
+def test_construct_trusted_coerces_the_fields_that_do_not_round_trip():
+    exhibition = make_exhibition([1.0, 0.0, 0.0])
+    payload = exhibition.model_dump(mode="json")
+
+    hydrated = construct_trusted(EmbeddedExhibitionDocument, payload)
+
+    assert hydrated == exhibition
+    assert hydrated.exhibition_start_date == exhibition.exhibition_start_date
+    assert isinstance(hydrated.gallery_id, uuid.UUID)
+    assert hydrated.embedding.dtype == np.float32
+
+
+def test_construct_trusted_does_not_validate():
+    hydrated = construct_trusted(EmbeddedExhibitionDocument, {"id": str(uuid.uuid4()), "area": 42})
+
+    assert hydrated.area == 42
+
+
+def test_from_record_matches_the_validated_document():
+    exhibition = make_exhibition([1.0, 0.0, 0.0])
+    point = exhibition.to_point()
+    record = Record(id=point.id, payload=point.payload, vector=point.vector)
+
+    trusted = EmbeddedExhibitionDocument.from_record(record, strict=False)
+    validated = EmbeddedExhibitionDocument.from_record(record, strict=True)
+
+    for document in (trusted, validated):
+        assert document.model_dump(exclude={"embedding"}) == exhibition.model_dump(exclude={"embedding"})
+        np.testing.assert_array_equal(document.embedding, exhibition.embedding)
+        assert isinstance(document.exhibition_end_date, datetime.datetime)
+
+
+def test_from_record_validates_by_default():
+    record = Record(id=str(uuid.uuid4()), payload={"area": "DOWNTOWN"}, vector=None)
+
+    with pytest.raises(ValidationError):
+        EmbeddedExhibitionDocument.from_record(record)
+
+    assert EmbeddedExhibitionDocument.from_record(record, strict=False).area == "DOWNTOWN"
+
+
+def test_from_mongo_validates_by_default():
+    with pytest.raises(ValidationError):
+        GalleryData.from_mongo({"_id": str(uuid.uuid4()), "name": None})
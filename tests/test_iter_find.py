@@ -0,0 +1,45 @@
+import uuid
+
+import pytest
+
+from gallery_recommender.domain.data import GalleryData
+
+from .factories import make_gallery
+
+
+@pytest.fixture
+def galleries(mongo_database):
+    galleries = [make_gallery(f"gallery {i}", description=f"description {i}") for i in range(5)]
+    GalleryData.bulk_insert(galleries)
+
+    return galleries
+
+
+def test_iter_find_streams_sorted_limited_and_projected_documents(galleries):
+    found = list(GalleryData.iter_find({}, projection=["name"], sort=[("name", -1)], limit=3, batch_size=2))
+
+    assert [gallery.name for gallery in found] == ["gallery 4", "gallery 3", "gallery 2"]
+    assert [gallery.id for gallery in found] == [galleries[4].id, galleries[3].id, galleries[2].id]
+    assert all(isinstance(gallery.id, uuid.UUID) for gallery in found)
+    assert "description" not in found[0].model_fields_set
+
+
+def test_iter_find_filters_with_the_query_or_the_keyword_filters(galleries):
+    assert [gallery.id for gallery in GalleryData.iter_find({"name": "gallery 1"})] == [galleries[1].id]
+    assert [gallery.id for gallery in GalleryData.iter_find(name="gallery 2")] == [galleries[2].id]
+
+
+def test_a_projection_excluding_the_id_still_returns_it(galleries):
+    found = list(GalleryData.iter_find({}, projection={"_id": 0, "name": 1}, sort=[("name", 1)], limit=1))
+    excluded = list(GalleryData.iter_find({}, projection={"_id": 0, "description": 0}, sort=[("name", 1)], limit=1))
+
+    assert [(gallery.id, gallery.name) for gallery in found] == [(galleries[0].id, "gallery 0")]
+    assert [(gallery.id, gallery.name) for gallery in excluded] == [(galleries[0].id, "gallery 0")]
+    assert "description" not in excluded[0].model_fields_set
+
+
+def test_iter_find_without_a_projection_validates_the_full_documents(galleries):
+    found = list(GalleryData.iter_find({}, sort=[("name", 1)]))
+
+    assert found == galleries
+    assert found[0].description == "description 0"
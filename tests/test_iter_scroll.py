@@ -0,0 +1,78 @@
+import pytest
+from qdrant_client.models import FieldCondition, Filter, MatchValue
+
+from gallery_recommender.domain.embedded_cleaned_data import EmbeddedExhibitionDocument
+from gallery_recommender.infrastructure.db.qdrant import connection
+
+from .factories import make_exhibition
+
+
+@pytest.fixture
+def exhibitions(exhibitions_collection):
+    exhibitions = [
+        make_exhibition([1.0, 0.0, 0.0], area="WATERFRONT" if i % 3 == 0 else "DOWNTOWN", artist=f"artist {i}")
+        for i in range(8)
+    ]
+    connection.upsert(exhibitions_collection, points=[exhibition.to_point() for exhibition in exhibitions])
+
+    # the points are scrolled in the order of their ids
+    return sorted(exhibitions, key=lambda exhibition: str(exhibition.id))
+
+
+@pytest.fixture
+def scrolled_offsets(monkeypatch):
+    offsets = []
+    scroll = connection.scroll
+
+    def _scroll(*args, offset=None, **kwargs):
+        offsets.append(offset)
+
+        return scroll(*args, offset=offset, **kwargs)
+
+    monkeypatch.setattr(connection, "scroll", _scroll)
+
+    return offsets
+
+
+@pytest.mark.parametrize("prefetch", [True, False])
+def test_every_point_is_yielded_once_and_in_order_across_the_pages(exhibitions, scrolled_offsets, prefetch):
+    records = list(EmbeddedExhibitionDocument.iter_records(page_size=3, prefetch=prefetch))
+
+    assert [str(record.id) for record in records] == [str(exhibition.id) for exhibition in exhibitions]
+    # each page starts at the `next_page_offset` of the previous one
+    assert scrolled_offsets == [None, str(exhibitions[3].id), str(exhibitions[6].id)]
+
+
+@pytest.mark.parametrize("prefetch", [True, False])
+def test_iter_scroll_validates_the_documents_of_every_page(exhibitions, prefetch):
+    documents = list(EmbeddedExhibitionDocument.iter_scroll(page_size=3, with_vectors=True, prefetch=prefetch))
+
+    assert [document.id for document in documents] == [exhibition.id for exhibition in exhibitions]
+    assert [document.artist for document in documents] == [exhibition.artist for exhibition in exhibitions]
+
+
+def test_only_the_selected_payload_fields_are_fetched(exhibitions):
+    records = list(EmbeddedExhibitionDocument.iter_records(page_size=3, with_payload=["area"]))
+
+    assert [record.payload for record in records] == [{"area": exhibition.area} for exhibition in exhibitions]
+    assert all(record.vector is None for record in records)
+
+
+@pytest.mark.parametrize("prefetch", [True, False])
+def test_the_filter_applies_to_every_page(exhibitions, prefetch):
+    waterfront = Filter(must=[FieldCondition(key="area", match=MatchValue(value="WATERFRONT"))])
+
+    records = list(EmbeddedExhibitionDocument.iter_records(page_size=2, scroll_filter=waterfront, prefetch=prefetch))
+
+    assert [str(record.id) for record in records] == [
+        str(exhibition.id) for exhibition in exhibitions if exhibition.area == "WATERFRONT"
+    ]
+
+
+def test_stopping_early_fetches_at_most_the_prefetched_page(exhibitions, scrolled_offsets):
+    records = EmbeddedExhibitionDocument.iter_records(page_size=3)
+
+    assert str(next(records).id) == str(exhibitions[0].id)
+    records.close()
+
+    assert len(scrolled_offsets) <= 2
@@ -0,0 +1,92 @@
+import datetime
+import uuid
+
+import numpy as np
+import pytest
+
+from gallery_recommender.application.rag.local_index import LocalVectorIndex
+from gallery_recommender.domain.embedded_cleaned_data import EmbeddedExhibitionDocument
+from gallery_recommender.infrastructure.db.qdrant import connection
+
+from .factories import NOW, make_exhibition
+
+
+@pytest.fixture
+def exhibitions(exhibitions_collection):
+    exhibitions = [
+        make_exhibition([1.0, 0.0, 0.0]),
+        make_exhibition([0.9, 0.1, 0.0], area="WATERFRONT"),
+        make_exhibition([0.0, 1.0, 0.0]),
+        make_exhibition([0.8, 0.0, 0.2], ends_in_days=-1),
+    ]
+    points = [exhibition.to_point() for exhibition in exhibitions]
+    connection.upsert(collection_name=exhibitions_collection, points=points)
+
+    return exhibitions
+
+
+@pytest.fixture
+def index(exhibitions):
+    index = LocalVectorIndex(page_size=2)
+    index.sync()
+
+    return index
+
+
+def test_search_ranks_the_points_by_cosine_similarity(index, exhibitions):
+    results = index.search(query_vector=[2.0, 0.0, 0.0], limit=3)
+
+    assert [result.id for result in results] == [exhibitions[0].id, exhibitions[1].id, exhibitions[3].id]
+    assert isinstance(results[0], EmbeddedExhibitionDocument)
+
+
+def test_search_only_returns_the_points_matching_the_filters(index, exhibitions):
+    results = index.search(query_vector=[1.0, 0.0, 0.0], limit=10, filters={"area": "WATERFRONT"})
+
+    assert [result.id for result in results] == [exhibitions[1].id]
+
+
+def test_search_skips_the_exhibitions_outside_the_visit_window(index, exhibitions):
+    results = index.search(query_vector=[1.0, 0.0, 0.0], limit=10, end_date_gte=NOW.timestamp())
+
+    assert exhibitions[3].id not in {result.id for result in results}
+    assert len(results) == 3
+
+    before_start = (NOW - datetime.timedelta(days=20)).timestamp()
+    assert index.search(query_vector=[1.0, 0.0, 0.0], limit=10, start_date_lte=before_start) == []
+
+
+def test_search_on_an_empty_index_returns_nothing(exhibitions_collection):
+    index = LocalVectorIndex()
+
+    assert index.search(query_vector=[1.0, 0.0, 0.0]) == []
+    assert not index.is_fresh()
+
+    index.sync()
+    assert index.is_fresh()
+    assert index.search(query_vector=[1.0, 0.0, 0.0]) == []
+
+
+def test_sync_picks_up_new_changed_and_deleted_points(index, exhibitions, exhibitions_collection):
+    moved = exhibitions[2].model_copy(update={"area": "WATERFRONT"})
+    added = make_exhibition([0.0, 0.0, 1.0])
+    connection.upsert(collection_name=exhibitions_collection, points=[moved.to_point(), added.to_point()])
+    connection.delete(collection_name=exhibitions_collection, points_selector=[str(exhibitions[0].id)])
+
+    index.sync()
+
+    assert len(index) == 4
+    assert index.search(query_vector=[0.0, 0.0, 1.0], limit=1)[0].id == added.id
+    waterfront = index.search(query_vector=[0.0, 1.0, 0.0], limit=10, filters={"area": "WATERFRONT"})
+    assert [result.id for result in waterfront] == [exhibitions[2].id, exhibitions[1].id]
+
+
+def test_get_many_keeps_the_order_and_misses_return_none(index, exhibitions):
+    ids = [str(exhibitions[2].id), str(exhibitions[0].id)]
+
+    assert [document.id for document in index.get_many(ids)] == [exhibitions[2].id, exhibitions[0].id]
+    assert index.get_many([*ids, str(uuid.uuid4())]) is None
+
+
+def test_the_snapshot_vectors_are_unit_norm(index):
+    np.testing.assert_allclose(np.linalg.norm(index._snapshot.matrix, axis=1), 1.0, rtol=1e-6)
@@ -0,0 +1,73 @@
+import types
+
+import pytest
+
+from gallery_recommender.application.utils import cache as cache_module
+from gallery_recommender.application.utils.cache import LRUCache
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = types.SimpleNamespace(now=0.0)
+    monkeypatch.setattr(cache_module, "time", types.SimpleNamespace(monotonic=lambda: clock.now))
+
+    return clock
+
+
+def test_get_returns_the_default_on_a_miss():
+    cache = LRUCache(max_size=2)
+
+    assert cache.get("missing") is None
+    assert cache.get("missing", default=0) == 0
+
+
+def test_the_least_recently_used_entry_is_evicted():
+    cache = LRUCache(max_size=2)
+    cache.set("a", 1)
+    cache.set("b", 2)
+    # "a" becomes the most recently used entry
+    cache.get("a")
+    cache.set("c", 3)
+
+    assert cache.get("b") is None
+    assert (cache.get("a"), cache.get("c")) == (1, 3)
+    assert cache.stats()["evictions"] == 1
+    assert len(cache) == 2
+
+
+def test_entries_expire_after_the_ttl(clock):
+    cache = LRUCache(max_size=2, ttl_seconds=10.0)
+    cache.set("a", 1)
+
+    clock.now = 9.0
+    assert cache.get("a") == 1
+
+    clock.now = 11.0
+    assert cache.get("a") is None
+    assert cache.stats()["expirations"] == 1
+    assert len(cache) == 0
+
+
+def test_stats_count_hits_and_misses():
+    cache = LRUCache(max_size=2)
+    cache.set("a", 1)
+    cache.get("a")
+    cache.get("b")
+
+    stats = cache.stats()
+    assert (stats["hits"], stats["misses"], stats["hit_rate"]) == (1, 1, 0.5)
+
+    cache.reset_stats()
+    assert cache.stats()["hits"] == 0
+
+
+def test_invalidate_and_clear_drop_the_entries():
+    cache = LRUCache(max_size=2)
+    cache.set("a", 1)
+    cache.set("b", 2)
+
+    cache.invalidate("a")
+    assert cache.get("a") is None
+
+    cache.clear()
+    assert len(cache) == 0
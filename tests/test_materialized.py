@@ -0,0 +1,72 @@
+import datetime
+import time
+
+import pytest
+
+from gallery_recommender.application.rag.materialized import profile_key
+from gallery_recommender.domain.data import MaterializedRecommendationData
+
+PROFILE = {"level": "Beginner", "reason": "relax", "duration": "1 hour", "mood": "calm"}
+
+
+def make_row(area: str, exhibition_ids: list[str]) -> MaterializedRecommendationData:
+    return MaterializedRecommendationData(
+        profile_key=profile_key(PROFILE, {"area": area}),
+        area=area,
+        profile=PROFILE,
+        exhibition_ids=exhibition_ids,
+    )
+
+
+def test_profile_key_only_covers_the_discrete_profiles_by_area():
+    assert profile_key(PROFILE, {"area": "DOWNTOWN"}) == profile_key(
+        {**PROFILE, "level": " beginner "}, {"area": "DOWNTOWN"}
+    )
+    assert profile_key(PROFILE, {"area": "DOWNTOWN"}) != profile_key(PROFILE, {"area": "WATERFRONT"})
+    assert profile_key("a free-text query", {"area": "DOWNTOWN"}) is None
+    assert profile_key({**PROFILE, "artist": "someone"}, {"area": "DOWNTOWN"}) is None
+    assert profile_key(PROFILE, {"area": "DOWNTOWN", "artist": "someone"}) is None
+
+
+def test_replace_all_swaps_the_whole_table(mongo_database):
+    MaterializedRecommendationData.replace_all([make_row("DOWNTOWN", ["a"]), make_row("WATERFRONT", ["b"])])
+
+    assert MaterializedRecommendationData.replace_all([make_row("DOWNTOWN", ["c"])])
+
+    rows = MaterializedRecommendationData.bulk_find()
+    assert [(row.area, row.exhibition_ids) for row in rows] == [("DOWNTOWN", ["c"])]
+    assert mongo_database.list_collection_names() == [MaterializedRecommendationData.get_collection_name()]
+
+
+def test_replace_all_keeps_the_declared_indexes(mongo_database):
+    MaterializedRecommendationData.replace_all([make_row("DOWNTOWN", ["a"])])
+
+    indexes = mongo_database[MaterializedRecommendationData.get_collection_name()].index_information()
+    assert indexes["created_at_1"]["expireAfterSeconds"] > 0
+
+
+def test_replace_all_with_no_rows_empties_the_table(mongo_database):
+    MaterializedRecommendationData.replace_all([make_row("DOWNTOWN", ["a"])])
+
+    assert MaterializedRecommendationData.replace_all([])
+    assert MaterializedRecommendationData.bulk_find() == []
+
+
+@pytest.fixture
+def tokyo_host(monkeypatch):
+    monkeypatch.setenv("TZ", "Asia/Tokyo")
+    time.tzset()
+
+    yield
+
+    monkeypatch.undo()
+    time.tzset()
+
+
+def test_created_at_is_stored_in_utc_for_the_ttl_index(mongo_database, tokyo_host):
+    MaterializedRecommendationData.replace_all([make_row("DOWNTOWN", ["a"])])
+
+    stored = mongo_database[MaterializedRecommendationData.get_collection_name()].find_one()
+    utc_now = datetime.datetime.now(datetime.timezone.utc).replace(tzinfo=None)
+    assert abs(stored["created_at"] - utc_now) < datetime.timedelta(minutes=1)
+    assert make_row("DOWNTOWN", ["a"]).created_at.utcoffset() == datetime.timedelta(0)
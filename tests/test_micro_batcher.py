@@ -0,0 +1,76 @@
+import threading
+
+import numpy as np
+import pytest
+
+from gallery_recommender.application.networks.batching import MicroBatcher
+
+
+class RecordingPredict:
+    """
+    Doubles its inputs and records the size of every batch. The first batch is held until `release` is set,
+    so the requests submitted meanwhile queue up behind it.
+    """
+
+    def __init__(self) -> None:
+        self.batch_sizes: list[int] = []
+        self.started = threading.Event()
+        self.release = threading.Event()
+
+    def __call__(self, items: list[float]) -> np.ndarray:
+        self.started.set()
+        self.release.wait(timeout=5)
+        self.batch_sizes.append(len(items))
+
+        return np.asarray(items) * 2
+
+
+@pytest.fixture
+def predict():
+    return RecordingPredict()
+
+
+@pytest.fixture
+def batcher(predict):
+    batcher = MicroBatcher(predict, max_batch_size=4, max_wait_ms=50.0)
+
+    yield batcher
+
+    predict.release.set()
+    batcher.shutdown()
+
+
+def test_every_caller_gets_the_outputs_of_its_own_inputs(predict, batcher):
+    predict.release.set()
+
+    np.testing.assert_array_equal(batcher([1.0, 2.0]), [2.0, 4.0])
+    np.testing.assert_array_equal(batcher([3.0]), [6.0])
+
+
+def test_queued_requests_share_a_batch_up_to_the_max_batch_size(predict, batcher):
+    first = batcher.submit([0.0])
+    assert predict.started.wait(timeout=5)
+
+    futures = [batcher.submit([float(i), float(i)]) for i in range(1, 4)]
+    predict.release.set()
+
+    np.testing.assert_array_equal(first.result(timeout=5), [0.0])
+    for i, future in enumerate(futures, start=1):
+        np.testing.assert_array_equal(future.result(timeout=5), [2.0 * i, 2.0 * i])
+
+    # 6 queued items with a max batch size of 4: two requests fit in the second batch, the last one goes alone
+    assert predict.batch_sizes == [1, 4, 2]
+    stats = batcher.stats()
+    assert (stats["num_batches"], stats["num_requests"], stats["num_items"]) == (3, 4, 7)
+
+
+def test_a_failed_batch_fails_every_request_in_it():
+    def failing_predict(items):
+        raise RuntimeError("model failure")
+
+    batcher = MicroBatcher(failing_predict, max_batch_size=4, max_wait_ms=1.0)
+    try:
+        with pytest.raises(RuntimeError, match="model failure"):
+            batcher([1.0])
+    finally:
+        batcher.shutdown()
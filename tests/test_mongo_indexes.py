@@ -0,0 +1,91 @@
+import mongomock
+from pymongo import ASCENDING, DESCENDING, IndexModel, errors
+
+from gallery_recommender.domain.base.nosql import _same_index
+from gallery_recommender.domain.data import ExhibitionData, GalleryData
+
+from .factories import make_gallery
+
+
+def test_same_index_compares_the_keys_in_order():
+    declared = IndexModel([("name", ASCENDING), ("gallery_id", ASCENDING)]).document
+
+    assert _same_index(declared, {"key": [("name", 1), ("gallery_id", 1)], "v": 2})
+    assert not _same_index(declared, {"key": [("gallery_id", 1), ("name", 1)], "v": 2})
+    assert not _same_index(declared, {"key": [("name", 1), ("gallery_id", -1)], "v": 2})
+
+
+def test_same_index_compares_the_options_but_not_the_server_ones():
+    declared = IndexModel([("name", ASCENDING)], unique=True).document
+
+    assert _same_index(declared, {"key": [("name", 1)], "unique": True, "v": 2, "ns": "db.gallery"})
+    assert not _same_index(declared, {"key": [("name", 1)], "v": 2})
+
+
+def test_ensure_indexes_creates_the_declared_indexes_once(mongo_database):
+    first = ExhibitionData.ensure_indexes()
+    second = ExhibitionData.ensure_indexes()
+
+    declared = [index.document["name"] for index in ExhibitionData.get_indexes()]
+    assert sorted(first["created"]) == sorted(declared)
+    assert second["created"] == [] and sorted(second["unchanged"]) == sorted(declared)
+    assert set(declared) <= set(mongo_database[ExhibitionData.get_collection_name()].index_information())
+
+
+def test_ensure_indexes_recreates_the_indexes_whose_options_changed(mongo_database):
+    collection = mongo_database[GalleryData.get_collection_name()]
+    collection.create_indexes([IndexModel([("name", ASCENDING)])])
+
+    changes = GalleryData.ensure_indexes()
+
+    assert changes["recreated"] == ["name_1"]
+    assert collection.index_information()["name_1"].get("unique") is True
+
+
+def test_a_unique_index_over_duplicated_documents_keeps_the_old_index(mongo_database):
+    collection = mongo_database[GalleryData.get_collection_name()]
+    collection.create_indexes([IndexModel([("name", ASCENDING)])])
+    GalleryData.bulk_insert([make_gallery("gallery"), make_gallery("gallery")])
+
+    changes = GalleryData.ensure_indexes()
+
+    assert changes["failed"] == ["name_1"]
+    assert changes["recreated"] == changes["created"] == changes["unchanged"] == []
+    assert "unique" not in collection.index_information()["name_1"]
+
+
+def test_an_index_failing_to_build_is_put_back(monkeypatch, mongo_database):
+    collection = mongo_database[GalleryData.get_collection_name()]
+    collection.create_indexes([IndexModel([("name", ASCENDING)])])
+    create_indexes = mongomock.collection.Collection.create_indexes
+
+    def _create_indexes(self, indexes, *args, **kwargs):
+        if any(index.document.get("unique") for index in indexes):
+            raise errors.OperationFailure("index build interrupted")
+
+        return create_indexes(self, indexes, *args, **kwargs)
+
+    monkeypatch.setattr(mongomock.collection.Collection, "create_indexes", _create_indexes)
+
+    changes = GalleryData.ensure_indexes()
+
+    assert {bucket: names for bucket, names in changes.items() if names} == {"failed": ["name_1"]}
+    assert list(collection.index_information()["name_1"]["key"]) == [("name", 1)]
+    assert "unique" not in collection.index_information()["name_1"]
+
+
+def test_ensure_indexes_only_drops_the_undeclared_indexes_when_asked(mongo_database):
+    collection = mongo_database[GalleryData.get_collection_name()]
+    collection.create_indexes([IndexModel([("website", DESCENDING)])])
+
+    assert GalleryData.ensure_indexes()["dropped"] == []
+    assert GalleryData.ensure_indexes(drop_undeclared=True)["dropped"] == ["website_-1"]
+    assert "website_-1" not in collection.index_information()
+
+
+def test_a_model_without_declared_indexes_has_none():
+    class UndeclaredData(GalleryData):
+        class Settings:
+            name = "undeclared"
+
+    assert UndeclaredData.get_indexes() == []
@@ -0,0 +1,38 @@
+import numpy as np
+import pytest
+
+from gallery_recommender.application.networks.onnx_backend import (
+    OnnxCrossEncoderBackend,
+    OnnxEmbeddingBackend,
+    OnnxModelBackend,
+)
+
+
+class SentenceTransformerDimension:
+    def get_sentence_embedding_dimension(self) -> int:
+        return 384
+
+
+def test_the_base_backend_cannot_be_instantiated(tmp_path):
+    with pytest.raises(TypeError):
+        OnnxModelBackend(model_id="model", quantize=False, cache_dir=tmp_path)
+
+
+def test_encoding_no_texts_returns_an_empty_matrix():
+    # the empty input returns before any session is run, so the backend is built without exporting a model
+    backend = object.__new__(OnnxEmbeddingBackend)
+    backend._model = SentenceTransformerDimension()
+
+    embeddings = backend.encode([])
+
+    assert embeddings.shape == (0, 384)
+    assert embeddings.dtype == np.float32
+
+
+def test_predicting_no_pairs_returns_no_scores():
+    backend = object.__new__(OnnxCrossEncoderBackend)
+
+    scores = backend.predict([])
+
+    assert scores.shape == (0,)
+    assert scores.dtype == np.float32
@@ -0,0 +1,86 @@
+import types
+
+import pytest
+from qdrant_client.models import PayloadSchemaType
+
+from gallery_recommender.application.indexing import initialize_indices
+from gallery_recommender.domain.embedded_cleaned_data import EmbeddedExhibitionDocument
+from gallery_recommender.infrastructure.db.qdrant import QdrantDatabaseConnector, connection
+
+DECLARED = EmbeddedExhibitionDocument.get_payload_indexes()
+
+
+@pytest.fixture
+def payload_schema(monkeypatch):
+    """
+    A server-side payload schema in place of the embedded engine's, which doesn't build payload indexes.
+    """
+    schema = {}
+    calls = []
+
+    def _create_payload_index(collection_name, field_name, field_schema, **kwargs):
+        calls.append(("create", field_name))
+        schema[field_name] = PayloadSchemaType(field_schema)
+
+    def _delete_payload_index(collection_name, field_name, **kwargs):
+        calls.append(("delete", field_name))
+        del schema[field_name]
+
+    def _get_or_create_collection(cls):
+        payload_schema = {field: types.SimpleNamespace(data_type=schema_type) for field, schema_type in schema.items()}
+
+        return types.SimpleNamespace(payload_schema=payload_schema)
+
+    monkeypatch.setattr(QdrantDatabaseConnector, "is_embedded", classmethod(lambda cls: False))
+    monkeypatch.setattr(connection, "create_payload_index", _create_payload_index)
+    monkeypatch.setattr(connection, "delete_payload_index", _delete_payload_index)
+    monkeypatch.setattr(EmbeddedExhibitionDocument, "get_or_create_collection", classmethod(_get_or_create_collection))
+
+    return schema, calls
+
+
+def test_the_missing_indexes_are_created_once(payload_schema):
+    schema, calls = payload_schema
+
+    first = EmbeddedExhibitionDocument.reconcile_payload_indexes()
+    second = EmbeddedExhibitionDocument.reconcile_payload_indexes()
+
+    assert sorted(first["created"]) == sorted(DECLARED)
+    assert schema == {field: PayloadSchemaType(schema_type) for field, schema_type in DECLARED.items()}
+    assert second["created"] == second["recreated"] == [] and sorted(second["unchanged"]) == sorted(DECLARED)
+    assert len(calls) == len(DECLARED)
+
+
+def test_the_indexes_whose_type_changed_are_recreated_and_the_matching_ones_left(payload_schema):
+    schema, calls = payload_schema
+    schema.update({"area": PayloadSchemaType.KEYWORD, "exhibition_end_date_ts": PayloadSchemaType.KEYWORD})
+
+    changes = EmbeddedExhibitionDocument.reconcile_payload_indexes()
+
+    assert changes["unchanged"] == ["area"]
+    assert changes["recreated"] == ["exhibition_end_date_ts"]
+    assert schema["exhibition_end_date_ts"] == PayloadSchemaType.FLOAT
+    assert ("delete", "area") not in calls and ("create", "area") not in calls
+
+
+def test_the_undeclared_indexes_are_only_dropped_when_asked(payload_schema):
+    schema, _ = payload_schema
+    # the keyword index every field of the exhibitions used to get
+    schema["description"] = PayloadSchemaType.KEYWORD
+
+    assert initialize_indices()[EmbeddedExhibitionDocument.get_collection_name()]["dropped"] == []
+    assert "description" in schema
+
+    changes = initialize_indices(drop_undeclared=True)[EmbeddedExhibitionDocument.get_collection_name()]
+
+    assert changes["dropped"] == ["description"]
+    assert set(schema) == set(DECLARED)
+
+
+def test_the_embedded_engine_is_skipped():
+    assert EmbeddedExhibitionDocument.reconcile_payload_indexes(drop_undeclared=True) == {
+        "created": [],
+        "recreated": [],
+        "dropped": [],
+        "unchanged": [],
+    }
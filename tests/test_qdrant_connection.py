@@ -0,0 +1,133 @@
+import grpc
+import httpx
+import pytest
+from qdrant_client.http.exceptions import ResponseHandlingException, UnexpectedResponse
+
+from gallery_recommender.application.networks import EmbeddingModelSingleton
+from gallery_recommender.application.networks.base import SingletonMeta
+from gallery_recommender.domain.embedded_cleaned_data import EmbeddedExhibitionDocument
+from gallery_recommender.infrastructure.db.qdrant import (
+    QdrantDatabaseConnector,
+    connection,
+    is_qdrant_error,
+    is_transient_error,
+)
+from gallery_recommender.settings import settings
+
+from .conftest import KeywordEmbeddingModel
+from .factories import make_exhibition
+
+
+@pytest.mark.parametrize(
+    "error, qdrant_error",
+    [
+        (UnexpectedResponse(404, "Not Found", b"", httpx.Headers()), True),
+        (ValueError("Collection embedded_exhibitions not found"), True),
+        (ValueError("could not convert string to float: 'x'"), False),
+        (TypeError("Collection embedded_exhibitions not found"), False),
+    ],
+)
+def test_only_the_missing_collection_of_the_embedded_engine_is_a_qdrant_value_error(error, qdrant_error):
+    assert is_qdrant_error(error) is qdrant_error
+
+
+def test_the_errors_of_the_real_embedded_engine_are_recognized():
+    with pytest.raises(ValueError) as error:
+        connection.scroll(collection_name="missing_collection")
+
+    assert is_qdrant_error(error.value)
+
+
+def test_the_wrapped_transport_errors_and_unknown_statuses_are_transient():
+    assert is_transient_error(ResponseHandlingException(httpx.ConnectError("connection refused")))
+    assert is_transient_error(UnexpectedResponse(None, "", b"", httpx.Headers()))
+    assert not is_transient_error(ValueError("Collection embedded_exhibitions not found"))
+
+
+@pytest.fixture
+def missing_collection(monkeypatch):
+    """
+    No exhibitions collection, and an embedding size matching the 3-dimensional test vectors when one is created.
+    """
+    monkeypatch.setitem(SingletonMeta._instances, EmbeddingModelSingleton, KeywordEmbeddingModel())
+    collection_name = EmbeddedExhibitionDocument.get_collection_name()
+    assert not connection.collection_exists(collection_name=collection_name)
+
+    yield collection_name
+
+    connection.delete_collection(collection_name)
+
+
+def test_bulk_insert_creates_the_missing_collection(missing_collection):
+    assert EmbeddedExhibitionDocument.bulk_insert([make_exhibition([1.0, 0.0, 0.0])])
+
+    assert connection.count(collection_name=missing_collection).count == 1
+
+
+def test_bulk_insert_does_not_mistake_a_serialization_error_for_a_missing_collection(monkeypatch, missing_collection):
+    def _to_point(self, **kwargs):
+        raise ValueError("could not serialize the document")
+
+    monkeypatch.setattr(EmbeddedExhibitionDocument, "to_point", _to_point)
+
+    with pytest.raises(ValueError, match="could not serialize"):
+        EmbeddedExhibitionDocument.bulk_insert([make_exhibition([1.0, 0.0, 0.0])])
+    assert not connection.collection_exists(collection_name=missing_collection)
+
+
+def test_bulk_insert_does_not_recreate_an_existing_collection(monkeypatch, exhibitions_collection):
+    def _upsert(*args, **kwargs):
+        raise UnexpectedResponse(400, "Bad Request", b"", httpx.Headers())
+
+    monkeypatch.setattr(connection, "upsert", _upsert)
+    monkeypatch.setattr(EmbeddedExhibitionDocument, "create_collection", classmethod(lambda cls: pytest.fail()))
+
+    assert not EmbeddedExhibitionDocument.bulk_insert([make_exhibition([1.0, 0.0, 0.0])])
+
+
+def test_the_reads_of_a_missing_collection_return_nothing(missing_collection):
+    assert EmbeddedExhibitionDocument.search(query_vector=[1.0, 0.0, 0.0]) == []
+    assert EmbeddedExhibitionDocument.search_batch(query_vectors=[[1.0, 0.0, 0.0]]) == [[]]
+    assert EmbeddedExhibitionDocument.bulk_find() == ([], None)
+    assert EmbeddedExhibitionDocument.bulk_retrieve(["00000000-0000-4000-8000-000000000000"]) == []
+
+
+def test_the_client_keeps_the_rest_connections_alive(monkeypatch):
+    monkeypatch.setattr(settings, "USE_QDRANT_CLOUD", False)
+    monkeypatch.setattr(settings, "QDRANT_PREFER_GRPC", False)
+    monkeypatch.setattr(settings, "QDRANT_POOL_SIZE", 8)
+
+    kwargs = QdrantDatabaseConnector.client_kwargs()
+
+    assert (kwargs["host"], kwargs["port"], kwargs["prefer_grpc"]) == (
+        settings.QDRANT_DATABASE_HOST,
+        settings.QDRANT_DATABASE_PORT,
+        False,
+    )
+    assert kwargs["limits"].max_connections == kwargs["limits"].max_keepalive_connections == 8
+    assert kwargs["timeout"] == settings.QDRANT_TIMEOUT
+
+
+def test_the_grpc_channel_is_kept_alive_on_the_cloud(monkeypatch):
+    monkeypatch.setattr(settings, "USE_QDRANT_CLOUD", True)
+    monkeypatch.setattr(settings, "QDRANT_CLOUD_URL", "https://cluster.example.com")
+    monkeypatch.setattr(settings, "QDRANT_APIKEY", "api-key")
+    monkeypatch.setattr(settings, "QDRANT_PREFER_GRPC", True)
+    monkeypatch.setattr(settings, "QDRANT_GRPC_KEEPALIVE_MS", 5000)
+
+    kwargs = QdrantDatabaseConnector.client_kwargs()
+
+    assert (kwargs["url"], kwargs["api_key"], kwargs["prefer_grpc"]) == ("https://cluster.example.com", "api-key", True)
+    assert "host" not in kwargs
+    assert kwargs["grpc_port"] == settings.QDRANT_GRPC_PORT
+    assert kwargs["grpc_options"]["grpc.keepalive_time_ms"] == 5000
+    assert kwargs["grpc_options"]["grpc.keepalive_permit_without_calls"] == 1
+
+
+def test_grpc_status_errors_are_qdrant_errors():
+    class RpcError(grpc.RpcError):
+        def code(self) -> grpc.StatusCode:
+            return grpc.StatusCode.NOT_FOUND
+
+    assert is_qdrant_error(RpcError())
+    assert not is_transient_error(RpcError())
@@ -0,0 +1,76 @@
+import numpy as np
+import pytest
+
+from gallery_recommender.application.preprocessing import embedding_data_handlers
+from gallery_recommender.application.preprocessing.embedding_data_handlers import QueryEmbeddingHandler
+from gallery_recommender.domain.embedded_cleaned_data import EmbeddedExhibitionDocument
+from gallery_recommender.domain.queries import Query
+from gallery_recommender.infrastructure.db.qdrant import connection
+
+from .factories import make_exhibition
+
+
+class CountingEmbeddingModel:
+    """
+    Embeds a text as [length, 1, 0] and records the texts of every call.
+    """
+
+    model_id = "counting-embedding-model"
+    backend = "torch"
+    embedding_size = 3
+    max_input_length = 128
+
+    def __init__(self) -> None:
+        self.calls: list[list[str]] = []
+
+    def __call__(self, texts: list[str], to_list: bool = True, persistent_cache: bool = True) -> np.ndarray:
+        assert not persistent_cache, "the online queries must not go through the disk cache"
+        self.calls.append(texts)
+
+        return np.array([[len(text), 1.0, 0.0] for text in texts], dtype=np.float32)
+
+
+@pytest.fixture
+def embedding_model(monkeypatch):
+    embedding_model = CountingEmbeddingModel()
+    monkeypatch.setattr(embedding_data_handlers, "embedding_model", embedding_model)
+    embedding_data_handlers.query_embedding_cache.clear()
+    embedding_data_handlers.query_embedding_cache.reset_stats()
+
+    yield embedding_model
+
+    embedding_data_handlers.query_embedding_cache.clear()
+
+
+def test_only_the_uncached_queries_are_embedded(embedding_model):
+    handler = QueryEmbeddingHandler()
+
+    handler.embed_batch([Query.from_str("modern art")])
+    embedded = handler.embed_batch([Query.from_str("modern  art"), Query.from_str("photography")])
+
+    assert embedding_model.calls == [["modern art"], ["photography"]]
+    np.testing.assert_array_equal(embedded[0].embedding, [10.0, 1.0, 0.0])
+    assert QueryEmbeddingHandler.cache_stats()["hits"] == 1
+
+
+def test_the_cached_embeddings_are_read_only_copies(embedding_model):
+    handler = QueryEmbeddingHandler()
+
+    first = handler.embed_batch([Query.from_str("modern art"), Query.from_str("photography")])
+    second = handler.embed_batch([Query.from_str("modern art")])
+
+    assert not first[0].embedding.flags.writeable
+    assert not np.shares_memory(first[0].embedding, first[1].embedding)
+    with pytest.raises(ValueError):
+        second[0].embedding[0] = 0.0
+
+
+def test_the_cached_embeddings_can_be_searched(embedding_model, exhibitions_collection):
+    exhibition = make_exhibition([1.0, 0.0, 0.0])
+    connection.upsert(exhibitions_collection, points=[exhibition.to_point()])
+    embedded = QueryEmbeddingHandler().embed_batch([Query.from_str("modern art")])[0]
+
+    results = EmbeddedExhibitionDocument.search(query_vector=embedded.embedding, limit=1)
+
+    assert not embedded.embedding.flags.writeable
+    assert [result.id for result in results] == [exhibition.id]
@@ -0,0 +1,126 @@
+import time
+import uuid
+
+import pytest
+
+from gallery_recommender.application.rag.query_expansion import reciprocal_rank_fusion
+from gallery_recommender.domain.queries import Query
+from gallery_recommender.infrastructure.db.qdrant import connection
+from gallery_recommender.settings import settings
+
+from .factories import make_exhibition
+
+
+class Document:
+    def __init__(self, name: str) -> None:
+        self.id = uuid.uuid5(uuid.NAMESPACE_URL, name)
+        self.name = name
+
+
+def names(documents: list) -> list[str]:
+    return [document.name for document in documents]
+
+
+def test_rrf_ranks_the_documents_found_by_several_lists_first():
+    a, b, c, d = Document("a"), Document("b"), Document("c"), Document("d")
+
+    fused = reciprocal_rank_fusion([[a, b, c], [d, c, b]])
+
+    assert names(fused) == ["b", "c", "a", "d"]
+
+
+def test_rrf_breaks_ties_by_first_appearance_and_deduplicates_by_id():
+    a, b = Document("a"), Document("b")
+
+    fused = reciprocal_rank_fusion([[a], [b], [Document("a")]])
+
+    assert names(fused) == ["a", "b"]
+    assert fused[0] is a
+    assert names(reciprocal_rank_fusion([[b], [a]])) == ["b", "a"]
+
+
+def test_rrf_limits_the_fused_list():
+    documents = [Document(name) for name in "abcd"]
+
+    assert names(reciprocal_rank_fusion([documents], limit=2)) == ["a", "b"]
+    assert reciprocal_rank_fusion([[], []]) == []
+
+
+class Expander:
+    """
+    Expands every query into `expansions`, after `delay` seconds, or raises `error`.
+    """
+
+    def __init__(self, expansions: list[str], delay: float = 0.0, error: Exception | None = None) -> None:
+        self.expansions = expansions
+        self.delay = delay
+        self.error = error
+
+    def generate(self, query: Query, expand_to_n: int) -> list[Query]:
+        time.sleep(self.delay)
+        if self.error is not None:
+            raise self.error
+
+        return [query, *(query.replace_content(expansion) for expansion in self.expansions)]
+
+
+@pytest.fixture
+def expansion_retriever(monkeypatch, retriever, exhibitions_collection):
+    monkeypatch.setattr(settings, "RAG_QUERY_EXPANSION_ENABLED", True)
+    monkeypatch.setattr(settings, "RAG_QUERY_EXPANSION_BUDGET_MS", 1000.0)
+
+    exhibitions = {
+        "painting": make_exhibition([1.0, 0.0, 0.0]),
+        "painting and sculpture": make_exhibition([0.8, 0.6, 0.0]),
+        "sculpture": make_exhibition([0.0, 1.0, 0.0]),
+    }
+    connection.upsert(exhibitions_collection, points=[exhibition.to_point() for exhibition in exhibitions.values()])
+    ids = {exhibition.id: name for name, exhibition in exhibitions.items()}
+
+    def _retrieve(query: str, k: int) -> list[str]:
+        _, documents = retriever.retrieve(query, k=k)
+
+        return [ids[document.id] for document in documents]
+
+    return retriever, _retrieve
+
+
+def test_the_expanded_searches_are_fused_into_as_many_candidates_as_the_plain_search(expansion_retriever):
+    retriever, retrieve = expansion_retriever
+    retriever._query_expander = Expander(["sculpture"])
+
+    # k // 2 candidates, as without expansion. The exhibition found by both searches comes first
+    assert retrieve("painting", k=4) == ["painting and sculpture", "painting"]
+
+
+def test_a_failed_expansion_falls_back_to_the_original_query(expansion_retriever):
+    retriever, retrieve = expansion_retriever
+    retriever._query_expander = Expander(["sculpture"], error=RuntimeError("no LLM"))
+
+    assert retrieve("painting", k=4) == ["painting", "painting and sculpture"]
+
+
+def test_an_expansion_past_the_budget_is_dropped(monkeypatch, expansion_retriever):
+    retriever, retrieve = expansion_retriever
+    monkeypatch.setattr(settings, "RAG_QUERY_EXPANSION_BUDGET_MS", 50.0)
+    retriever._query_expander = Expander(["sculpture"], delay=0.5)
+
+    assert retrieve("painting", k=4) == ["painting", "painting and sculpture"]
+
+
+def test_the_expanded_searches_past_the_budget_are_dropped(monkeypatch, expansion_retriever):
+    retriever, retrieve = expansion_retriever
+    monkeypatch.setattr(settings, "RAG_QUERY_EXPANSION_BUDGET_MS", 200.0)
+    retriever._query_expander = Expander(["sculpture"])
+
+    search_embedded = retriever._search_embedded
+
+    def _slow_expanded_search(embedded_query, k, filters):
+        if embedded_query.content == "sculpture":
+            time.sleep(0.5)
+
+        return search_embedded(embedded_query, k, filters)
+
+    monkeypatch.setattr(retriever, "_search_embedded", _slow_expanded_search)
+
+    assert retrieve("painting", k=4) == ["painting", "painting and sculpture"]
@@ -0,0 +1,85 @@
+import uuid
+
+import pytest
+
+from gallery_recommender.application.networks import CrossEncoderModelSingleton
+from gallery_recommender.application.networks.base import SingletonMeta
+from gallery_recommender.application.rag import reranking
+from gallery_recommender.application.rag.reranking import Reranker
+from gallery_recommender.domain.queries import Query
+
+
+class CountingCrossEncoder:
+    """
+    Scores a pair by the length of the document and records the pairs it was called with.
+    """
+
+    model_id = "counting-cross-encoder"
+
+    def __init__(self) -> None:
+        self.calls: list[list[tuple[str, str]]] = []
+
+    def __call__(self, pairs: list[tuple[str, str]]) -> list[float]:
+        self.calls.append(pairs)
+
+        return [float(len(document)) for _, document in pairs]
+
+    def batching_stats(self) -> dict:
+        return {}
+
+
+class Document:
+    def __init__(self, description: str, id: uuid.UUID | None = None) -> None:
+        self.id = id or uuid.uuid4()
+        self.description = description
+
+
+@pytest.fixture
+def cross_encoder(monkeypatch):
+    cross_encoder = CountingCrossEncoder()
+    monkeypatch.setitem(SingletonMeta._instances, CrossEncoderModelSingleton, cross_encoder)
+    reranking.score_cache.clear()
+
+    yield cross_encoder
+
+    reranking.score_cache.clear()
+
+
+def test_documents_are_ranked_by_score(cross_encoder):
+    documents = [Document("short"), Document("the longest description"), Document("a longer one")]
+
+    ranked = Reranker().generate(Query.from_str("modern art"), documents, keep_top_k=2)
+
+    assert ranked == [documents[1], documents[2]]
+
+
+def test_only_the_uncached_pairs_are_scored(cross_encoder):
+    query = Query.from_str("modern art")
+    cached, new = Document("cached"), Document("new")
+    reranker = Reranker()
+
+    reranker.generate(query, [cached], keep_top_k=1)
+    reranker.generate(query, [cached, new], keep_top_k=2)
+
+    assert cross_encoder.calls == [[("modern art", "cached")], [("modern art", "new")]]
+
+
+def test_a_changed_description_is_scored_again(cross_encoder):
+    query = Query.from_str("modern art")
+    document_id = uuid.uuid4()
+    reranker = Reranker()
+
+    reranker.generate(query, [Document("before", id=document_id)], keep_top_k=1)
+    reranker.generate(query, [Document("after", id=document_id)], keep_top_k=1)
+
+    assert len(cross_encoder.calls) == 2
+
+
+def test_generate_many_scores_every_query_in_one_call(cross_encoder):
+    queries = [Query.from_str("modern art"), Query.from_str("photography")]
+    documents = [[Document("a"), Document("abc")], [Document("ab")]]
+
+    ranked = Reranker().generate_many(queries, documents, keep_top_k=[1, 1])
+
+    assert len(cross_encoder.calls) == 1
+    assert ranked == [[documents[0][1]], [documents[1][0]]]
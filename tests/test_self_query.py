@@ -0,0 +1,270 @@
+import asyncio
+import datetime
+import json
+import types
+
+import pytest
+
+from gallery_recommender.application.rag import self_query as self_query_module
+from gallery_recommender.application.rag.self_query import (
+    DATE_FROM_FILTER,
+    DATE_TO_FILTER,
+    SelfQuery,
+    SelfQueryFilters,
+    extract_filters,
+    profile_text,
+)
+from gallery_recommender.domain.queries import Query
+from gallery_recommender.infrastructure.db.qdrant import connection
+from gallery_recommender.settings import settings
+
+from .factories import make_exhibition
+
+# a Wednesday
+TODAY = datetime.date(2026, 6, 3)
+
+
+def window(date_from: datetime.date, date_to: datetime.date) -> tuple[float, float]:
+    return (
+        datetime.datetime.combine(date_from, datetime.time.min).timestamp(),
+        datetime.datetime.combine(date_to, datetime.time.max).timestamp(),
+    )
+
+
+def extracted_window(question: str, today: datetime.date = TODAY) -> tuple[float, float] | None:
+    extracted = extract_filters(question, today)
+    if extracted.date_from is None:
+        return None
+
+    return extracted.date_from, extracted.date_to
+
+
+@pytest.fixture(autouse=True)
+def clear_self_query_cache():
+    self_query_module.self_query_cache.clear()
+
+    yield
+
+    self_query_module.self_query_cache.clear()
+
+
+@pytest.mark.parametrize(
+    "question, area",
+    [
+        ("galleries in the waterfront", "WATERFRONT"),
+        ("something in the Historic District tonight", "HISTORIC_DISTRICT"),
+        ("downtown-ish places", "DOWNTOWN"),
+        ("somewhere calm", None),
+    ],
+)
+def test_the_area_is_matched_on_whole_words(question, area):
+    assert extract_filters(question, TODAY).area == area
+
+
+@pytest.mark.parametrize(
+    "question, artist",
+    [
+        ("paintings by Yayoi Kusama", "Yayoi Kusama"),
+        ("any works by Hokusai this week", "Hokusai"),
+        ("artist: Jean-Michel Basquiat", "Jean-Michel Basquiat"),
+        ("a show by O'Keeffe", "O'Keeffe"),
+        ("paintings by the sea", None),
+        ("something by Yayoi Kusama", None),
+    ],
+)
+def test_the_artist_is_only_extracted_after_a_cue(question, artist):
+    assert extract_filters(question, TODAY).artist == artist
+
+
+@pytest.mark.parametrize(
+    "question, expected",
+    [
+        ("what's on today", (TODAY, TODAY)),
+        ("somewhere for tonight", (TODAY, TODAY)),
+        ("exhibitions tomorrow", (datetime.date(2026, 6, 4), datetime.date(2026, 6, 4))),
+        ("this weekend", (datetime.date(2026, 6, 6), datetime.date(2026, 6, 7))),
+        ("next week", (datetime.date(2026, 6, 8), datetime.date(2026, 6, 14))),
+        ("this week", (TODAY, datetime.date(2026, 6, 7))),
+        ("this month", (TODAY, datetime.date(2026, 6, 30))),
+        ("from 2026-06-10 to 2026-06-12", (datetime.date(2026, 6, 10), datetime.date(2026, 6, 12))),
+        ("between 2026-06-12 and 2026-06-10", (datetime.date(2026, 6, 10), datetime.date(2026, 6, 12))),
+        ("on 2026-07-01", (datetime.date(2026, 7, 1), datetime.date(2026, 7, 1))),
+    ],
+)
+def test_the_visit_window_covers_whole_days(question, expected):
+    assert extracted_window(question) == window(*expected)
+
+
+def test_the_weekend_is_today_on_a_sunday():
+    sunday = datetime.date(2026, 6, 7)
+
+    assert extracted_window("this weekend", sunday) == window(sunday, sunday)
+
+
+def test_no_dates_and_invalid_dates_give_no_window():
+    assert extracted_window("modern art") is None
+    assert extracted_window("on 2026-13-45") is None
+
+
+def test_the_filters_only_hold_the_extracted_constraints():
+    filters = extract_filters("paintings by Yayoi Kusama downtown tomorrow", TODAY).to_filters()
+
+    assert set(filters) == {"area", "artist", DATE_FROM_FILTER, DATE_TO_FILTER}
+    assert extract_filters("modern art", TODAY).is_empty()
+
+
+def test_profile_text_keeps_the_free_text_values():
+    profile = {"level": " Beginner ", "reason": "works by Hokusai", "visits": 3, "mood": ""}
+
+    assert profile_text(profile) == "Beginner\nworks by Hokusai"
+
+
+@pytest.fixture
+def today(monkeypatch):
+    """
+    Sets the date seen by `SelfQuery.generate`, returns a function to move it.
+    """
+    current = {"date": TODAY}
+
+    class FakeDate(datetime.date):
+        @classmethod
+        def today(cls) -> datetime.date:
+            return current["date"]
+
+    fake_datetime = types.SimpleNamespace(
+        date=FakeDate, datetime=datetime.datetime, time=datetime.time, timedelta=datetime.timedelta
+    )
+    monkeypatch.setattr(self_query_module, "datetime", fake_datetime)
+
+    def _set(date: datetime.date) -> None:
+        current["date"] = date
+
+    return _set
+
+
+def test_generate_memoizes_the_filters_per_query_and_day(monkeypatch, today):
+    calls = []
+
+    def _extract_filters(question: str, today: datetime.date) -> SelfQueryFilters:
+        calls.append((question, today))
+
+        return extract_filters(question, today)
+
+    monkeypatch.setattr(self_query_module, "extract_filters", _extract_filters)
+    self_query = SelfQuery()
+
+    first = self_query.generate(Query.from_str("exhibitions tomorrow"))
+    self_query.generate(Query.from_str("Exhibitions  TOMORROW"))
+    today(TODAY + datetime.timedelta(days=1))
+    next_day = self_query.generate(Query.from_str("exhibitions tomorrow"))
+
+    assert calls == [("exhibitions tomorrow", TODAY), ("exhibitions tomorrow", TODAY + datetime.timedelta(days=1))]
+    assert first.metadata["self_query"][DATE_FROM_FILTER] < next_day.metadata["self_query"][DATE_FROM_FILTER]
+
+
+def test_generate_leaves_the_query_without_constraints_untouched(today):
+    query = Query.from_str("modern art")
+
+    assert SelfQuery().generate(query) is query
+    assert SelfQuery(mock=True).generate(Query.from_str("works by Hokusai")).metadata == {}
+
+
+@pytest.fixture
+def llm_response(monkeypatch):
+    """
+    Replaces the chat model of the LLM fallback by one answering the content appended to the returned list.
+    """
+    responses = []
+
+    def _chat_model(**kwargs):
+        return lambda prompt: types.SimpleNamespace(content=responses.pop(0))
+
+    monkeypatch.setattr(self_query_module, "ChatOpenAI", _chat_model)
+    monkeypatch.setattr(settings, "RAG_SELF_QUERY_LLM_FALLBACK", True)
+
+    return responses
+
+
+def test_the_llm_fallback_is_parsed_into_filters(llm_response, today):
+    llm_response.append(
+        json.dumps({"area": "the waterfront", "artist": " Hokusai ", "date_from": "2026-06-10", "date_to": "nope"})
+    )
+
+    query = SelfQuery().generate(Query.from_str("something near the sea"))
+
+    assert query.metadata["self_query"] == {
+        "area": "WATERFRONT",
+        "artist": "Hokusai",
+        DATE_FROM_FILTER: window(datetime.date(2026, 6, 10), datetime.date(2026, 6, 10))[0],
+    }
+
+
+def test_the_llm_fallback_is_not_asked_when_the_rules_extract_something(llm_response, today):
+    query = SelfQuery().generate(Query.from_str("works by Hokusai"))
+
+    assert query.metadata["self_query"] == {"artist": "Hokusai"}
+
+
+def test_an_invalid_llm_answer_extracts_nothing(llm_response, today):
+    llm_response.append("I can't answer that")
+    query = Query.from_str("something near the sea")
+
+    assert SelfQuery().generate(query) is query
+
+
+@pytest.fixture
+def self_query_retriever(monkeypatch, retriever, exhibitions_collection):
+    monkeypatch.setattr(settings, "RAG_SELF_QUERY_ENABLED", True)
+    retriever._self_query = SelfQuery()
+
+    # the exhibitions have to be open now, as the filtered searches only return the running exhibitions
+    now = datetime.datetime.now()
+    exhibitions = [
+        make_exhibition([1.0, 0.0, 0.0], now=now, artist="someone else"),
+        make_exhibition([0.6, 0.8, 0.0], now=now, artist="Yayoi Kusama"),
+    ]
+    connection.upsert(exhibitions_collection, points=[exhibition.to_point() for exhibition in exhibitions])
+
+    return retriever, exhibitions
+
+
+def test_the_self_query_filters_are_pushed_into_the_search(self_query_retriever):
+    retriever, exhibitions = self_query_retriever
+
+    query_model, documents = retriever.retrieve("paintings by Yayoi Kusama", k=4)
+
+    assert query_model.metadata["self_query"] == {"artist": "Yayoi Kusama"}
+    assert [document.id for document in documents] == [exhibitions[1].id]
+
+
+def test_the_search_is_retried_without_the_self_query_filters_when_they_match_nothing(self_query_retriever):
+    retriever, exhibitions = self_query_retriever
+
+    _, documents = retriever.retrieve("paintings by Nobody Known", k=4)
+    _, async_documents = asyncio.run(retriever.aretrieve("paintings by Nobody Known", k=4))
+    _, batch_documents = retriever.retrieve_many(["paintings by Nobody Known", "paintings by Yayoi Kusama"], k=4)
+
+    expected = [exhibitions[0].id, exhibitions[1].id]
+    assert [document.id for document in documents] == expected
+    assert [document.id for document in async_documents] == expected
+    assert [[document.id for document in documents] for documents in batch_documents] == [
+        expected,
+        [exhibitions[1].id],
+    ]
+
+
+def test_the_request_filters_take_precedence_over_the_extracted_ones(self_query_retriever):
+    retriever, exhibitions = self_query_retriever
+
+    _, documents = retriever.retrieve("paintings by Yayoi Kusama", k=4, filters={"artist": "someone else"})
+
+    assert [document.id for document in documents] == [exhibitions[0].id]
+
+
+def test_the_self_query_is_off_by_default(monkeypatch, retriever):
+    retriever._self_query = SelfQuery()
+    monkeypatch.setattr(settings, "RAG_SELF_QUERY_ENABLED", type(settings).model_fields["RAG_SELF_QUERY_ENABLED"].default)
+
+    query_model, _ = retriever.retrieve("paintings by Yayoi Kusama", k=4)
+
+    assert "self_query" not in query_model.metadata
@@ -6,7 +6,7 @@ import openai
 
 from gallery_recommender import settings
 from gallery_recommender.infrastructure.opik_utils import configure_opik
-from gallery_recommender.application.rag import ContextRetriever
+from gallery_recommender.application.rag import get_context_retriever
 from gallery_recommender.domain.embedded_cleaned_data import EmbeddedExhibitionDocument
 from gallery_recommender.application.utils import misc
 from gallery_recommender.model.inference import InferenceExecutor, ChatGPTInference
@@ -38,7 +38,7 @@ def main():
     filters = {field: value for field, value in (args.filter or [])}
 
     # 1) Retrieval
-    retriever = ContextRetriever(mock=False)
+    retriever = get_context_retriever()
     docs = retriever.search(args.query, k=args.k, filters=filters)
 
     logger.info(f"Retrieved {len(docs)} context docs")
@@ -0,0 +1,143 @@
+import argparse
+import datetime
+import statistics
+import time
+import uuid
+
+import numpy as np
+from loguru import logger
+from qdrant_client.models import Record
+
+from gallery_recommender.domain.data import ExhibitionData
+from gallery_recommender.domain.embedded_cleaned_data import EmbeddedExhibitionDocument
+
+
+def _exhibition_fields(i: int) -> dict:
+    start = datetime.datetime(2025, 1, 1) + datetime.timedelta(days=i % 365)
+    end = start + datetime.timedelta(days=30)
+
+    return {
+        "name": f"Exhibition {i}",
+        "area": "DOWNTOWN",
+        "description": "A retrospective of abstract paintings exploring colour, rhythm and the city at night. " * 3,
+        "artist": f"Artist {i % 500}",
+        "exhibition_image_url": f"https://example.com/exhibitions/{i}.jpg",
+        "exhibition_start_date": start,
+        "exhibition_end_date": end,
+        "exhibition_start_date_ts": start.timestamp(),
+        "exhibition_end_date_ts": end.timestamp(),
+        "gallery_id": uuid.uuid4(),
+    }
+
+
+def make_qdrant_records(num_records: int, with_vectors: bool) -> list[Record]:
+    """
+    Records as returned by the Qdrant client: datetimes and UUIDs come back as strings.
+    """
+    records = []
+    for i in range(num_records):
+        fields = _exhibition_fields(i)
+        payload = {
+            **fields,
+            "metadata": {},
+            "exhibition_start_date": fields["exhibition_start_date"].isoformat(),
+            "exhibition_end_date": fields["exhibition_end_date"].isoformat(),
+            "gallery_id": str(fields["gallery_id"]),
+        }
+        vector = np.random.rand(384).astype(np.float32).tolist() if with_vectors else None
+        records.append(Record(id=str(uuid.uuid4()), payload=payload, vector=vector))
+
+    return records
+
+
+def make_mongo_documents(num_records: int) -> list[dict]:
+    """
+    Documents as returned by pymongo: datetimes are native, UUIDs were stored as strings.
+    """
+    documents = []
+    for i in range(num_records):
+        fields = _exhibition_fields(i)
+        documents.append(
+            {
+                **fields,
+                "_id": str(uuid.uuid4()),
+                "name_japanese": fields["name"],
+                "name_english": fields["name"],
+                "description_japanese": fields["description"],
+                "description_english": fields["description"],
+                "gallery_id": str(fields["gallery_id"]),
+                "latitude": 35.0,
+                "longitude": 139.0,
+            }
+        )
+
+    return documents
+
+
+def _median_duration_ms(fn, repeats: int) -> float:
+    timings = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        fn()
+        timings.append((time.perf_counter() - start) * 1000)
+
+    return statistics.median(timings)
+
+
+def benchmark_qdrant(num_records: int, with_vectors: bool, repeats: int) -> dict:
+    records = make_qdrant_records(num_records, with_vectors)
+
+    strict = [EmbeddedExhibitionDocument.from_record(record, strict=True) for record in records]
+    trusted = [EmbeddedExhibitionDocument.from_record(record, strict=False) for record in records]
+    assert all(a.model_dump_json() == b.model_dump_json() for a, b in zip(strict, trusted)), "Trusted hydration differs"
+
+    return {
+        "source": "qdrant",
+        "num_records": num_records,
+        "with_vectors": with_vectors,
+        "strict_ms": _median_duration_ms(
+            lambda: [EmbeddedExhibitionDocument.from_record(record, strict=True) for record in records], repeats
+        ),
+        "trusted_ms": _median_duration_ms(
+            lambda: [EmbeddedExhibitionDocument.from_record(record, strict=False) for record in records], repeats
+        ),
+    }
+
+
+def benchmark_mongo(num_records: int, repeats: int) -> dict:
+    documents = make_mongo_documents(num_records)
+
+    # from_mongo pops the _id, so every run works on copies
+    strict = [ExhibitionData.from_mongo(dict(document), strict=True) for document in documents]
+    trusted = [ExhibitionData.from_mongo(dict(document), strict=False) for document in documents]
+    assert all(a.model_dump_json() == b.model_dump_json() for a, b in zip(strict, trusted)), "Trusted hydration differs"
+
+    return {
+        "source": "mongo",
+        "num_records": num_records,
+        "strict_ms": _median_duration_ms(
+            lambda: [ExhibitionData.from_mongo(dict(document), strict=True) for document in documents], repeats
+        ),
+        "trusted_ms": _median_duration_ms(
+            lambda: [ExhibitionData.from_mongo(dict(document), strict=False) for document in documents], repeats
+        ),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare strict and trusted hydration of Qdrant records and MongoDB documents")
+    parser.add_argument("--num-records", type=int, default=10_000, help="How many records to hydrate per run")
+    parser.add_argument("--repeats", type=int, default=5, help="How many timed runs per mode")
+    parser.add_argument("--with-vectors", action="store_true", help="Include 384-dim vectors in the Qdrant records")
+    args = parser.parse_args()
+
+    for report in (
+        benchmark_qdrant(args.num_records, args.with_vectors, args.repeats),
+        benchmark_mongo(args.num_records, args.repeats),
+    ):
+        speedup = report["strict_ms"] / report["trusted_ms"] if report["trusted_ms"] else 0.0
+        logger.info(f"{report} | speedup: {speedup:.2f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,67 @@
+import argparse
+import datetime
+import sys
+import uuid
+
+from loguru import logger
+
+from gallery_recommender.application.indexing import ensure_indexes
+from gallery_recommender.domain.data import ExhibitionData, GalleryData
+from gallery_recommender.infrastructure.db.mongo import connection
+from gallery_recommender.settings import settings
+
+# the queries of the crawler, the API handlers and the data service, with placeholder values
+HOT_QUERIES = {
+    "gallery by name": (GalleryData, {"name": "gallery"}),
+    "gallery by id": (GalleryData, {"_id": str(uuid.uuid4())}),
+    "exhibition by name and gallery": (ExhibitionData, {"name": "exhibition", "gallery_id": str(uuid.uuid4())}),
+    "exhibition by id": (ExhibitionData, {"_id": str(uuid.uuid4())}),
+    "active exhibitions": (ExhibitionData, {"exhibition_end_date": {"$gte": datetime.datetime.now()}}),
+}
+
+
+def plan_stages(plan: dict | list) -> list[str]:
+    """
+    The stages of an explain plan, walking the nested input stages.
+    """
+    if isinstance(plan, list):
+        return [stage for child in plan for stage in plan_stages(child)]
+    if not isinstance(plan, dict):
+        return []
+
+    stages = [plan["stage"]] if "stage" in plan else []
+    for value in plan.values():
+        if isinstance(value, (dict, list)):
+            stages.extend(plan_stages(value))
+
+    return stages
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Check that the hot MongoDB queries are served by an index")
+    parser.add_argument("--ensure", action="store_true", help="Create the declared indexes before checking")
+    args = parser.parse_args()
+
+    if args.ensure:
+        ensure_indexes()
+
+    database = connection.get_database(settings.DATABASE_NAME)
+
+    collection_scans = []
+    for query_name, (data_class, query) in HOT_QUERIES.items():
+        explain = database[data_class.get_collection_name()].find(query).explain()
+        stages = plan_stages(explain["queryPlanner"]["winningPlan"])
+
+        logger.info(f"{query_name} | {data_class.get_collection_name()} | {' <- '.join(stages)}")
+        if "COLLSCAN" in stages:
+            collection_scans.append(query_name)
+
+    if collection_scans:
+        logger.error(f"Queries running a collection scan: {collection_scans}")
+        sys.exit(1)
+
+    logger.info(f"All {len(HOT_QUERIES)} hot queries are served by an index")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,108 @@
+import argparse
+import statistics
+import time
+from pathlib import Path
+
+import numpy as np
+from loguru import logger
+from sentence_transformers.SentenceTransformer import SentenceTransformer
+from sentence_transformers.cross_encoder import CrossEncoder
+
+from gallery_recommender import settings
+from gallery_recommender.application.networks.onnx_backend import OnnxCrossEncoderBackend, OnnxEmbeddingBackend
+
+
+SAMPLE_QUERIES = [
+    "Level: Beginner\nReason: For inspiration\nDuration: 2 hours\nMood: Joyful",
+    "Level: Expert\nReason: To relax\nDuration: 1 hour\nMood: Contemplative",
+]
+
+SAMPLE_DOCUMENTS = [
+    "A retrospective of abstract paintings exploring colour, rhythm and the city at night.",
+    "写真と映像を通して、都市の記憶と風景の変化を探る個展。",
+    "Sculptures made from reclaimed wood and steel, reflecting on memory and industry.",
+    "現代陶芸の新たな可能性を提示するグループ展。伝統的な技法と実験的なフォルムが交差する。",
+]
+
+
+def _median_latency_ms(fn, repeats: int) -> float:
+    fn()  # warmup
+    timings = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        fn()
+        timings.append((time.perf_counter() - start) * 1000)
+
+    return statistics.median(timings)
+
+
+def check_embedding_model(quantize: bool, cache_dir: Path, repeats: int) -> dict:
+    model = SentenceTransformer(settings.TEXT_EMBEDDING_MODEL, device="cpu")
+    model.eval()
+    onnx_model = OnnxEmbeddingBackend(model, settings.TEXT_EMBEDDING_MODEL, quantize=quantize, cache_dir=cache_dir)
+
+    texts = SAMPLE_QUERIES + SAMPLE_DOCUMENTS
+    torch_embeddings = model.encode(texts, convert_to_numpy=True)
+    onnx_embeddings = onnx_model.encode(texts)
+
+    cosine = np.sum(torch_embeddings * onnx_embeddings, axis=1) / (
+        np.linalg.norm(torch_embeddings, axis=1) * np.linalg.norm(onnx_embeddings, axis=1)
+    )
+
+    return {
+        "model_id": settings.TEXT_EMBEDDING_MODEL,
+        "max_abs_diff": float(np.max(np.abs(torch_embeddings - onnx_embeddings))),
+        "min_cosine_similarity": float(cosine.min()),
+        "torch_latency_ms": _median_latency_ms(lambda: model.encode(texts, convert_to_numpy=True), repeats),
+        "onnx_latency_ms": _median_latency_ms(lambda: onnx_model.encode(texts), repeats),
+    }
+
+
+def check_cross_encoder_model(quantize: bool, cache_dir: Path, repeats: int) -> dict:
+    model = CrossEncoder(model_name=settings.RERANKING_CROSS_ENCODER_MODEL, device="cpu")
+    model.model.eval()
+    onnx_model = OnnxCrossEncoderBackend(
+        model, settings.RERANKING_CROSS_ENCODER_MODEL, quantize=quantize, cache_dir=cache_dir
+    )
+
+    pairs = [(query, document) for query in SAMPLE_QUERIES for document in SAMPLE_DOCUMENTS]
+    torch_scores = np.asarray(model.predict(pairs), dtype=np.float32)
+    onnx_scores = onnx_model.predict(pairs)
+
+    # the reranker only uses the scores for sorting, so the ranking is what has to match
+    same_ranking = all(
+        np.array_equal(np.argsort(-torch_scores[i : i + len(SAMPLE_DOCUMENTS)]), np.argsort(-onnx_scores[i : i + len(SAMPLE_DOCUMENTS)]))
+        for i in range(0, len(pairs), len(SAMPLE_DOCUMENTS))
+    )
+
+    return {
+        "model_id": settings.RERANKING_CROSS_ENCODER_MODEL,
+        "max_abs_diff": float(np.max(np.abs(torch_scores - onnx_scores))),
+        "same_ranking": same_ranking,
+        "torch_latency_ms": _median_latency_ms(lambda: model.predict(pairs), repeats),
+        "onnx_latency_ms": _median_latency_ms(lambda: onnx_model.predict(pairs), repeats),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Check the parity and latency of the ONNX Runtime backend against the PyTorch models"
+    )
+    parser.add_argument("--no-quantize", action="store_true", help="Compare the fp32 ONNX export instead of int8")
+    parser.add_argument("--repeats", type=int, default=20, help="How many timed runs per backend")
+    parser.add_argument("--cache-dir", default=settings.RAG_ONNX_CACHE_DIR, help="Where the ONNX artifacts are cached")
+    args = parser.parse_args()
+
+    quantize = not args.no_quantize
+    cache_dir = Path(args.cache_dir)
+
+    for report in (
+        check_embedding_model(quantize, cache_dir, args.repeats),
+        check_cross_encoder_model(quantize, cache_dir, args.repeats),
+    ):
+        speedup = report["torch_latency_ms"] / report["onnx_latency_ms"] if report["onnx_latency_ms"] else 0.0
+        logger.info(f"{report} | speedup: {speedup:.2f}x")
+
+
+if __name__ == "__main__":
+    main()
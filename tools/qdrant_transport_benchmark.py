@@ -0,0 +1,90 @@
+import argparse
+import statistics
+import time
+import uuid
+
+import numpy as np
+from loguru import logger
+from qdrant_client import QdrantClient
+from qdrant_client.http.models import Distance, PointStruct, VectorParams
+
+from gallery_recommender.infrastructure.db.qdrant import QdrantDatabaseConnector
+from gallery_recommender.settings import settings
+
+
+def make_client(prefer_grpc: bool) -> QdrantClient:
+    """
+    A client with the same pooling and timeouts as the application, only the transport differs.
+    """
+    return QdrantClient(**{**QdrantDatabaseConnector.client_kwargs(), "prefer_grpc": prefer_grpc})
+
+
+def summarize(latencies: list[float]) -> str:
+    return (
+        f"p50={statistics.median(latencies):.2f}ms | p95={float(np.percentile(latencies, 95)):.2f}ms | "
+        f"mean={statistics.mean(latencies):.2f}ms"
+    )
+
+
+def benchmark(client: QdrantClient, vectors: np.ndarray, queries: np.ndarray, batch_size: int, k: int) -> dict:
+    collection_name = f"transport_benchmark_{uuid.uuid4().hex[:8]}"
+    client.create_collection(
+        collection_name=collection_name,
+        vectors_config=VectorParams(size=vectors.shape[1], distance=Distance.COSINE),
+    )
+    try:
+        upsert_latencies = []
+        for i in range(0, len(vectors), batch_size):
+            points = [PointStruct(id=j, vector=vectors[j].tolist()) for j in range(i, min(i + batch_size, len(vectors)))]
+            start = time.perf_counter()
+            client.upsert(collection_name=collection_name, points=points, wait=True)
+            upsert_latencies.append((time.perf_counter() - start) * 1000)
+
+        # the first search opens the channel, keep it out of the measurements
+        client.search(collection_name=collection_name, query_vector=queries[0].tolist(), limit=k)
+
+        search_latencies = []
+        for query in queries:
+            start = time.perf_counter()
+            client.search(collection_name=collection_name, query_vector=query.tolist(), limit=k)
+            search_latencies.append((time.perf_counter() - start) * 1000)
+    finally:
+        client.delete_collection(collection_name=collection_name)
+
+    return {"upsert": upsert_latencies, "search": search_latencies}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare the REST and gRPC latency of Qdrant searches and upserts")
+    parser.add_argument("--num-points", type=int, default=10_000)
+    parser.add_argument("--dim", type=int, default=384)
+    parser.add_argument("--batch-size", type=int, default=256, help="Points per upsert request")
+    parser.add_argument("--num-queries", type=int, default=500)
+    parser.add_argument("--k", type=int, default=10)
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+
+    if settings.QDRANT_LOCAL_PATH:
+        raise RuntimeError("The embedded Qdrant has no transport to compare, unset QDRANT_LOCAL_PATH")
+
+    rng = np.random.default_rng(args.seed)
+    vectors = rng.standard_normal((args.num_points, args.dim)).astype(np.float32)
+    queries = rng.standard_normal((args.num_queries, args.dim)).astype(np.float32)
+    logger.info(
+        f"Benchmarking {args.num_points} points of dimension {args.dim} and {args.num_queries} searches against "
+        f"{QdrantDatabaseConnector.get_connection_info().get('uri')}"
+    )
+
+    for transport, prefer_grpc in (("rest", False), ("grpc", True)):
+        client = make_client(prefer_grpc)
+        try:
+            report = benchmark(client, vectors, queries, args.batch_size, args.k)
+        finally:
+            client.close()
+
+        logger.info(f"{transport} | upsert of {args.batch_size} points | {summarize(report['upsert'])}")
+        logger.info(f"{transport} | search top-{args.k} | {summarize(report['search'])}")
+
+
+if __name__ == "__main__":
+    main()
@@ -2,7 +2,7 @@ import argparse
 from langchain.globals import set_verbose
 from loguru import logger
 
-from gallery_recommender.application.rag import ContextRetriever
+from gallery_recommender.application.rag import get_context_retriever
 from gallery_recommender.infrastructure.opik_utils import configure_opik
 
 
@@ -31,7 +31,7 @@ if __name__ == "__main__":
 
     filters = {field: value for field, value in (args.filter or [])}
 
-    retriever = ContextRetriever(mock=False)
+    retriever = get_context_retriever()
     documents = retriever.search(query, k=9, filters=filters)
 
     logger.info("Retrieved documents:")
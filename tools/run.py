@@ -7,6 +7,7 @@ import click
 from pipelines.digital_data_etl import digital_data_etl
 from pipelines.feature_engineering import feature_engineering
 from pipelines.end_to_end import end_to_end
+from pipelines.materialize_recommendations import materialize_recommendations
 
 
 @click.command(
@@ -53,6 +54,13 @@ poetry run python run.py --run-etl
     help="Run the feature engineering pipeline",
 )
 
+@click.option(
+    "--run-materialize-recommendations",
+    is_flag=True,
+    default=False,
+    help="Precompute the recommendations for every user profile and area",
+)
+
 @click.option(
     "--etl-config-filename",
     default="digital_data_etl_artomo.yaml",
@@ -75,12 +83,14 @@ def main(
     etl_reflections_config_filename: str = "digital_data_etl_reflections.yaml",
     run_feature_engineering: bool = False,
     reflections: bool = False,
+    run_materialize_recommendations: bool = False,
 ) -> None:
     assert (
         run_etl 
         or run_feature_engineering
         or run_end_to_end_data
-    ), "You must specify at least one of the following options: --run-etl or --run-feature-engineering"
+        or run_materialize_recommendations
+    ), "You must specify at least one of the following options: --run-etl, --run-feature-engineering or --run-materialize-recommendations"
 
 
     pipeline_args = {
@@ -115,6 +125,13 @@ def main(
         pipeline_args["run_name"] = f"feature_engineering_run_{dt.now().strftime('%Y_%m_%d_%H_%M_%S')}"
         feature_engineering.with_options(**pipeline_args)(**run_args_feature_engineering)
 
+    if run_materialize_recommendations:
+        run_args_materialize = {}
+        pipeline_args["config_path"] = root_dir / "configs" / "materialize_recommendations.yaml"
+        assert pipeline_args["config_path"].exists(), f"Config file not found: {pipeline_args['config_path']}"
+        pipeline_args["run_name"] = f"materialize_recommendations_run_{dt.now().strftime('%Y_%m_%d_%H_%M_%S')}"
+        materialize_recommendations.with_options(**pipeline_args)(**run_args_materialize)
+
 
 
 if __name__ == "__main__":
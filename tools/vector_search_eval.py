@@ -0,0 +1,157 @@
+import argparse
+import statistics
+import time
+import uuid
+
+import numpy as np
+from loguru import logger
+from qdrant_client.http.models import (
+    BinaryQuantization,
+    BinaryQuantizationConfig,
+    CollectionStatus,
+    Distance,
+    HnswConfigDiff,
+    OptimizersConfigDiff,
+    PointStruct,
+    QuantizationSearchParams,
+    ScalarQuantization,
+    ScalarQuantizationConfig,
+    ScalarType,
+    SearchParams,
+    VectorParams,
+)
+
+from gallery_recommender.domain.embedded_cleaned_data import EmbeddedExhibitionDocument
+from gallery_recommender.infrastructure.db.qdrant import connection
+
+# collection configurations to compare, the first one is the reference
+COLLECTION_CONFIGS = {
+    "fp32-m16": {"hnsw_config": HnswConfigDiff(m=16, ef_construct=128), "quantization_config": None},
+    "fp32-m32": {"hnsw_config": HnswConfigDiff(m=32, ef_construct=256), "quantization_config": None},
+    "int8-m16": {
+        "hnsw_config": HnswConfigDiff(m=16, ef_construct=128),
+        "quantization_config": ScalarQuantization(
+            scalar=ScalarQuantizationConfig(type=ScalarType.INT8, quantile=0.99, always_ram=True)
+        ),
+    },
+    "binary-m16": {
+        "hnsw_config": HnswConfigDiff(m=16, ef_construct=128),
+        "quantization_config": BinaryQuantization(binary=BinaryQuantizationConfig(always_ram=True)),
+    },
+}
+
+HNSW_EFS = [32, 64, 128, 256]
+
+
+def load_vectors(num_synthetic: int | None, dim: int, seed: int) -> np.ndarray:
+    if num_synthetic:
+        rng = np.random.default_rng(seed)
+        return rng.standard_normal((num_synthetic, dim)).astype(np.float32)
+
+    vectors = [
+        np.asarray(record.vector, dtype=np.float32)
+        for record in EmbeddedExhibitionDocument.iter_records(with_payload=False, with_vectors=True)
+    ]
+    if len(vectors) == 0:
+        raise RuntimeError(f"'{EmbeddedExhibitionDocument.get_collection_name()}' is empty, use --num-synthetic")
+
+    return np.vstack(vectors)
+
+
+def make_queries(vectors: np.ndarray, num_queries: int, seed: int) -> np.ndarray:
+    """
+    Perturbed copies of random points, so the queries follow the distribution of the collection.
+    """
+    rng = np.random.default_rng(seed + 1)
+    base = vectors[rng.integers(0, len(vectors), num_queries)]
+    noise = rng.standard_normal(base.shape).astype(np.float32) * np.std(vectors) * 0.3
+
+    return base + noise
+
+
+def exact_top_k(vectors: np.ndarray, queries: np.ndarray, k: int) -> np.ndarray:
+    normalized = vectors / np.linalg.norm(vectors, axis=1, keepdims=True)
+    normalized_queries = queries / np.linalg.norm(queries, axis=1, keepdims=True)
+    scores = normalized_queries @ normalized.T
+
+    return np.argsort(-scores, axis=1)[:, :k]
+
+
+def create_eval_collection(collection_name: str, vectors: np.ndarray, config: dict) -> None:
+    connection.create_collection(
+        collection_name=collection_name,
+        vectors_config=VectorParams(size=vectors.shape[1], distance=Distance.COSINE),
+        # build the HNSW graph even on small collections, otherwise Qdrant falls back to a full scan
+        hnsw_config=config["hnsw_config"].model_copy(update={"full_scan_threshold": 10}),
+        optimizers_config=OptimizersConfigDiff(indexing_threshold=10),
+        quantization_config=config["quantization_config"],
+    )
+    for i in range(0, len(vectors), 1000):
+        connection.upsert(
+            collection_name=collection_name,
+            points=[
+                PointStruct(id=j, vector=vectors[j].tolist(), payload={}) for j in range(i, min(i + 1000, len(vectors)))
+            ],
+            wait=True,
+        )
+
+    while connection.get_collection(collection_name=collection_name).status != CollectionStatus.GREEN:
+        time.sleep(0.5)
+
+
+def evaluate(collection_name: str, queries: np.ndarray, ground_truth: np.ndarray, k: int, params: SearchParams) -> dict:
+    recalls, latencies = [], []
+    for query, expected in zip(queries, ground_truth):
+        start = time.perf_counter()
+        results = connection.search(collection_name=collection_name, query_vector=query, limit=k, search_params=params)
+        latencies.append((time.perf_counter() - start) * 1000)
+
+        recalls.append(len({point.id for point in results} & set(expected.tolist())) / k)
+
+    return {
+        "recall": round(statistics.mean(recalls), 4),
+        "p50_ms": round(statistics.median(latencies), 2),
+        "p95_ms": round(float(np.percentile(latencies, 95)), 2),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Report recall@k against latency for each Qdrant collection configuration")
+    parser.add_argument("--num-synthetic", type=int, default=None, help="Use random vectors instead of the exhibitions")
+    parser.add_argument("--dim", type=int, default=384, help="Dimension of the synthetic vectors")
+    parser.add_argument("--num-queries", type=int, default=200)
+    parser.add_argument("--k", type=int, default=10)
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+
+    vectors = load_vectors(args.num_synthetic, args.dim, args.seed)
+    queries = make_queries(vectors, args.num_queries, args.seed)
+    ground_truth = exact_top_k(vectors, queries, args.k)
+    logger.info(f"Evaluating {len(queries)} queries against {len(vectors)} vectors of dimension {vectors.shape[1]}")
+
+    for config_name, config in COLLECTION_CONFIGS.items():
+        collection_name = f"vector_search_eval_{config_name}_{uuid.uuid4().hex[:8]}"
+        try:
+            create_eval_collection(collection_name, vectors, config)
+
+            for hnsw_ef in HNSW_EFS:
+                search_params = [SearchParams(hnsw_ef=hnsw_ef)]
+                if config["quantization_config"] is not None:
+                    search_params = [
+                        SearchParams(hnsw_ef=hnsw_ef, quantization=QuantizationSearchParams(rescore=False)),
+                        SearchParams(hnsw_ef=hnsw_ef, quantization=QuantizationSearchParams(rescore=True, oversampling=2.0)),
+                    ]
+
+                for params in search_params:
+                    report = evaluate(collection_name, queries, ground_truth, args.k, params)
+                    quantization = params.quantization.model_dump(exclude_none=True) if params.quantization else None
+                    logger.info(
+                        f"{config_name} | hnsw_ef={hnsw_ef} | quantization={quantization} | "
+                        f"recall@{args.k}={report['recall']} | p50={report['p50_ms']}ms | p95={report['p95_ms']}ms"
+                    )
+        finally:
+            connection.delete_collection(collection_name=collection_name)
+
+
+if __name__ == "__main__":
+    main()